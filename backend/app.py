@@ -1,11 +1,37 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, has_request_context, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import mysql.connector
+from db_pool import ConnectionPool, PoolTimeout
+from replicas import ReplicaRouter
+from matching import MatchIndex, name_key, normalize_prompt, table_name_for
+from migrations import MigrationLockTimeout, current_version, latest_version, migrate_locked
+from listing import (ListQueryError, decode_cursor, fetch_module_tree, fetch_page, fetch_project_tree, parse_depth,
+                     parse_fields, parse_limit)
+from export import DEFAULT_BATCH_SIZE, export_table, resolve_table
+from retention import store_outputs
+from schema_catalog import catalog_json
+from table_rules import DEFAULT_RULES_FILE, RuleSet
+from compression import ResponseCompressor
+from codegen_cache import GenerationCache, cache_key
+from codegen import iter_bundle, render_bundle
+from jobs import JobQueue, QueueFull
+from singleflight import SingleFlight
+from ddl import DDLExecutor
+from llm import EngineClient, EngineError, EngineRegistry, RetryBudget, StubEngine
+from response_cache import CachedResponse, ListCache, create_store, is_shared_store_url, table_tags
+import serialization
+from instrumentation import (DatabaseMetrics, MetricsRegistry, SlowRequestProfiler, StepTimer,
+                             begin_request, end_request)
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import os
 import json
 import datetime
+import hashlib
+import math
+import time
 import uuid
-import re
 try:
     from dotenv import load_dotenv
     # Load environment variables
@@ -13,8 +39,22 @@ try:
 except ImportError:
     print("python-dotenv not installed. Environment variables must be set manually.")
 
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by serialization.dumps (orjson when available)"""
+
+    def dumps(self, obj, **kwargs):
+        return serialization.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return serialization.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(serialization.dumps(obj), mimetype=self.mimetype)
+
 app = Flask(__name__)
-CORS(app)
+app.json = FastJSONProvider(app)
+CORS(app, expose_headers=['X-Next-Cursor', 'ETag', 'Server-Timing'])
 
 # Database configuration
 DB_CONFIG = {
@@ -24,84 +64,379 @@ DB_CONFIG = {
     'database': os.getenv('DB_NAME', 'codegen_platform')
 }
 
-def get_db_connection():
-    """Create and return a database connection"""
-    try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
-    except mysql.connector.Error as err:
-        print(f"Error connecting to MySQL: {err}")
-        return None
+DB_POOL_OPTIONS = {
+    'max_overflow': int(os.getenv('DB_POOL_MAX_OVERFLOW', 10)),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+    'recycle': int(os.getenv('DB_POOL_RECYCLE', 3600)),
+    'idle_timeout': int(os.getenv('DB_POOL_IDLE_TIMEOUT', 300)),
+    'pre_ping': os.getenv('DB_POOL_PRE_PING', '1') != '0'
+}
 
-def init_db():
-    """Initialize the database with required tables if they don't exist"""
-    conn = get_db_connection()
-    if not conn:
-        print("Failed to connect to database for initialization")
-        return False
-    
-    cursor = conn.cursor()
-    
-    # Create AIA_PROJECT table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS AIA_PROJECT (
-        PROJECT_ID INT AUTO_INCREMENT PRIMARY KEY,
-        PROJECT_NAME VARCHAR(255) NOT NULL,
-        PROJECT_DESCRIPTION TEXT,
-        MODULE_DESCRIPTION TEXT,
-        INSERT_ID VARCHAR(255),
-        INSERT_DATE_TIME DATETIME DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    # Create AIA_MODULE table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS AIA_MODULE (
-        MODULE_ID INT AUTO_INCREMENT PRIMARY KEY,
-        MODULE_NAME VARCHAR(255) NOT NULL,
-        MODULE_DESCRIPTION TEXT,
-        PROJECT_ID INT,
-        DATABASE_TABLE VARCHAR(255),
-        INSERT_ID VARCHAR(255),
-        INSERT_DATE_TIME DATETIME DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (PROJECT_ID) REFERENCES AIA_PROJECT(PROJECT_ID)
+db_pool = ConnectionPool(DB_CONFIG, size=int(os.getenv('DB_POOL_SIZE', 5)), **DB_POOL_OPTIONS)
+
+def replica_pools(hosts, size):
+    """One pool per comma-separated host[:port], using the primary's credentials"""
+    pools = {}
+    for address in filter(None, (host.strip() for host in hosts.split(','))):
+        host, _, port = address.partition(':')
+        config = dict(DB_CONFIG, host=host, **({'port': int(port)} if port else {}))
+        pools[address] = ConnectionPool(config, size=size, **DB_POOL_OPTIONS)
+    return pools
+
+# Read-only list routes go to DB_REPLICA_HOSTS when set; writes, and every
+# read inside the generate pipeline, stay on the primary
+replica_router = ReplicaRouter(
+    replica_pools(os.getenv('DB_REPLICA_HOSTS', ''), int(os.getenv('DB_REPLICA_POOL_SIZE', 5))),
+    max_lag=float(os.getenv('DB_REPLICA_MAX_LAG', 5)),
+    check_interval=float(os.getenv('DB_REPLICA_CHECK_INTERVAL', 5)),
+    strategy=os.getenv('DB_REPLICA_STRATEGY', 'least-loaded')
+)
+
+# Instrumentation: Prometheus metrics at /metrics, a Server-Timing header on
+# every response and an opt-in profiler for requests slower than PROFILE_SLOW_MS
+metrics = MetricsRegistry()
+db_metrics = DatabaseMetrics(metrics, rows_examined=os.getenv('DB_METRICS_ROWS_EXAMINED') == '1')
+http_request_seconds = metrics.histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ('method', 'endpoint', 'status')
+)
+pipeline_step_seconds = metrics.histogram(
+    'pipeline_step_duration_seconds', 'Time spent in each generate pipeline step', ('pipeline', 'step')
+)
+PROFILE_SLOW_MS = float(os.getenv('PROFILE_SLOW_MS', 0))
+profiler = SlowRequestProfiler(
+    PROFILE_SLOW_MS / 1000,
+    os.getenv('PROFILE_DIR', 'profiles'),
+    interval=float(os.getenv('PROFILE_INTERVAL_MS', 5)) / 1000,
+    sample_rate=float(os.getenv('PROFILE_SAMPLE_RATE', 1))
+) if PROFILE_SLOW_MS > 0 else None
+
+def _note_replica_read(replica):
+    # cached_list_response keeps lists built from replica reads only briefly
+    if has_request_context():
+        g.replica_read = True
+
+@contextmanager
+def db_connection(read_only=False):
+    """Check an instrumented connection out of the pool; use as a context manager
+
+    With ``read_only`` the connection may come from a read replica, so only
+    use it for reads that tolerate DB_REPLICA_MAX_LAG seconds of staleness.
+    """
+    start = time.perf_counter()
+    checkout = replica_router.connection(db_pool, _note_replica_read) if read_only else db_pool.connection()
+    with checkout as conn:
+        db_metrics.record_pool_wait(time.perf_counter() - start)
+        conn = db_metrics.instrument(conn)
+        yield conn
+        conn.flush()
+
+# List routes: page size when no limit is given (0 = unbounded) and the cap
+LIST_DEFAULT_LIMIT = int(os.getenv('LIST_DEFAULT_LIMIT', 0)) or None
+LIST_MAX_LIMIT = int(os.getenv('LIST_MAX_LIMIT', 1000))
+
+# Read-through cache for the list routes; LIST_CACHE_URL may point at Redis
+# (redis://host:port/db) to share entries and invalidations across workers
+LIST_CACHE_ENABLED = os.getenv('LIST_CACHE_ENABLED', '1') != '0'
+list_cache = ListCache(
+    create_store(os.getenv('LIST_CACHE_URL', 'memory://'), max_entries=int(os.getenv('LIST_CACHE_SIZE', 1024))),
+    ttl=int(os.getenv('LIST_CACHE_TTL', 300))
+)
+
+def invalidate_lists(tags):
+    """After a commit: drop cached lists for ``tags`` and read them from the primary for now
+
+    Replicas may not have the write yet, so without the second step the
+    list rebuilt after invalidation could be cached without it.
+    """
+    replica_router.note_write()
+    list_cache.invalidate(tags)
+
+# Negotiated gzip/brotli compression of response bodies of at least
+# COMPRESSION_MIN_SIZE bytes; repeated bodies are compressed once
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', '1') != '0'
+compressor = ResponseCompressor(
+    min_size=int(os.getenv('COMPRESSION_MIN_SIZE', 1024)),
+    gzip_level=int(os.getenv('COMPRESSION_GZIP_LEVEL', 6)),
+    brotli_quality=int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5)),
+    cache_entries=int(os.getenv('COMPRESSION_CACHE_SIZE', 256)),
+    cache_bytes=int(os.getenv('COMPRESSION_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+)
+
+# Maximum number of prompts accepted by /api/generate/batch
+GENERATE_BATCH_MAX_ITEMS = int(os.getenv('GENERATE_BATCH_MAX_ITEMS', 500))
+
+# Prompt matching: minimum score (0-1) for an existing row to be reused
+MATCH_MIN_SCORE = float(os.getenv('MATCH_MIN_SCORE', 0.75))
+
+# Ids re-read on every sync for rows committed out of order, and seconds
+# between full re-reads of the indexed tables
+MATCH_SYNC_LOOKBACK = int(os.getenv('MATCH_SYNC_LOOKBACK', 100))
+MATCH_RESYNC_INTERVAL = int(os.getenv('MATCH_RESYNC_INTERVAL', 300))
+
+# Full re-reads run on a background thread per index, off the request path
+project_index = MatchIndex('AIA_PROJECT', 'PROJECT_ID', ('PROJECT_NAME', 'PROJECT_DESCRIPTION'),
+                           lookback=MATCH_SYNC_LOOKBACK, resync_interval=MATCH_RESYNC_INTERVAL,
+                           connect=lambda: db_connection())
+module_index = MatchIndex('AIA_MODULE', 'MODULE_ID', ('MODULE_NAME', 'MODULE_DESCRIPTION'),
+                          lookback=MATCH_SYNC_LOOKBACK, resync_interval=MATCH_RESYNC_INTERVAL,
+                          connect=lambda: db_connection())
+
+def find_similar(cursor, index, prompt):
+    """Return (row, score) for the indexed row closest to the prompt, or (None, 0.0)"""
+    index.sync(cursor)
+    match = index.best_match(prompt, MATCH_MIN_SCORE)
+    if not match:
+        return None, 0.0
+    row_id, score = match
+    cursor.execute(f"SELECT * FROM {index.table} WHERE {index.id_column} = %s", (row_id,))
+    row = cursor.fetchone()
+    if row is None:
+        # Indexed by a request whose transaction was rolled back
+        index.remove(row_id)
+        return None, 0.0
+    return row, score
+
+# Bump whenever generator output changes so stale cache entries are not reused
+GENERATOR_VERSION = '2'
+
+generation_cache = GenerationCache(
+    max_entries=int(os.getenv('CODEGEN_CACHE_SIZE', 256)),
+    max_bytes=int(os.getenv('CODEGEN_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    ttl=int(os.getenv('CODEGEN_CACHE_TTL', 0)) or None,
+    disk_dir=os.getenv('CODEGEN_CACHE_DIR') or None
+)
+
+def cached_table_creation_statement(table_name, prompt, engine):
+    """Table DDL from the request's engine, served from the generation cache
+
+    The stub engine builds the DDL from table_rules, so the rules digest is
+    part of the key and editing TABLE_RULES_FILE invalidates its entries.
+    """
+    key = cache_key('table', GENERATOR_VERSION, table_rules.digest, llm_engines.resolve(engine),
+                    table_name, prompt.lower())
+    return generation_cache.get_or_create(
+        key, lambda: llm_engines.complete(engine, 'table_schema', prompt, {'table_name': table_name})
     )
-    ''')
-    
-    # Create AIA_MODULE_DATABASES table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS AIA_MODULE_DATABASES (
-        MODULE_DATABASE_ID INT AUTO_INCREMENT PRIMARY KEY,
-        MODULE_ID INT,
-        DATABASE_TABLE VARCHAR(255),
-        CREATION_STATEMENT TEXT,
-        INSERT_ID VARCHAR(255),
-        INSERT_DATE_TIME DATETIME DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (MODULE_ID) REFERENCES AIA_MODULE(MODULE_ID)
+
+# Threads waiting on the engine calls of one batch request; the engines'
+# own LLM_MAX_CONCURRENCY still limits how many run at once
+engine_callers = ThreadPoolExecutor(int(os.getenv('LLM_BATCH_CALL_THREADS', 16)),
+                                    thread_name_prefix='engine-call')
+
+def call_concurrently(func, calls):
+    """Return ``func(*args)`` for each args tuple, run concurrently, in order
+
+    An EngineError is returned in place of the result of the call that
+    raised it.
+    """
+    futures = [engine_callers.submit(func, *args) for args in calls]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except EngineError as e:
+            results.append(e)
+    return results
+
+def table_statements(requests):
+    """{table name: creation statement or EngineError} for {table name: (prompt, engine)}"""
+    tables = list(requests)
+    return dict(zip(tables, call_concurrently(
+        cached_table_creation_statement, [(table, *requests[table]) for table in tables]
+    )))
+
+def application_code_key(module, module_database, engine):
+    return cache_key(
+        'app', GENERATOR_VERSION, llm_engines.resolve(engine),
+        module.get('MODULE_NAME'),
+        module_database.get('DATABASE_TABLE'),
+        module_database.get('CREATION_STATEMENT')
     )
-    ''')
-    
-    # Create AIA_LLM_OUTPUTS table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS AIA_LLM_OUTPUTS (
-        OUTPUT_ID INT AUTO_INCREMENT PRIMARY KEY,
-        PROMPT TEXT,
-        ENGINE VARCHAR(255),
-        OUTPUT TEXT,
-        INSERT_ID VARCHAR(255),
-        INSERT_DATE_TIME DATETIME DEFAULT CURRENT_TIMESTAMP
+
+def cached_application_code(prompt, module, module_database, engine):
+    """Application code from the request's engine, served from the generation cache"""
+    return generation_cache.get_or_create(
+        application_code_key(module, module_database, engine),
+        lambda: llm_engines.complete(
+            engine, 'application_code', prompt,
+            {'module': module, 'module_database': module_database}
+        )
     )
-    ''')
-    
-    conn.commit()
-    cursor.close()
-    conn.close()
-    
-    print("Database initialized successfully")
+
+def stream_application_code(prompt, module, module_database, engine):
+    """Yield application code chunks as the engine produces them
+
+    A cached answer is yielded whole; a streamed one is cached once complete.
+    """
+    key = application_code_key(module, module_database, engine)
+    cached = generation_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+    chunks = []
+    for chunk in llm_engines.stream(
+        engine, 'application_code', prompt, {'module': module, 'module_database': module_database}
+    ):
+        chunks.append(chunk)
+        yield chunk
+    generation_cache.put(key, ''.join(chunks))
+
+# Keyword rules adding column groups to the stub engine's table definitions
+table_rules = RuleSet.load(os.getenv('TABLE_RULES_FILE') or DEFAULT_RULES_FILE)
+
+# LLM engines. Until a hosted engine is registered every engine name in a
+# request is served by the deterministic local stub.
+stub_engine = StubEngine(
+    {
+        'llm_output': lambda prompt, engine: f"Generated output for prompt: {prompt} using engine: {engine}",
+        'table_schema': lambda prompt, table_name: generate_table_creation_statement(table_name, prompt),
+        'application_code': lambda prompt, module, module_database: generate_application_code(prompt, module, module_database),
+    },
+    latency=float(os.getenv('LLM_STUB_LATENCY_MS', 0)) / 1000,
+    failure_rate=float(os.getenv('LLM_STUB_FAILURE_RATE', 0)),
+    stream_handlers={
+        # One chunk per bundle section (schema, React, Flask)
+        'application_code': lambda prompt, module, module_database: iter_bundle(module, module_database),
+    }
+)
+
+llm_engines = EngineRegistry(default=os.getenv('LLM_DEFAULT_ENGINE', 'stub'))
+llm_engines.register('stub', EngineClient(
+    stub_engine,
+    max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', 4)),
+    timeout=float(os.getenv('LLM_TIMEOUT', 30)),
+    max_retries=int(os.getenv('LLM_MAX_RETRIES', 2)),
+    retry_budget=RetryBudget(ratio=float(os.getenv('LLM_RETRY_BUDGET', 0.1))),
+    batch_window=float(os.getenv('LLM_BATCH_WINDOW_MS', 0)) / 1000,
+    max_batch_size=int(os.getenv('LLM_MAX_BATCH_SIZE', 8)),
+    max_abandoned=int(os.getenv('LLM_MAX_ABANDONED')) if os.getenv('LLM_MAX_ABANDONED') else None
+))
+
+# Coalesces concurrent /api/generate calls for the same prompt and engine
+generate_flight = SingleFlight()
+
+# Applies generated CREATE TABLE statements after the request has committed
+ddl_executor = DDLExecutor(
+    db_connection,
+    workers=int(os.getenv('DDL_WORKERS', 2)),
+    lock_wait_timeout=int(os.getenv('DDL_LOCK_WAIT_TIMEOUT', 5)),
+    max_attempts=int(os.getenv('DDL_MAX_ATTEMPTS', 3)),
+    stale_after=int(os.getenv('DDL_STALE_AFTER', 600)),
+    # DDL_STATUS is part of the cached /api/module-databases responses
+    on_status=lambda module_id: invalidate_lists(table_tags('AIA_MODULE_DATABASES', MODULE_ID=module_id))
+)
+
+# With a shared LIST_CACHE_URL, job status is published there too so any
+# worker process can answer /api/jobs/<id>
+job_queue = JobQueue(
+    workers=int(os.getenv('JOB_WORKERS', 4)),
+    max_queued=int(os.getenv('JOB_QUEUE_SIZE', 100)),
+    result_ttl=int(os.getenv('JOB_RESULT_TTL', 600)),
+    store=create_store(os.getenv('LIST_CACHE_URL'), prefix='codegen:job:')
+    if is_shared_store_url(os.getenv('LIST_CACHE_URL')) else None
+)
+
+# Seconds to wait for another process's schema migration to finish
+DB_MIGRATE_LOCK_TIMEOUT = int(os.getenv('DB_MIGRATE_LOCK_TIMEOUT', 60))
+
+def init_db():
+    """Bring the database schema up to the latest migration version
+
+    Run once per deployment (python migrate.py, or the gunicorn master on
+    start), never at import. Concurrent runs are serialized by a MySQL
+    named lock.
+    """
+    try:
+        with db_connection() as conn:
+            migrate_locked(conn, lock_timeout=DB_MIGRATE_LOCK_TIMEOUT)
+    except (mysql.connector.Error, PoolTimeout, MigrationLockTimeout) as err:
+        print(f"Failed to initialize database: {err}")
+        return False
+
+    print(f"Database initialized successfully (schema version {latest_version()})")
     return True
 
-# Initialize database on startup
-init_db()
+# Set once the schema is known to be current; it only ever moves forward
+schema_ready = False
+
+metrics.add_stats('db_pool', db_pool.stats)
+metrics.add_stats('db_replica', replica_router.stats, label='replica')
+metrics.add_stats('codegen_cache', generation_cache.stats)
+metrics.add_stats('list_cache', list_cache.stats)
+metrics.add_stats('compression', compressor.stats)
+metrics.add_stats('llm', llm_engines.stats, label='engine')
+metrics.add_stats('jobs', job_queue.stats)
+metrics.add_stats('ddl', ddl_executor.stats)
+metrics.add_stats('generate_singleflight', generate_flight.stats)
+metrics.add_stats('match_index', lambda: {'project': project_index.stats(), 'module': module_index.stats()},
+                  label='table')
+if profiler:
+    metrics.add_stats('profiler', profiler.stats)
+
+# Connections opened by each server worker at start (see init_worker)
+DB_POOL_WARM = int(os.getenv('DB_POOL_WARM', 0))
+
+def init_worker():
+    """Per-process setup for server workers, called after fork
+
+    The database schema is migrated once by the server's master process
+    (see gunicorn.conf.py), not here and not at import, so starting N
+    workers costs no DDL. Connections inherited from a preloading parent are
+    dropped without being closed or reused; DB_POOL_WARM connections are
+    opened up front instead.
+    Table definitions left pending by earlier processes are queued for the
+    DDL executor, and the prompt match indexes start loading in the
+    background.
+    """
+    db_pool.dispose()
+    replica_router.dispose()
+    if DB_POOL_WARM:
+        db_pool.warm(DB_POOL_WARM)
+    try:
+        ddl_executor.sweep()
+    except (mysql.connector.Error, PoolTimeout) as err:
+        print(f"Could not queue pending table definitions: {err}")
+    for index in (project_index, module_index):
+        index.start()
+
+@app.before_request
+def start_request_timing():
+    g.timings, g.timings_token = begin_request()
+    g.profile = profiler.start() if profiler else None
+
+@app.after_request
+def finish_request_timing(response):
+    timings = g.get('timings')
+    if timings is None:
+        return response
+    duration = timings.elapsed()
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    http_request_seconds.observe(
+        duration, method=request.method, endpoint=endpoint, status=response.status_code
+    )
+    response.headers['Server-Timing'] = timings.server_timing()
+    sampling = g.pop('profile', None)
+    if sampling is not None:
+        path = profiler.finish(sampling, duration, f"{request.method} {endpoint}")
+        if path:
+            print(f"Slow request profile written to {path}")
+    return response
+
+# Registered after the timing hook so it runs first and its cost is timed
+@app.after_request
+def compress_response(response):
+    if not COMPRESSION_ENABLED:
+        return response
+    return compressor.compress_response(request, response)
+
+@app.teardown_request
+def end_request_timing(exc):
+    sampling = g.pop('profile', None)
+    if sampling is not None:
+        sampling.stop()
+    token = g.pop('timings_token', None)
+    if token is not None:
+        end_request(token)
 
 @app.route('/api/generate', methods=['POST'])
 def generate_code():
@@ -112,497 +447,900 @@ def generate_code():
     if not prompt or not engine:
         return jsonify({'success': False, 'message': 'Prompt and engine are required'}), 400
     
-    # Generate a unique ID for this request
-    request_id = str(uuid.uuid4())
+    if request.args.get('stream') == '1':
+        response = Response(
+            stream_with_context(run_generate_stream(prompt, engine)), mimetype='text/event-stream'
+        )
+        response.headers['Cache-Control'] = 'no-cache'
+        # Stop reverse proxies from buffering the stream
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    
+    if request.args.get('async') == '1':
+        try:
+            job = job_queue.submit(run_generate_pipeline, prompt, engine)
+        except QueueFull as e:
+            response = jsonify({'success': False, 'message': str(e)})
+            response.headers['Retry-After'] = '1'
+            return response, 429
+        return jsonify({
+            'success': True,
+            'message': 'Code generation queued',
+            'jobId': job.id,
+            'status': job.status,
+            'statusUrl': f'/api/jobs/{job.id}'
+        }), 202
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
+        payload = run_generate_pipeline(prompt, engine)
+    except Exception as e:
+        print(f"Error generating code: {e}")
+        return jsonify({'success': False, 'message': f'Error generating code: {str(e)}'}), 500
+    response = jsonify(payload)
+    add_code_segment(response, payload, engine)
+    return response
+
+def add_code_segment(response, payload, engine):
+    """Let the compressor reuse the compressed generatedCode of a generate payload
+
+    The code is cached per generation cache key, but the body around it
+    (INSERT_ID, timestamps) differs on every response.
+    """
+    compressor.add_segment(
+        response,
+        application_code_key(payload['module'], payload['moduleDatabase'], engine),
+        serialization.dumps(payload['generatedCode'])
+    )
+
+def _no_progress(step):
+    pass
+
+def run_generate_pipeline(prompt, engine, progress=_no_progress):
+    """Run the generate steps for one prompt and return the response payload
+
+    ``progress`` is called with the name of each step as it starts.
+    Concurrent calls for the same normalized prompt and engine in this
+    process share one execution, and each caller's ``progress`` sees its
+    steps. Across processes, the unique NAME_KEY
+    columns turn the inserts into insert-or-fetch, so racing requests end
+    up with the same project, module and table.
+    """
+    key = (normalize_prompt(prompt), llm_engines.resolve(engine))
+    return generate_flight.run(key, _generate_pipeline, prompt, engine, progress=progress)
+
+def _generate_pipeline(prompt, engine, progress):
+    steps = StepTimer(pipeline_step_seconds, 'generate')
+
+    def report(step):
+        steps.mark(step)
+        progress(step)
+    
+    metadata = _store_generation(prompt, engine, steps, report)
+    
+    # Step 5: Generate application code (after the connection is released)
+    report('generate_code')
+    generated_code = cached_application_code(prompt, metadata['module'], metadata['moduleDatabase'], engine)
+    steps.finish()
+    
+    return {
+        'success': True,
+        'message': 'Code generated successfully',
+        **metadata,
+        'generatedCode': generated_code
+    }
+
+def run_generate_stream(prompt, engine):
+    """Yield the generate response as Server-Sent Events
+
+    A ``metadata`` event (project, module, matchScores, moduleDatabase and
+    llmOutput) is sent as soon as steps 1-4 have committed, then one
+    ``code`` event per chunk of generated code as the engine produces it,
+    and finally ``done``. Failures end the stream with an ``error`` event.
+    """
+    steps = StepTimer(pipeline_step_seconds, 'generate_stream')
+    try:
+        key = (normalize_prompt(prompt), llm_engines.resolve(engine), 'metadata')
+        metadata = generate_flight.run(key, _store_generation, prompt, engine, steps, steps.mark)
+        yield serialization.sse_event('metadata', metadata)
         
-        # Step 1: Store LLM output
-        llm_output = f"Generated output for prompt: {prompt} using engine: {engine}"
+        steps.mark('generate_code')
+        for chunk in stream_application_code(prompt, metadata['module'], metadata['moduleDatabase'], engine):
+            yield serialization.sse_event('code', {'text': chunk})
+        steps.finish()
+        yield serialization.sse_event('done', {'success': True, 'message': 'Code generated successfully'})
+    except Exception as e:
+        print(f"Error generating code: {e}")
+        yield serialization.sse_event('error', {'success': False, 'message': f'Error generating code: {str(e)}'})
+
+def _store_generation(prompt, engine, steps, report):
+    """Run generate steps 1-4 and return the response metadata
+
+    Every row the request touches is committed before this returns, and
+    the DDL for a new table has been queued.
+    """
+    # Generate a unique ID for this request
+    request_id = str(uuid.uuid4())
+    names = generated_names(prompt)
+    
+    # Step 1: Get the LLM output, and the DDL of the table a new module
+    # would get, before a connection is checked out
+    report('llm_output')
+    llm_output = llm_engines.complete(engine, 'llm_output', prompt, {'engine': engine})
+    statements = {names['table']: cached_table_creation_statement(names['table'], prompt, engine)}
+    
+    def store(cursor):
+        # List-cache tags touched by this transaction's inserts
+        written_tags = []
+        # Table definitions this transaction inserted, to be applied once it commits
+        pending_ddl = []
+        # The output body is stored compressed, once per distinct text
+        [output_hash] = store_outputs(cursor, [llm_output])
         cursor.execute(
-            "INSERT INTO AIA_LLM_OUTPUTS (PROMPT, ENGINE, OUTPUT, INSERT_ID) VALUES (%s, %s, %s, %s)",
-            (prompt, engine, llm_output, request_id)
+            "INSERT INTO AIA_LLM_OUTPUTS (PROMPT, ENGINE, OUTPUT_HASH, INSERT_ID) VALUES (%s, %s, %s, %s)",
+            (prompt, engine, output_hash, request_id)
         )
         llm_output_id = cursor.lastrowid
-        
+    
         # Step 2: Check for similar projects
-        cursor.execute(
-            "SELECT * FROM AIA_PROJECT WHERE PROJECT_NAME LIKE %s OR PROJECT_DESCRIPTION LIKE %s LIMIT 1",
-            (f"%{prompt}%", f"%{prompt}%")
-        )
-        existing_project = cursor.fetchone()
-        
-        if existing_project:
-            project_id = existing_project['PROJECT_ID']
-            project = existing_project
-        else:
-            # Create new project
-            project_name = f"{prompt.title()} Project"
+        report('project')
+        project, project_score = find_similar(cursor, project_index, prompt)
+    
+        if not project:
+            # Create new project, or fetch the one a concurrent request just created
+            project_name = names['project']
             project_description = f"Project generated from prompt: {prompt}"
-            cursor.execute(
-                "INSERT INTO AIA_PROJECT (PROJECT_NAME, PROJECT_DESCRIPTION, MODULE_DESCRIPTION, INSERT_ID) VALUES (%s, %s, %s, %s)",
-                (project_name, project_description, "", request_id)
-            )
-            project_id = cursor.lastrowid
-            project = {
-                'PROJECT_ID': project_id,
+            project_id, project = insert_or_fetch(cursor, 'AIA_PROJECT', {
                 'PROJECT_NAME': project_name,
                 'PROJECT_DESCRIPTION': project_description,
                 'MODULE_DESCRIPTION': "",
-                'INSERT_ID': request_id,
-                'INSERT_DATE_TIME': datetime.datetime.now().isoformat()
-            }
-        
+                'NAME_KEY': name_key(project_name),
+                'INSERT_ID': request_id
+            })
+            if project:
+                project_score = 1.0
+            else:
+                project_index.add(project_id, project_name, project_description)
+                written_tags += table_tags('AIA_PROJECT')
+                project = {
+                    'PROJECT_ID': project_id,
+                    'PROJECT_NAME': project_name,
+                    'PROJECT_DESCRIPTION': project_description,
+                    'MODULE_DESCRIPTION': "",
+                    'NAME_KEY': name_key(project_name),
+                    'INSERT_ID': request_id,
+                    'INSERT_DATE_TIME': datetime.datetime.now().isoformat()
+                }
+        project_id = project['PROJECT_ID']
+    
         # Step 3: Check for similar modules
-        cursor.execute(
-            "SELECT * FROM AIA_MODULE WHERE MODULE_NAME LIKE %s OR MODULE_DESCRIPTION LIKE %s LIMIT 1",
-            (f"%{prompt}%", f"%{prompt}%")
-        )
-        existing_module = cursor.fetchone()
-        
-        if existing_module:
-            module_id = existing_module['MODULE_ID']
-            module = existing_module
-        else:
-            # Create new module
-            module_name = f"{prompt.title()} Module"
+        report('module')
+        module, module_score = find_similar(cursor, module_index, prompt)
+    
+        if not module:
+            # Create new module, or fetch the one a concurrent request just created
+            module_name = names['module']
             module_description = f"Module generated from prompt: {prompt}"
-            table_name = f"{prompt.lower().replace(' ', '_')}_table"
-            cursor.execute(
-                "INSERT INTO AIA_MODULE (MODULE_NAME, MODULE_DESCRIPTION, PROJECT_ID, DATABASE_TABLE, INSERT_ID) VALUES (%s, %s, %s, %s, %s)",
-                (module_name, module_description, project_id, table_name, request_id)
-            )
-            module_id = cursor.lastrowid
-            module = {
-                'MODULE_ID': module_id,
+            table_name = names['table']
+            module_id, module = insert_or_fetch(cursor, 'AIA_MODULE', {
                 'MODULE_NAME': module_name,
                 'MODULE_DESCRIPTION': module_description,
                 'PROJECT_ID': project_id,
                 'DATABASE_TABLE': table_name,
-                'INSERT_ID': request_id,
-                'INSERT_DATE_TIME': datetime.datetime.now().isoformat()
-            }
-        
+                'NAME_KEY': name_key(module_name),
+                'INSERT_ID': request_id
+            })
+            if module:
+                module_score = 1.0
+            else:
+                module_index.add(module_id, module_name, module_description)
+                written_tags += table_tags('AIA_MODULE', PROJECT_ID=project_id)
+                module = {
+                    'MODULE_ID': module_id,
+                    'MODULE_NAME': module_name,
+                    'MODULE_DESCRIPTION': module_description,
+                    'PROJECT_ID': project_id,
+                    'DATABASE_TABLE': table_name,
+                    'NAME_KEY': name_key(module_name),
+                    'INSERT_ID': request_id,
+                    'INSERT_DATE_TIME': datetime.datetime.now().isoformat()
+                }
+        module_id = module['MODULE_ID']
+    
         # Step 4: Check for database table
+        report('module_database')
         cursor.execute(
             "SELECT * FROM AIA_MODULE_DATABASES WHERE MODULE_ID = %s OR DATABASE_TABLE = %s LIMIT 1",
             (module_id, module.get('DATABASE_TABLE'))
         )
-        existing_db = cursor.fetchone()
-        
-        if existing_db:
-            module_database = existing_db
-        else:
+        module_database = cursor.fetchone()
+    
+        if not module_database:
             # Create new database table definition
             table_name = module.get('DATABASE_TABLE')
-            creation_statement = generate_table_creation_statement(table_name, prompt)
-            cursor.execute(
-                "INSERT INTO AIA_MODULE_DATABASES (MODULE_ID, DATABASE_TABLE, CREATION_STATEMENT, INSERT_ID) VALUES (%s, %s, %s, %s)",
-                (module_id, table_name, creation_statement, request_id)
-            )
-            module_database_id = cursor.lastrowid
-            module_database = {
-                'MODULE_DATABASE_ID': module_database_id,
+            if table_name not in statements:
+                # A matched module without a definition names another table
+                raise MissingTableStatement({table_name: (prompt, engine)})
+            creation_statement = statements[table_name]
+            column_catalog = catalog_json(creation_statement)
+            module_database_id, module_database = insert_or_fetch(cursor, 'AIA_MODULE_DATABASES', {
                 'MODULE_ID': module_id,
                 'DATABASE_TABLE': table_name,
                 'CREATION_STATEMENT': creation_statement,
-                'INSERT_ID': request_id,
-                'INSERT_DATE_TIME': datetime.datetime.now().isoformat()
-            }
-            
-            # Actually create the table in the database
+                'COLUMN_CATALOG': column_catalog,
+                'DDL_STATUS': 'pending',
+                'NAME_KEY': name_key(table_name),
+                'INSERT_ID': request_id
+            })
+            if not module_database:
+                written_tags += table_tags('AIA_MODULE_DATABASES', MODULE_ID=module_id)
+                # Only the request that inserted the definition queues its table
+                pending_ddl.append(module_database_id)
+                module_database = {
+                    'MODULE_DATABASE_ID': module_database_id,
+                    'MODULE_ID': module_id,
+                    'DATABASE_TABLE': table_name,
+                    'CREATION_STATEMENT': creation_statement,
+                    'COLUMN_CATALOG': column_catalog,
+                    'DDL_STATUS': 'pending',
+                    'NAME_KEY': name_key(table_name),
+                    'INSERT_ID': request_id,
+                    'INSERT_DATE_TIME': datetime.datetime.now().isoformat()
+                }
+    
+        steps.mark('commit')
+        return llm_output_id, project, project_score, module, module_score, module_database, written_tags, pending_ddl
+    
+    while True:
+        try:
+            llm_output_id, project, project_score, module, module_score, module_database, written_tags, \
+                pending_ddl = run_transaction(store)
+            break
+        except MissingTableStatement as missing:
+            # Rolled back; generate the DDL without holding the connection and run again
+            for table_name in missing.missing:
+                statements[table_name] = cached_table_creation_statement(table_name, prompt, engine)
+    invalidate_lists(written_tags)
+    # The table itself is created by the DDL executor, outside this request
+    for module_database_id in pending_ddl:
+        ddl_executor.submit(module_database_id)
+    
+    return {
+        'project': project,
+        'module': module,
+        'matchScores': {'project': project_score, 'module': module_score},
+        'moduleDatabase': module_database,
+        'llmOutput': {
+            'OUTPUT_ID': llm_output_id,
+            'PROMPT': prompt,
+            'ENGINE': engine,
+            'OUTPUT': llm_output,
+            'INSERT_ID': request_id,
+            'INSERT_DATE_TIME': datetime.datetime.now().isoformat()
+        }
+    }
+
+class MissingTableStatement(Exception):
+    """Raised inside a generate transaction that needs DDL it was not given
+
+    Engine calls are made before a transaction starts, so they never hold
+    a connection or row locks; the caller generates the statements in
+    ``missing`` ({table name: (prompt, engine)}) and runs the transaction
+    again.
+    """
+
+    def __init__(self, missing):
+        super().__init__(f"No creation statement generated for {', '.join(missing)}")
+        self.missing = missing
+
+# Retries of a transaction chosen as a deadlock victim or timed out on a lock
+DB_DEADLOCK_RETRIES = int(os.getenv('DB_DEADLOCK_RETRIES', 3))
+RETRYABLE_DB_ERRNOS = (1205, 1213)  # ER_LOCK_WAIT_TIMEOUT, ER_LOCK_DEADLOCK
+
+def run_transaction(work):
+    """Run ``work(cursor)`` in a transaction, commit and return its result
+
+    If MySQL aborts the transaction with a deadlock or lock wait timeout,
+    the connection is discarded and ``work`` runs again on a fresh one, up
+    to DB_DEADLOCK_RETRIES times with a short backoff.
+    """
+    attempt = 0
+    while True:
+        try:
+            with db_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+                result = work(cursor)
+                conn.commit()
+                cursor.close()
+                return result
+        except mysql.connector.Error as err:
+            if err.errno not in RETRYABLE_DB_ERRNOS or attempt >= DB_DEADLOCK_RETRIES:
+                raise
+            attempt += 1
+            print(f"Retrying transaction after MySQL error {err.errno} (attempt {attempt})")
+            time.sleep(0.05 * attempt)
+
+def generated_names(prompt):
+    """Project, module and table names the generate pipelines derive from a prompt"""
+    normalized = normalize_prompt(prompt)
+    return {
+        'project': f"{normalized.title()} Project",
+        'module': f"{normalized.title()} Module",
+        'table': table_name_for(normalized),
+    }
+
+def insert_or_fetch(cursor, table, row):
+    """Insert ``row`` unless its NAME_KEY is taken; returns (new id, None) or (None, existing row)
+
+    The existing row is read with a locking read, which sees rows committed
+    by concurrent requests after this transaction's snapshot was taken.
+    """
+    columns = list(row)
+    cursor.execute(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+        "ON DUPLICATE KEY UPDATE NAME_KEY = NAME_KEY",
+        tuple(row.values())
+    )
+    if cursor.rowcount == 1:
+        return cursor.lastrowid, None
+    cursor.execute(f"SELECT * FROM {table} WHERE NAME_KEY = %s LOCK IN SHARE MODE", (row['NAME_KEY'],))
+    return None, cursor.fetchone()
+
+def insert_or_fetch_many(cursor, table, columns, rows):
+    """Insert rows, skipping those whose NAME_KEY is taken; returns {NAME_KEY given: stored row}
+
+    A row was inserted by this call if its stored INSERT_ID is the one given.
+    The unique index compares keys with the column's collation, so the row
+    holding a key may spell it differently (``café`` for ``cafe``); such
+    keys are looked up again one by one, letting MySQL do the comparison.
+    """
+    if not rows:
+        return {}
+    cursor.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+        "ON DUPLICATE KEY UPDATE NAME_KEY = NAME_KEY",
+        rows
+    )
+    keys = [row[columns.index('NAME_KEY')] for row in rows]
+    cursor.execute(
+        f"SELECT * FROM {table} WHERE NAME_KEY IN ({', '.join(['%s'] * len(keys))}) LOCK IN SHARE MODE",
+        tuple(keys)
+    )
+    stored = {row['NAME_KEY']: row for row in cursor.fetchall()}
+    for key in keys:
+        if key not in stored:
+            cursor.execute(f"SELECT * FROM {table} WHERE NAME_KEY = %s LOCK IN SHARE MODE", (key,))
+            row = cursor.fetchone()
+            if row is None:
+                raise LookupError(f"No {table} row holds NAME_KEY {key!r} after insert")
+            stored[key] = row
+    return {key: stored[key] for key in keys}
+
+def insert_many(cursor, table, id_column, columns, rows):
+    """Insert rows with a single executemany call and return their new ids in order
+
+    Rows are found again by INSERT_ID, which must be unique within ``rows``.
+    """
+    if not rows:
+        return []
+    placeholders = ', '.join(['%s'] * len(columns))
+    cursor.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+        rows
+    )
+    # executemany sends one multi-row INSERT, so lastrowid is the first new
+    # id and the lookup below is a primary-key range read.
+    first_id = cursor.lastrowid or 0
+    key_index = columns.index('INSERT_ID')
+    keys = [row[key_index] for row in rows]
+    key_placeholders = ', '.join(['%s'] * len(keys))
+    cursor.execute(
+        f"SELECT {id_column}, INSERT_ID FROM {table} WHERE {id_column} >= %s AND INSERT_ID IN ({key_placeholders})",
+        (first_id, *keys)
+    )
+    ids = {row['INSERT_ID']: row[id_column] for row in cursor.fetchall()}
+    if len(ids) < len(keys):
+        cursor.execute(
+            f"SELECT {id_column}, INSERT_ID FROM {table} WHERE INSERT_ID IN ({key_placeholders})",
+            tuple(keys)
+        )
+        ids = {row['INSERT_ID']: row[id_column] for row in cursor.fetchall()}
+    return [ids[key] for key in keys]
+
+def fetch_by_ids(cursor, table, id_column, ids):
+    """Return {id: row} for the given primary keys with one IN query"""
+    ids = sorted(set(ids))
+    if not ids:
+        return {}
+    placeholders = ', '.join(['%s'] * len(ids))
+    cursor.execute(f"SELECT * FROM {table} WHERE {id_column} IN ({placeholders})", tuple(ids))
+    return {row[id_column]: row for row in cursor.fetchall()}
+
+def _match_batch(cursor, items, index, kind):
+    """Attach the best existing row (or None) and its score to each item"""
+    index.sync(cursor)
+    matches = {}
+    for item in items:
+        match = index.best_match(item['prompt'], MATCH_MIN_SCORE)
+        item[f'{kind}_score'] = match[1] if match else 0.0
+        matches[id(item)] = match[0] if match else None
+    rows = fetch_by_ids(cursor, index.table, index.id_column, [m for m in matches.values() if m])
+    for row_id in set(matches.values()) - set(rows) - {None}:
+        # Indexed by a request whose transaction was rolled back
+        index.remove(row_id)
+    for item in items:
+        row = rows.get(matches[id(item)])
+        item[kind] = row
+        if row is None:
+            item[f'{kind}_score'] = 0.0
+
+def run_generate_batch(items):
+    """Run the generate steps for many prompts, sharing queries and inserts
+
+    Engine calls for all prompts run concurrently before the transaction.
+    Lookups for every prompt are answered from the match indexes and one IN
+    query per table, and new rows are written with executemany in a single
+    transaction, retried by run_transaction like the single-prompt pipeline.
+    Identical new project/module names within the batch, or names a
+    concurrent request has just created, share one row. Invalid items and
+    engine failures are reported per item and do not abort the rest of the
+    batch.
+    """
+    results = [None] * len(items)
+    steps = StepTimer(pipeline_step_seconds, 'generate_batch')
+
+    def fail(item, message):
+        results[item['index']] = {'index': item['index'], 'success': False, 'message': message}
+
+    steps.mark('llm_output')
+    valid = []
+    for index, raw in enumerate(items):
+        raw = raw if isinstance(raw, dict) else {}
+        item = {'index': index, 'prompt': raw.get('prompt'), 'engine': raw.get('engine')}
+        if not item['prompt'] or not item['engine']:
+            fail(item, 'Prompt and engine are required')
+            continue
+        valid.append(item)
+    outputs = call_concurrently(
+        llm_engines.complete, [(i['engine'], 'llm_output', i['prompt'], {'engine': i['engine']}) for i in valid]
+    )
+    work = []
+    for item, output in zip(valid, outputs):
+        if isinstance(output, EngineError):
+            fail(item, f'Error generating code: {output}')
+            continue
+        item['llm_output'] = output
+        item['request_id'] = str(uuid.uuid4())
+        work.append(item)
+
+    # DDL for the table each new module would get, generated concurrently and
+    # before the transaction, so no engine call holds its connection or locks
+    statements = table_statements({
+        generated_names(i['prompt'])['table']: (i['prompt'], i['engine']) for i in reversed(work)
+    })
+
+    def store(cursor):
+        # List-cache tags touched by this transaction's inserts
+        written_tags = []
+        # Table definitions this transaction inserted, to be applied once it commits
+        pending_ddl = []
+        # Items whose table DDL could not be generated: index -> message
+        failed = {}
+        now = datetime.datetime.now().isoformat()
+
+        # Step 1: Store LLM outputs
+        steps.mark('store_llm_output')
+        output_hashes = store_outputs(cursor, [i['llm_output'] for i in work])
+        output_ids = insert_many(
+            cursor, 'AIA_LLM_OUTPUTS', 'OUTPUT_ID', ['PROMPT', 'ENGINE', 'OUTPUT_HASH', 'INSERT_ID'],
+            [(i['prompt'], i['engine'], output_hash, i['request_id'])
+             for i, output_hash in zip(work, output_hashes)]
+        )
+        for item, output_id in zip(work, output_ids):
+            item['llm_output_id'] = output_id
+
+        # Step 2: Match or create projects
+        steps.mark('project')
+        _match_batch(cursor, work, project_index, 'project')
+        new_projects = {}
+        for item in work:
+            if item['project'] is None:
+                name = generated_names(item['prompt'])['project']
+                new_projects.setdefault(name_key(name), {
+                    'PROJECT_NAME': name,
+                    'PROJECT_DESCRIPTION': f"Project generated from prompt: {item['prompt']}",
+                    'MODULE_DESCRIPTION': "",
+                    'NAME_KEY': name_key(name),
+                    'INSERT_ID': item['request_id'],
+                    'INSERT_DATE_TIME': now
+                })
+                item['project'] = new_projects[name_key(name)]
+        stored = insert_or_fetch_many(
+            cursor, 'AIA_PROJECT',
+            ['PROJECT_NAME', 'PROJECT_DESCRIPTION', 'MODULE_DESCRIPTION', 'NAME_KEY', 'INSERT_ID'],
+            [(p['PROJECT_NAME'], p['PROJECT_DESCRIPTION'], p['MODULE_DESCRIPTION'], p['NAME_KEY'], p['INSERT_ID'])
+             for p in new_projects.values()]
+        )
+        for key, project in new_projects.items():
+            inserted = stored[key]['INSERT_ID'] == project['INSERT_ID']
+            project.update(stored[key])
+            if inserted:
+                project_index.add(project['PROJECT_ID'], project['PROJECT_NAME'], project['PROJECT_DESCRIPTION'])
+                written_tags += table_tags('AIA_PROJECT')
+
+        # Step 3: Match or create modules
+        steps.mark('module')
+        _match_batch(cursor, work, module_index, 'module')
+        new_modules = {}
+        for item in work:
+            if item['module'] is None:
+                names = generated_names(item['prompt'])
+                new_modules.setdefault(name_key(names['module']), {
+                    'MODULE_NAME': names['module'],
+                    'MODULE_DESCRIPTION': f"Module generated from prompt: {item['prompt']}",
+                    'PROJECT_ID': item['project']['PROJECT_ID'],
+                    'DATABASE_TABLE': names['table'],
+                    'NAME_KEY': name_key(names['module']),
+                    'INSERT_ID': item['request_id'],
+                    'INSERT_DATE_TIME': now
+                })
+                item['module'] = new_modules[name_key(names['module'])]
+        stored = insert_or_fetch_many(
+            cursor, 'AIA_MODULE',
+            ['MODULE_NAME', 'MODULE_DESCRIPTION', 'PROJECT_ID', 'DATABASE_TABLE', 'NAME_KEY', 'INSERT_ID'],
+            [(m['MODULE_NAME'], m['MODULE_DESCRIPTION'], m['PROJECT_ID'], m['DATABASE_TABLE'], m['NAME_KEY'],
+              m['INSERT_ID'])
+             for m in new_modules.values()]
+        )
+        for key, module in new_modules.items():
+            inserted = stored[key]['INSERT_ID'] == module['INSERT_ID']
+            module.update(stored[key])
+            if inserted:
+                module_index.add(module['MODULE_ID'], module['MODULE_NAME'], module['MODULE_DESCRIPTION'])
+                written_tags += table_tags('AIA_MODULE', PROJECT_ID=module['PROJECT_ID'])
+
+        # Step 4: Look up table definitions for every module in one query
+        steps.mark('module_database')
+        module_ids = sorted({i['module']['MODULE_ID'] for i in work})
+        tables = sorted({i['module']['DATABASE_TABLE'] for i in work if i['module'].get('DATABASE_TABLE')})
+        conditions = [f"MODULE_ID IN ({', '.join(['%s'] * len(module_ids))})"]
+        if tables:
+            conditions.append(f"DATABASE_TABLE IN ({', '.join(['%s'] * len(tables))})")
+        cursor.execute(
+            f"SELECT * FROM AIA_MODULE_DATABASES WHERE {' OR '.join(conditions)}",
+            (*module_ids, *tables)
+        )
+        by_module = {}
+        by_table = {}
+        for row in cursor.fetchall():
+            by_module.setdefault(row['MODULE_ID'], row)
+            by_table.setdefault(row['DATABASE_TABLE'], row)
+
+        missing = {
+            item['module']['DATABASE_TABLE']: (item['prompt'], item['engine']) for item in reversed(work)
+            if item['module'].get('DATABASE_TABLE') not in statements
+            and not by_module.get(item['module']['MODULE_ID'])
+            and not by_table.get(item['module'].get('DATABASE_TABLE'))
+        }
+        if missing:
+            # Matched modules without a definition name other tables
+            raise MissingTableStatement(missing)
+
+        new_databases = {}
+        for item in work:
+            module = item['module']
+            existing = by_module.get(module['MODULE_ID']) or by_table.get(module.get('DATABASE_TABLE'))
+            if existing:
+                item['module_database'] = existing
+                continue
+            table_name = module.get('DATABASE_TABLE')
+            if name_key(table_name) not in new_databases:
+                creation_statement = statements[table_name]
+                if isinstance(creation_statement, EngineError):
+                    failed[item['index']] = f'Error generating code: {creation_statement}'
+                    continue
+                new_databases[name_key(table_name)] = {
+                    'MODULE_ID': module['MODULE_ID'],
+                    'DATABASE_TABLE': table_name,
+                    'CREATION_STATEMENT': creation_statement,
+                    'COLUMN_CATALOG': catalog_json(creation_statement),
+                    'DDL_STATUS': 'pending',
+                    'NAME_KEY': name_key(table_name),
+                    'INSERT_ID': item['request_id'],
+                    'INSERT_DATE_TIME': now
+                }
+            item['module_database'] = new_databases[name_key(table_name)]
+        stored = insert_or_fetch_many(
+            cursor, 'AIA_MODULE_DATABASES',
+            ['MODULE_ID', 'DATABASE_TABLE', 'CREATION_STATEMENT', 'COLUMN_CATALOG', 'DDL_STATUS', 'NAME_KEY',
+             'INSERT_ID'],
+            [(d['MODULE_ID'], d['DATABASE_TABLE'], d['CREATION_STATEMENT'], d['COLUMN_CATALOG'],
+              d['DDL_STATUS'], d['NAME_KEY'], d['INSERT_ID'])
+             for d in new_databases.values()]
+        )
+        for key, database in new_databases.items():
+            inserted = stored[key]['INSERT_ID'] == database['INSERT_ID']
+            database.update(stored[key])
+            if inserted:
+                # Only the request that inserted a definition queues its table
+                pending_ddl.append(database['MODULE_DATABASE_ID'])
+                written_tags += table_tags('AIA_MODULE_DATABASES', MODULE_ID=database['MODULE_ID'])
+
+        steps.mark('commit')
+        return written_tags, pending_ddl, failed
+
+    if work:
+        while True:
             try:
-                cursor.execute(creation_statement)
-            except mysql.connector.Error as err:
-                print(f"Error creating table: {err}")
-        
-        # Step 5: Generate application code
-        generated_code = generate_application_code(prompt, module, module_database)
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-        return jsonify({
+                written_tags, pending_ddl, failed = run_transaction(store)
+                break
+            except MissingTableStatement as missing:
+                # Rolled back; generate the DDL without holding the connection and run again
+                statements.update(table_statements(missing.missing))
+        invalidate_lists(written_tags)
+        for item in work:
+            if item['index'] in failed:
+                fail(item, failed[item['index']])
+        # Tables are created by the DDL executor, outside this request
+        for module_database_id in pending_ddl:
+            ddl_executor.submit(module_database_id)
+
+    # Step 5: Generate application code (after the connection is released)
+    steps.mark('generate_code')
+    for item in work:
+        if results[item['index']] is not None:
+            continue
+        try:
+            generated_code = cached_application_code(
+                item['prompt'], item['module'], item['module_database'], item['engine']
+            )
+        except EngineError as e:
+            fail(item, f'Error generating code: {e}')
+            continue
+        results[item['index']] = {
+            'index': item['index'],
             'success': True,
             'message': 'Code generated successfully',
-            'project': project,
-            'module': module,
-            'moduleDatabase': module_database,
+            'project': item['project'],
+            'module': item['module'],
+            'matchScores': {'project': item['project_score'], 'module': item['module_score']},
+            'moduleDatabase': item['module_database'],
             'llmOutput': {
-                'OUTPUT_ID': llm_output_id,
-                'PROMPT': prompt,
-                'ENGINE': engine,
-                'OUTPUT': llm_output,
-                'INSERT_ID': request_id,
+                'OUTPUT_ID': item['llm_output_id'],
+                'PROMPT': item['prompt'],
+                'ENGINE': item['engine'],
+                'OUTPUT': item['llm_output'],
+                'INSERT_ID': item['request_id'],
                 'INSERT_DATE_TIME': datetime.datetime.now().isoformat()
             },
             'generatedCode': generated_code
-        })
-        
+        }
+    steps.finish()
+    return results
+
+@app.route('/api/generate/batch', methods=['POST'])
+def generate_code_batch():
+    data = request.json
+    items = data.get('items') if isinstance(data, dict) else data
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'success': False, 'message': 'A non-empty list of items is required'}), 400
+    if len(items) > GENERATE_BATCH_MAX_ITEMS:
+        return jsonify({
+            'success': False,
+            'message': f'At most {GENERATE_BATCH_MAX_ITEMS} items are allowed per batch'
+        }), 400
+    
+    try:
+        results = run_generate_batch(items)
     except Exception as e:
-        print(f"Error generating code: {e}")
+        print(f"Error generating code batch: {e}")
         return jsonify({'success': False, 'message': f'Error generating code: {str(e)}'}), 500
+    
+    succeeded = sum(1 for result in results if result['success'])
+    response = jsonify({
+        'success': True,
+        'message': f'{succeeded} of {len(results)} items generated successfully',
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'results': results
+    })
+    for result in results:
+        if result['success']:
+            add_code_segment(response, result, result['llmOutput']['ENGINE'])
+    return response
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_queue.status(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
 
 def generate_table_creation_statement(table_name, prompt):
     """Generate a SQL table creation statement based on the prompt"""
-    # This is a simplified example - in a real application, you would use the LLM to generate this
-    
-    # Basic fields for common applications
-    fields = [
-        "id INT AUTO_INCREMENT PRIMARY KEY",
-        "name VARCHAR(255) NOT NULL",
-        "description TEXT",
-        "created_at DATETIME DEFAULT CURRENT_TIMESTAMP",
-        "updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
-    ]
-    
-    # Add fields based on prompt keywords
-    if "address" in prompt.lower() or "contact" in prompt.lower():
-        fields.extend([
-            "email VARCHAR(255)",
-            "phone VARCHAR(20)",
-            "address TEXT"
-        ])
-    
-    if "task" in prompt.lower() or "todo" in prompt.lower():
-        fields.extend([
-            "status VARCHAR(50) DEFAULT 'pending'",
-            "due_date DATETIME",
-            "priority VARCHAR(20) DEFAULT 'medium'"
-        ])
-    
-    if "product" in prompt.lower() or "inventory" in prompt.lower():
-        fields.extend([
-            "price DECIMAL(10, 2)",
-            "quantity INT DEFAULT 0",
-            "category VARCHAR(100)"
-        ])
-    
-    creation_statement = f"CREATE TABLE {table_name} (\n  " + ",\n  ".join(fields) + "\n);"
-    return creation_statement
+    # Rule-based answer used by the local stub engine for the 'table_schema' task
+    return table_rules.creation_statement(table_name, prompt)
 
-def generate_application_code(prompt, module, module_database):
+def generate_application_code(prompt, module, module_database, targets=None):
     """Generate application code based on the prompt and database structure"""
-    # This is a simplified example - in a real application, you would use the LLM to generate this
-    
-    table_name = module_database.get('DATABASE_TABLE')
-    creation_statement = module_database.get('CREATION_STATEMENT')
-    
-    # Extract field names from creation statement
-    field_matches = re.findall(r'(\w+)\s+[A-Z]+', creation_statement)
-    fields = [field for field in field_matches if field.lower() not in ('table', 'create', 'primary', 'default', 'auto_increment')]
-    
-    # Generate form fields for React component
-    form_fields = ""
-    for field in fields:
-        if field not in ('id', 'created_at', 'updated_at'):
-            form_fields += f'''
-        <div className="mb-4">
-          <label className="block text-gray-700 mb-2" htmlFor="{field}">{field.replace('_', ' ').title()}</label>
-          <input
-            type="text"
-            id="{field}"
-            name="{field}"
-            value={{formData.{field}}}
-            onChange={{handleInputChange}}
-            className="w-full px-3 py-2 border border-gray-300 rounded-md"
-          />
-        </div>'''
-    
-    # Generate table headers
-    table_headers = ""
-    for field in fields:
-        table_headers += f'<th className="py-2 px-4 border-b">{field.replace("_", " ").title()}</th>'
-    
-    # Generate table cells
-    table_cells = ""
-    for field in fields:
-        table_cells += f'<td className="py-2 px-4 border-b">{{item.{field}}}</td>'
-    
-    # Generate form data initialization
-    form_data_fields = ", ".join([f"{field}: ''" for field in fields if field != 'id'])
-    form_data_reset = ", ".join([f"{field}: ''" for field in fields if field != 'id'])
-    
-    # Generate React component
-    react_component = f"""
-// React component for {module.get('MODULE_NAME')}
-import React, {{ useState, useEffect }} from 'react';
-import axios from 'axios';
-
-function {module.get('MODULE_NAME').replace(' ', '')}Component() {{
-  const [items, setItems] = useState([]);
-  const [formData, setFormData] = useState({{
-    {form_data_fields}
-  }});
-  const [loading, setLoading] = useState(false);
-
-  useEffect(() => {{
-    fetchItems();
-  }}, []);
-
-  const fetchItems = async () => {{
-    setLoading(true);
-    try {{
-      const response = await axios.get('/api/{table_name}');
-      setItems(response.data);
-    }} catch (error) {{
-      console.error('Error fetching data:', error);
-    }} finally {{
-      setLoading(false);
-    }}
-  }};
-
-  const handleInputChange = (e) => {{
-    const {{ name, value }} = e.target;
-    setFormData(prev => ({{ ...prev, [name]: value }}));
-  }};
-
-  const handleSubmit = async (e) => {{
-    e.preventDefault();
-    try {{
-      await axios.post('/api/{table_name}', formData);
-      // Reset form
-      setFormData({{ {form_data_reset} }});
-      // Refresh list
-      fetchItems();
-    }} catch (error) {{
-      console.error('Error creating item:', error);
-    }}
-  }};
-
-  const handleDelete = async (id) => {{
-    try {{
-      await axios.delete(`/api/{table_name}/${{id}}`);
-      fetchItems();
-    }} catch (error) {{
-      console.error('Error deleting item:', error);
-    }}
-  }};
-
-  return (
-    <div className="container mx-auto p-4">
-      <h1 className="text-2xl font-bold mb-4">{module.get('MODULE_NAME')}</h1>
-      
-      <form onSubmit={{handleSubmit}} className="mb-8 bg-white p-6 rounded-lg shadow-md">
-        <h2 className="text-xl font-semibold mb-4">Add New Item</h2>
-        {form_fields}
-        
-        <button 
-          type="submit" 
-          className="bg-blue-500 text-white px-4 py-2 rounded-md hover:bg-blue-600"
-        >
-          Save
-        </button>
-      </form>
-      
-      <div className="bg-white p-6 rounded-lg shadow-md">
-        <h2 className="text-xl font-semibold mb-4">Items</h2>
-        
-        {{loading ? (
-          <p>Loading...</p>
-        ): items.length === 0 ? (
-          <p>No items found.</p>
-        ): (
-          <div className="overflow-x-auto">
-            <table className="min-w-full bg-white">
-              <thead>
-                <tr>
-                  {table_headers}
-                  <th className="py-2 px-4 border-b">Actions</th>
-                </tr>
-              </thead>
-              <tbody>
-                {{items.map(item => (
-                  <tr key={{item.id}}>
-                    {table_cells}
-                    <td className="py-2 px-4 border-b">
-                      <button 
-                        onClick={() => handleDelete(item.id)} 
-                        className="text-red-500 hover:text-red-700"
-                      >
-                        Delete
-                      </button>
-                    </td>
-                  </tr>
-                ))}}
-              </tbody>
-            </table>
-          </div>
-        )}}
-      </div>
-    </div>
-  );
-}}
-
-export default {module.get('MODULE_NAME').replace(' ', '')}Component;
-"""
-
-    # Generate API fields
-    api_fields = ", ".join([f"'{field}'" for field in fields if field not in ('id', 'created_at', 'updated_at')])
-    
-    # Generate Flask API
-    flask_api = f"""
-# Flask API for {module.get('MODULE_NAME')}
-from flask import Blueprint, request, jsonify
-from app import db
-
-{table_name}_bp = Blueprint('{table_name}', __name__)
-
-@{table_name}_bp.route('/api/{table_name}', methods=['GET'])
-def get_all():
-    cursor = db.cursor(dictionary=True)
-    cursor.execute(f"SELECT * FROM {table_name}")
-    items = cursor.fetchall()
-    cursor.close()
-    return jsonify(items)
-
-@{table_name}_bp.route('/api/{table_name}/<int:id>', methods=['GET'])
-def get_one(id):
-    cursor = db.cursor(dictionary=True)
-    cursor.execute(f"SELECT * FROM {table_name} WHERE id = %s", (id,))
-    item = cursor.fetchone()
-    cursor.close()
-    
-    if not item:
-        return jsonify({{"error": "Item not found"}}), 404
-        
-    return jsonify(item)
+    # Template-based answer used by the local stub engine for the 'application_code' task
+    return render_bundle(module, module_database, targets)
 
-@{table_name}_bp.route('/api/{table_name}', methods=['POST'])
-def create():
-    data = request.json
-    fields = [{api_fields}]
-    
-    # Filter out any fields that aren't in our table
-    filtered_data = {{k: v for k, v in data.items() if k in fields}}
-    
-    if not filtered_data:
-        return jsonify({{"error": "No valid fields provided"}}), 400
-    
-    field_names = ', '.join(filtered_data.keys())
-    placeholders = ', '.join(['%s'] * len(filtered_data))
-    
-    cursor = db.cursor()
-    query = f"INSERT INTO {table_name} ({{field_names}}) VALUES ({{placeholders}})"
-    
-    cursor.execute(query, tuple(filtered_data.values()))
-    db.commit()
-    
-    new_id = cursor.lastrowid
-    cursor.close()
-    
-    return jsonify({{"id": new_id, "message": "Item created successfully"}}), 201
+def list_rows(table, id_column, filters=None):
+    """Return one page of a metadata table as a JSON list
 
-@{table_name}_bp.route('/api/{table_name}/<int:id>', methods=['PUT'])
-def update(id):
-    data = request.json
-    fields = [{api_fields}]
-    
-    # Filter out any fields that aren't in our table
-    filtered_data = {{k: v for k, v in data.items() if k in fields}}
-    
-    if not filtered_data:
-        return jsonify({{"error": "No valid fields provided"}}), 400
-    
-    set_clause = ', '.join([f"{{field}} = %s" for field in filtered_data.keys()])
-    
-    cursor = db.cursor()
-    query = f"UPDATE {table_name} SET {{set_clause}} WHERE id = %s"
-    
-    cursor.execute(query, tuple(filtered_data.values()) + (id,))
-    db.commit()
-    
-    affected_rows = cursor.rowcount
-    cursor.close()
-    
-    if affected_rows == 0:
-        return jsonify({{"error": "Item not found or no changes made"}}), 404
-        
-    return jsonify({{"message": "Item updated successfully"}})
+    Supports ``limit``, ``cursor`` (from the X-Next-Cursor header of the
+    previous page) and ``fields`` query parameters.
+    """
+    try:
+        columns = parse_fields(request.args.get('fields'), table, id_column)
+        limit = parse_limit(request.args.get('limit'), LIST_DEFAULT_LIMIT, LIST_MAX_LIMIT)
+        token = request.args.get('cursor')
+        after = decode_cursor(token) if token else None
+    except ListQueryError as err:
+        return jsonify({'error': str(err)}), 400
 
-@{table_name}_bp.route('/api/{table_name}/<int:id>', methods=['DELETE'])
-def delete(id):
-    cursor = db.cursor()
-    cursor.execute(f"DELETE FROM {table_name} WHERE id = %s", (id,))
-    db.commit()
-    
-    affected_rows = cursor.rowcount
-    cursor.close()
-    
-    if affected_rows == 0:
-        return jsonify({{"error": "Item not found"}}), 404
-        
-    return jsonify({{"message": "Item deleted successfully"}})
-"""
+    with db_connection(read_only=True) as conn:
+        cursor = conn.cursor(dictionary=True)
+        rows, next_cursor = fetch_page(cursor, table, id_column, columns, filters, after, limit)
+        cursor.close()
+
+    response = jsonify(rows)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
-    # Combine all code
-    combined_code = f"""
-# Generated Code for {module.get('MODULE_NAME')}
+# Seconds a list read from a replica stays cached: the replica may not have
+# writes made through other processes yet, and only expiry bounds that
+REPLICA_LIST_CACHE_TTL = max(1, math.ceil(replica_router.max_lag))
 
-## Database Schema
-```sql
-{creation_statement}
-```
+def cached_list_response(tags, build_response):
+    """Serve a list route through the list cache
 
-## React Component
-```jsx
-{react_component}
-```
+    The ETag is derived from the version of every tag the list depends on,
+    so a matching If-None-Match is answered with 304 before the database
+    is queried or anything is serialized.
 
-## Flask API
-```python
-{flask_api}
-```
-"""
+    A list read from a replica may predate the current versions, so it is
+    cached for REPLICA_LIST_CACHE_TTL seconds only and gets an ETag that also
+    covers its body; that ETag never matches the early 304 check.
+    """
+    if not LIST_CACHE_ENABLED:
+        return build_response()
+    etag = list_cache.etag_for(request.path, sorted(request.args.items(multi=True)), tags)
+    # Weak comparison: compressed responses carry the ETag as W/"..."
+    if request.if_none_match.contains_weak(etag):
+        list_cache.record_not_modified()
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
 
-    return combined_code
+    entry = list_cache.get(etag)
+    if entry is None:
+        g.pop('replica_read', None)
+        response = app.make_response(build_response())
+        if response.status_code != 200:
+            return response
+        headers = {}
+        if response.headers.get('X-Next-Cursor'):
+            headers['X-Next-Cursor'] = response.headers['X-Next-Cursor']
+        body = response.get_data()
+        if g.pop('replica_read', False):
+            entry = CachedResponse(body, response.mimetype, headers, time.time(),
+                                   etag=f"{etag}-{hashlib.sha256(body).hexdigest()[:16]}")
+            list_cache.set(etag, entry, ttl=REPLICA_LIST_CACHE_TTL)
+        else:
+            entry = CachedResponse(body, response.mimetype, headers, time.time())
+            list_cache.set(etag, entry)
+
+    response = Response(entry.body, mimetype=entry.mimetype, headers=entry.headers)
+    response.set_etag(entry.etag or etag)
+    response.last_modified = datetime.datetime.fromtimestamp(entry.last_modified, datetime.timezone.utc)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def _id_filter(column, value):
+    """Return a (column, id) filter list for an optional integer query parameter"""
+    if not value:
+        return None
+    if not value.isdigit():
+        raise ListQueryError(f"Invalid {column}: {value}")
+    return [(column, int(value))]
 
 @app.route('/api/projects', methods=['GET'])
 def get_projects():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM AIA_PROJECT ORDER BY INSERT_DATE_TIME DESC")
-        projects = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
-        # Convert datetime objects to strings for JSON serialization
-        for project in projects:
-            if 'INSERT_DATE_TIME' in project and project['INSERT_DATE_TIME']:
-                project['INSERT_DATE_TIME'] = project['INSERT_DATE_TIME'].isoformat()
-        
-        return jsonify(projects)
+        return cached_list_response(
+            table_tags('AIA_PROJECT'),
+            lambda: list_rows('AIA_PROJECT', 'PROJECT_ID')
+        )
     except Exception as e:
         print(f"Error fetching projects: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/projects/<int:project_id>/tree', methods=['GET'])
+def get_project_tree(project_id):
+    """A project with its modules and their table definitions in one response
+
+    ``depth`` (0-2, default 2) limits the levels returned, and
+    ``projectFields``, ``moduleFields`` and ``databaseFields`` select columns
+    per level like ``fields`` on the list routes.
+    """
+    try:
+        depth = parse_depth(request.args.get('depth'))
+        project_columns = parse_fields(request.args.get('projectFields'), 'AIA_PROJECT', 'PROJECT_ID')
+        module_columns = parse_fields(request.args.get('moduleFields'), 'AIA_MODULE', 'MODULE_ID')
+        database_columns = parse_fields(
+            request.args.get('databaseFields'), 'AIA_MODULE_DATABASES', 'MODULE_DATABASE_ID'
+        )
+    except ListQueryError as err:
+        return jsonify({'error': str(err)}), 400
+
+    def build_response():
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor(dictionary=True)
+            tree = fetch_project_tree(cursor, project_id, depth, project_columns, module_columns, database_columns)
+            cursor.close()
+        if tree is None:
+            return jsonify({'error': 'Project not found'}), 404
+        return jsonify(tree)
+
+    tags = ['AIA_PROJECT']
+    if depth >= 1:
+        tags.append(f"AIA_MODULE:PROJECT_ID={project_id}")
+    if depth >= 2:
+        # Table definitions are tagged by MODULE_ID, so depend on the whole table
+        tags.append('AIA_MODULE_DATABASES')
+    try:
+        return cached_list_response(tags, build_response)
+    except Exception as e:
+        print(f"Error fetching project tree: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/modules/<int:module_id>/tree', methods=['GET'])
+def get_module_tree(module_id):
+    """A module with its table definitions in one response
+
+    ``depth`` (0-1, default 1) limits the levels returned, and
+    ``moduleFields`` and ``databaseFields`` select columns per level.
+    """
+    try:
+        depth = parse_depth(request.args.get('depth'), default=1, maximum=1)
+        module_columns = parse_fields(request.args.get('moduleFields'), 'AIA_MODULE', 'MODULE_ID')
+        database_columns = parse_fields(
+            request.args.get('databaseFields'), 'AIA_MODULE_DATABASES', 'MODULE_DATABASE_ID'
+        )
+    except ListQueryError as err:
+        return jsonify({'error': str(err)}), 400
+
+    def build_response():
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor(dictionary=True)
+            tree = fetch_module_tree(cursor, module_id, depth, module_columns, database_columns)
+            cursor.close()
+        if tree is None:
+            return jsonify({'error': 'Module not found'}), 404
+        return jsonify(tree)
+
+    tags = ['AIA_MODULE']
+    if depth >= 1:
+        tags.append(f"AIA_MODULE_DATABASES:MODULE_ID={module_id}")
+    try:
+        return cached_list_response(tags, build_response)
+    except Exception as e:
+        print(f"Error fetching module tree: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/modules', methods=['GET'])
 def get_modules():
     project_id = request.args.get('projectId')
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        if project_id:
-            cursor.execute("SELECT * FROM AIA_MODULE WHERE PROJECT_ID = %s ORDER BY INSERT_DATE_TIME DESC", (project_id,))
-        else:
-            cursor.execute("SELECT * FROM AIA_MODULE ORDER BY INSERT_DATE_TIME DESC")
-            
-        modules = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
-        # Convert datetime objects to strings for JSON serialization
-        for module in modules:
-            if 'INSERT_DATE_TIME' in module and module['INSERT_DATE_TIME']:
-                module['INSERT_DATE_TIME'] = module['INSERT_DATE_TIME'].isoformat()
-        
-        return jsonify(modules)
+        filters = _id_filter('PROJECT_ID', project_id)
+        tags = [f"AIA_MODULE:PROJECT_ID={filters[0][1]}"] if filters else table_tags('AIA_MODULE')
+        return cached_list_response(tags, lambda: list_rows('AIA_MODULE', 'MODULE_ID', filters))
+    except ListQueryError as err:
+        return jsonify({'error': str(err)}), 400
     except Exception as e:
         print(f"Error fetching modules: {e}")
         return jsonify({'error': str(e)}), 500
@@ -612,27 +1350,107 @@ def get_module_databases():
     module_id = request.args.get('moduleId')
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        if module_id:
-            cursor.execute("SELECT * FROM AIA_MODULE_DATABASES WHERE MODULE_ID = %s", (module_id,))
-        else:
-            cursor.execute("SELECT * FROM AIA_MODULE_DATABASES")
-            
-        module_databases = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
-        # Convert datetime objects to strings for JSON serialization
-        for db in module_databases:
-            if 'INSERT_DATE_TIME' in db and db['INSERT_DATE_TIME']:
-                db['INSERT_DATE_TIME'] = db['INSERT_DATE_TIME'].isoformat()
-        
-        return jsonify(module_databases)
+        filters = _id_filter('MODULE_ID', module_id)
+        tags = [f"AIA_MODULE_DATABASES:MODULE_ID={filters[0][1]}"] if filters else table_tags('AIA_MODULE_DATABASES')
+        return cached_list_response(
+            tags,
+            lambda: list_rows('AIA_MODULE_DATABASES', 'MODULE_DATABASE_ID', filters)
+        )
+    except ListQueryError as err:
+        return jsonify({'error': str(err)}), 400
     except Exception as e:
         print(f"Error fetching module databases: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/export/<table>', methods=['GET'])
+def export_rows(table):
+    table_name = resolve_table(table)
+    if not table_name:
+        return jsonify({'error': f'Unknown table: {table}'}), 404
+    try:
+        batch_size = parse_limit(request.args.get('batchSize'), DEFAULT_BATCH_SIZE, 10000)
+    except ListQueryError as err:
+        return jsonify({'error': str(err)}), 400
+    use_gzip = request.args.get('gzip') == '1'
+
+    def generate():
+        with db_connection(read_only=True) as conn:
+            yield from export_table(conn, table_name, batch_size, use_gzip)
+
+    filename = f"{table_name.lower()}.ndjson" + ('.gz' if use_gzip else '')
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='application/gzip' if use_gzip else 'application/x-ndjson'
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@app.route('/api/pool-stats', methods=['GET'])
+def get_pool_stats():
+    return jsonify(db_pool.stats())
+
+@app.route('/api/cache-stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify(generation_cache.stats())
+
+@app.route('/api/list-cache-stats', methods=['GET'])
+def get_list_cache_stats():
+    return jsonify(list_cache.stats())
+
+@app.route('/api/compression-stats', methods=['GET'])
+def get_compression_stats():
+    return jsonify(compressor.stats())
+
+@app.route('/api/engine-stats', methods=['GET'])
+def get_engine_stats():
+    return jsonify(llm_engines.stats())
+
+@app.route('/api/ddl-stats', methods=['GET'])
+def get_ddl_stats():
+    return jsonify(ddl_executor.stats())
+
+@app.route('/api/replica-stats', methods=['GET'])
+def get_replica_stats():
+    return jsonify(replica_router.stats())
+
+@app.route('/api/job-stats', methods=['GET'])
+def get_job_stats():
+    return jsonify(job_queue.stats())
+
+@app.route('/api/health', methods=['GET'])
+def get_health():
+    """Liveness: the process is serving requests (no database access)"""
+    return jsonify({'status': 'ok'})
+
+@app.route('/api/ready', methods=['GET'])
+def get_readiness():
+    """Readiness: a connection can be checked out and the schema is current"""
+    global schema_ready
+    try:
+        with db_connection() as conn:
+            if schema_ready:
+                version = latest_version()
+            else:
+                cursor = conn.cursor()
+                version = current_version(cursor)
+                cursor.close()
+                schema_ready = version >= latest_version()
+    except (mysql.connector.Error, PoolTimeout) as err:
+        return jsonify({'ready': False, 'message': f'Database unavailable: {err}'}), 503
+    if not schema_ready:
+        return jsonify({
+            'ready': False,
+            'message': f'Schema version {version} is behind {latest_version()}; run python migrate.py',
+            'schemaVersion': version
+        }), 503
+    return jsonify({'ready': True, 'schemaVersion': version})
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 if __name__ == '__main__':
+    # Development server; use gunicorn.conf.py in production
+    if init_db():
+        ddl_executor.sweep()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""Micro-benchmark: response serialization for list and generate payloads
+
+    python benchmarks/bench_serialization.py [--rows N ...]
+
+Compares the original path (an isoformat pass over the rows, then Flask's
+default ``json.dumps(sort_keys=True)``) with serialization.dumps using the
+standard library encoder and, when installed, orjson.
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serialization  # noqa: E402
+
+
+def make_rows(count):
+    start = datetime.datetime(2024, 1, 1, 9, 30)
+    return [{
+        'PROJECT_ID': n,
+        'PROJECT_NAME': f"Project {n} management system",
+        'INSERT_DATE_TIME': start + datetime.timedelta(minutes=n),
+    } for n in range(1, count + 1)]
+
+
+def make_generate_payload():
+    code = "import React, { useState, useEffect } from 'react';\n" * 120
+    return {
+        'success': True,
+        'message': 'Generated successfully',
+        'project': {'PROJECT_ID': 1, 'PROJECT_NAME': 'Inventory', 'INSERT_DATE_TIME': datetime.datetime(2024, 1, 1)},
+        'module': {'MODULE_ID': 2, 'PROJECT_ID': 1, 'MODULE_NAME': 'Products',
+                   'INSERT_DATE_TIME': datetime.datetime(2024, 1, 1)},
+        'moduleDatabase': {'MODULE_DATABASE_ID': 3, 'MODULE_ID': 2, 'DATABASE_TABLE': 'products',
+                           'CREATION_STATEMENT': 'CREATE TABLE products (id INT);',
+                           'INSERT_DATE_TIME': datetime.datetime(2024, 1, 1)},
+        'generatedCode': code,
+        'matchScores': {'project': 0.82, 'module': None},
+    }
+
+
+def legacy_dumps(obj):
+    # What list_rows + Flask's DefaultJSONProvider did before
+    if isinstance(obj, list):
+        for row in obj:
+            if row.get('INSERT_DATE_TIME'):
+                row['INSERT_DATE_TIME'] = row['INSERT_DATE_TIME'].isoformat()
+    return json.dumps(obj, sort_keys=True, default=str).encode()
+
+
+def stdlib_dumps(obj, _encode=json.JSONEncoder(default=serialization._default,
+                                               separators=(',', ':'), ensure_ascii=False).encode):
+    return _encode(obj).encode()
+
+
+def measure(func, make_input, iterations):
+    # Inputs are rebuilt for every call (the legacy path mutates its rows)
+    # and only the encoder call is timed.
+    best = float('inf')
+    for _ in range(3):
+        elapsed = 0.0
+        for _ in range(iterations):
+            data = make_input()
+            start = time.perf_counter()
+            func(data)
+            elapsed += time.perf_counter() - start
+        best = min(best, elapsed)
+    data = make_input()
+    tracemalloc.start()
+    func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best / iterations, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args(argv)
+
+    encoders = [('legacy', legacy_dumps), ('stdlib', stdlib_dumps)]
+    if serialization.orjson is not None:
+        encoders.append(('orjson', serialization.dumps))
+
+    cases = [(f"{count} rows", (lambda count=count: make_rows(count)), max(1, 20000 // count))
+             for count in args.rows]
+    cases.append(('generate', make_generate_payload, 2000))
+
+    print(f"{'payload':>12}  {'encoder':>7}  {'ms/call':>9}  {'speedup':>7}  {'peak KiB':>9}")
+    for label, make_input, iterations in cases:
+        legacy_time = None
+        for name, func in encoders:
+            per_call, peak = measure(func, make_input, iterations)
+            legacy_time = legacy_time or per_call
+            speedup = legacy_time / per_call
+            print(f"{label:>12}  {name:>7}  {per_call * 1e3:>9.3f}  {speedup:>6.2f}x  {peak / 1024:>9.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
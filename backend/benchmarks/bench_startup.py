@@ -0,0 +1,69 @@
+"""Cold-start benchmark: interpreter start to first served request
+
+    python benchmarks/bench_startup.py [--runs N] [--path /api/health] [--init-db]
+
+Each run starts a fresh interpreter that imports app.py and serves one
+request through the WSGI app. Reports the median time spent starting the
+interpreter, importing the app and serving the first request. ``--init-db``
+also runs the schema bootstrap between import and first request, which is
+what every import cost before it was moved out of module import.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+if {init_db}:
+    app.init_db()
+initialized = time.perf_counter()
+response = app.app.test_client().get({path!r})
+served = time.perf_counter()
+print(json.dumps({{
+    'import': imported - started,
+    'initDb': initialized - imported,
+    'firstRequest': served - initialized,
+    'status': response.status_code,
+}}))
+'''
+
+
+def run_once(path, init_db):
+    spawned = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD.format(path=path, init_db=init_db)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    total = time.perf_counter() - spawned
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['total'] = total
+    timings['interpreter'] = total - timings['import'] - timings['initDb'] - timings['firstRequest']
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--path', default='/api/health', help='First request path (default: /api/health)')
+    parser.add_argument('--init-db', action='store_true', help='Bootstrap the schema before the first request')
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.path, args.init_db) for _ in range(args.runs)]
+    print(f"{args.runs} runs, first request GET {args.path} -> {runs[-1]['status']}")
+    for key in ('interpreter', 'import', 'initDb', 'firstRequest', 'total'):
+        values = [run[key] * 1000 for run in runs]
+        print(f"{key:>13}  median {statistics.median(values):8.1f} ms   max {max(values):8.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
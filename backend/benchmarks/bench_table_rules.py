@@ -0,0 +1,88 @@
+"""Micro-benchmark: compiled table rule matcher vs. one substring check per keyword
+
+    python benchmarks/bench_table_rules.py [--prompts N] [--rules 10,100,1000]
+
+Generates synthetic rule sets of each size (three keywords and three columns
+per rule) and reports prompts matched per second by table_rules.RuleSet and
+by the original approach, a ``keyword in prompt.lower()`` check for every
+keyword of every rule. Both must select the same rules for every prompt.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from table_rules import RuleSet  # noqa: E402
+
+SYLLABLES = ['ka', 'lo', 'mi', 'tra', 'ven', 'dor', 'qui', 'sel', 'bra', 'nox', 'pel', 'zu', 'rim', 'tas']
+FILLER = ['build', 'an', 'app', 'to', 'manage', 'the', 'for', 'our', 'team', 'with', 'and', 'simple', 'tracking']
+
+
+def make_rules(count, rng):
+    words = set()
+    while len(words) < count * 3:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return [
+        {'name': f"rule{n}", 'keywords': words[n * 3:n * 3 + 3],
+         'columns': [f"r{n}_c{c} VARCHAR(50)" for c in range(3)]}
+        for n in range(count)
+    ]
+
+
+def make_prompts(rules, count, rng):
+    keywords = [keyword for rule in rules for keyword in rule['keywords']]
+    prompts = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=10) + rng.choices(keywords, k=rng.randint(0, 3))
+        rng.shuffle(words)
+        prompts.append(' '.join(words).capitalize())
+    return prompts
+
+
+def naive_matching_rules(rules, prompt):
+    return [index for index, rule in enumerate(rules)
+            if any(keyword in prompt.lower() for keyword in rule['keywords'])]
+
+
+def throughput(func, prompts):
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for prompt in prompts:
+            func(prompt)
+        best = min(best, time.perf_counter() - start)
+    return len(prompts) / best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--prompts', type=int, default=2000)
+    parser.add_argument('--rules', default='10,100,1000', help='Comma-separated rule set sizes')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    print(f"{'rules':>6}  {'compile ms':>10}  {'naive/s':>10}  {'compiled/s':>10}  {'speedup':>7}")
+    for count in (int(n) for n in args.rules.split(',')):
+        rules = make_rules(count, rng)
+        prompts = make_prompts(rules, args.prompts, rng)
+        start = time.perf_counter()
+        rule_set = RuleSet(['id INT AUTO_INCREMENT PRIMARY KEY'], rules)
+        compile_ms = (time.perf_counter() - start) * 1000
+        for prompt in prompts:
+            if rule_set.matching_rules(prompt) != naive_matching_rules(rules, prompt):
+                print(f"Rule mismatch with {count} rules for prompt: {prompt}", file=sys.stderr)
+                return 1
+        naive = throughput(lambda prompt: naive_matching_rules(rules, prompt), prompts)
+        compiled = throughput(rule_set.matching_rules, prompts)
+        print(f"{count:>6}  {compile_ms:>10.1f}  {naive:>10.0f}  {compiled:>10.0f}  {compiled / naive:>6.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""In-process MySQL stand-in for the benchmarks, backed by SQLite
+
+Implements the part of mysql.connector's connection and cursor API the
+backend uses, and translates the MySQL dialect it emits (AUTO_INCREMENT,
+ALTER TABLE ... ADD INDEX, information_schema lookups, named locks, session
+variables, replica status, locking reads, ON DUPLICATE KEY no-ops, ``%s`` parameters,
+implicit commits around DDL) to SQLite. SQLite errors are raised as the matching mysql.connector
+errors so the backend's error handling is exercised unchanged.
+
+Timings are SQLite's, not MySQL's: use the stand-in to compare revisions of
+the backend with each other, not to predict production latency.
+"""
+import datetime
+import re
+import sqlite3
+
+from mysql.connector import errors
+
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(' '))
+sqlite3.register_converter('DATETIME', lambda raw: datetime.datetime.fromisoformat(raw.decode()))
+
+_REWRITES = [
+    (re.compile(r'\bINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b', re.I), 'INTEGER PRIMARY KEY AUTOINCREMENT'),
+    (re.compile(r'\bAUTO_INCREMENT\b', re.I), ''),
+    (re.compile(r'\bON\s+UPDATE\s+CURRENT_TIMESTAMP\b', re.I), ''),
+    (re.compile(r'\bENUM\s*\([^)]*\)', re.I), 'TEXT'),
+    (re.compile(r'\)\s*(ENGINE|DEFAULT\s+CHARSET|CHARSET)\s*=[^;]*', re.I), ')'),
+    # Writes are serialized, so locking reads need no equivalent
+    (re.compile(r'\s+(LOCK\s+IN\s+SHARE\s+MODE|FOR\s+UPDATE|FOR\s+SHARE)\s*$', re.I), ''),
+    (re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\s+(\w+)\s*=\s*\1\s*$', re.I), 'ON CONFLICT DO NOTHING'),
+]
+_ADD_INDEX = re.compile(
+    r'^\s*ALTER\s+TABLE\s+(\w+)\s+ADD\s+(UNIQUE\s+)?INDEX\s+(\w+)\s*\(([^)]*)\)\s*;?\s*$', re.I
+)
+_INDEX_LOOKUP = re.compile(r'FROM\s+information_schema\.STATISTICS\b', re.I)
+_COLUMN_LOOKUP = re.compile(r'FROM\s+information_schema\.COLUMNS\b', re.I)
+_NAMED_LOCK = re.compile(r'^\s*SELECT\s+(GET_LOCK|RELEASE_LOCK)\s*\(', re.I)
+_SESSION_VARIABLE = re.compile(r'^\s*SET\s+SESSION\b', re.I)
+_REPLICA_STATUS = re.compile(r'^\s*SHOW\s+(REPLICA|SLAVE)\s+STATUS\b', re.I)
+_DDL = re.compile(r'^\s*(CREATE|ALTER|DROP|TRUNCATE|RENAME)\b', re.I)
+
+# SQLite message fragment -> (mysql.connector error class, MySQL errno)
+_ERRORS = [
+    ('already exists', errors.ProgrammingError, 1050),
+    ('no such table', errors.ProgrammingError, 1146),
+    ('no such column', errors.ProgrammingError, 1054),
+    ('UNIQUE constraint', errors.IntegrityError, 1062),
+    ('FOREIGN KEY constraint', errors.IntegrityError, 1452),
+    ('database is locked', errors.DatabaseError, 1205),
+    ('syntax error', errors.ProgrammingError, 1064),
+]
+
+
+def translate(operation, params):
+    """Return ``(sql, params)`` rewritten from MySQL to SQLite"""
+    if _NAMED_LOCK.match(operation):
+        # One process, so named locks are always granted
+        return 'SELECT 1', ()
+    if _SESSION_VARIABLE.match(operation):
+        # Session settings such as lock_wait_timeout have no SQLite equivalent
+        return 'SELECT 1', ()
+    match = _ADD_INDEX.match(operation)
+    if match:
+        table, unique, name, columns = match.groups()
+        operation = f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({columns})"
+    elif _INDEX_LOOKUP.search(operation):
+        operation = "SELECT 1 FROM sqlite_master WHERE type = 'index' AND tbl_name = %s AND name = %s LIMIT 1"
+    elif _COLUMN_LOOKUP.search(operation):
+        operation = "SELECT 1 FROM pragma_table_info(%s) WHERE name = %s LIMIT 1"
+    else:
+        for pattern, replacement in _REWRITES:
+            operation = pattern.sub(replacement, operation)
+    if params is not None:
+        operation = operation.replace('%s', '?')
+        if isinstance(params, dict):
+            raise errors.ProgrammingError(msg="Named parameters are not supported by the stand-in")
+        params = tuple(params)
+    return operation, params
+
+
+def _mysql_error(err):
+    message = str(err)
+    for fragment, cls, errno in _ERRORS:
+        if fragment in message:
+            return cls(msg=message, errno=errno)
+    return errors.DatabaseError(msg=message)
+
+
+class FakeCursor:
+    """Subset of MySQLCursor / MySQLCursorDict"""
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._dictionary = dictionary
+        self._cursor = None
+        self.description = None
+        self.lastrowid = None
+        self.rowcount = -1
+
+    @property
+    def column_names(self):
+        return tuple(d[0] for d in self.description or ())
+
+    @property
+    def with_rows(self):
+        return self.description is not None
+
+    def _run(self, operation, params, many=False):
+        db = self._connection._db
+        if _DDL.match(operation):
+            # MySQL commits implicitly before and after DDL
+            db.commit()
+        if _REPLICA_STATUS.match(operation):
+            # A primary reports no rows; a replica reports its configured lag
+            lag = self._connection.replica_lag
+            operation, params = ('SELECT 1 WHERE 0', None) if lag is None else \
+                ('SELECT %s AS Seconds_Behind_Source', (lag,))
+        try:
+            cursor = db.cursor()
+            if many:
+                sql, _ = translate(operation, ())
+                cursor.executemany(sql, [tuple(p) for p in params])
+            else:
+                sql, params = translate(operation, params)
+                cursor.execute(sql, params or ())
+        except sqlite3.Error as err:
+            raise _mysql_error(err) from err
+        if _DDL.match(operation):
+            db.commit()
+        self._cursor = cursor
+        self.description = cursor.description
+        if cursor.description is not None:
+            self.rowcount = 0
+            self.lastrowid = None
+        else:
+            self.rowcount = cursor.rowcount
+            self.lastrowid = cursor.lastrowid or None
+
+    def execute(self, operation, params=None):
+        self._run(operation, params)
+
+    def executemany(self, operation, seq_params):
+        seq_params = list(seq_params)
+        if not seq_params:
+            return
+        self._run(operation, seq_params, many=True)
+        if operation.lstrip()[:6].upper() == 'INSERT':
+            # Like a multi-row INSERT in MySQL, report the first new id
+            last = self._connection._db.execute('SELECT last_insert_rowid()').fetchone()[0]
+            self.lastrowid = last - len(seq_params) + 1 if last else None
+
+    def _convert(self, rows):
+        self.rowcount += len(rows)
+        if not self._dictionary:
+            return rows
+        names = self.column_names
+        return [dict(zip(names, row)) for row in rows]
+
+    def fetchone(self):
+        if self._cursor is None or self.description is None:
+            return None
+        row = self._cursor.fetchone()
+        return self._convert([row])[0] if row is not None else None
+
+    def fetchmany(self, size=1):
+        if self._cursor is None or self.description is None:
+            return []
+        return self._convert(self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        if self._cursor is None or self.description is None:
+            return []
+        return self._convert(self._cursor.fetchall())
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+
+
+class FakeConnection:
+    """Subset of MySQLConnection over one SQLite connection"""
+
+    unread_result = False
+
+    def __init__(self, path, busy_timeout=30.0, replica_of=None):
+        self._replica_of = replica_of
+        self._db = sqlite3.connect(
+            path, timeout=busy_timeout, detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False, isolation_level='IMMEDIATE'
+        )
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+
+    @property
+    def replica_lag(self):
+        return self._replica_of.replica_lag if self._replica_of else None
+
+    def cursor(self, dictionary=False, buffered=None, **kwargs):
+        return FakeCursor(self, dictionary=dictionary)
+
+    def commit(self):
+        self._db.commit()
+
+    def rollback(self):
+        self._db.rollback()
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        self._db.execute('SELECT 1')
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self._db.close()
+
+
+class FakeDatabase:
+    """A SQLite file standing in for one MySQL database
+
+    Pass ``connect`` to ConnectionPool in place of mysql.connector.connect.
+    """
+
+    replica_lag = None
+
+    def __init__(self, path):
+        self.path = path
+
+    def connect(self, **config):
+        return FakeConnection(self.path)
+
+
+class FakeReplica(FakeDatabase):
+    """A read replica of a FakeDatabase
+
+    It reads the primary's SQLite file, so it never actually lags;
+    ``replica_lag`` is what SHOW REPLICA STATUS reports and may be changed at
+    any time (None: replication stopped).
+    """
+
+    def __init__(self, primary, replica_lag=0):
+        super().__init__(primary.path)
+        self.replica_lag = replica_lag
+
+    def connect(self, **config):
+        return FakeConnection(self.path, replica_of=self)
@@ -0,0 +1,280 @@
+"""Reference copy of the f-string generate_application_code, kept as the
+baseline for bench_codegen.py. Not used by the application."""
+import re
+
+
+def legacy_generate_application_code(prompt, module, module_database):
+    """Generate application code based on the prompt and database structure"""
+    # This is a simplified example - in a real application, you would use the LLM to generate this
+    
+    table_name = module_database.get('DATABASE_TABLE')
+    creation_statement = module_database.get('CREATION_STATEMENT')
+    
+    # Extract field names from creation statement
+    field_matches = re.findall(r'(\w+)\s+[A-Z]+', creation_statement)
+    fields = [field for field in field_matches if field.lower() not in ('table', 'create', 'primary', 'default', 'auto_increment')]
+    
+    # Generate form fields for React component
+    form_fields = ""
+    for field in fields:
+        if field not in ('id', 'created_at', 'updated_at'):
+            form_fields += f'''
+        <div className="mb-4">
+          <label className="block text-gray-700 mb-2" htmlFor="{field}">{field.replace('_', ' ').title()}</label>
+          <input
+            type="text"
+            id="{field}"
+            name="{field}"
+            value={{formData.{field}}}
+            onChange={{handleInputChange}}
+            className="w-full px-3 py-2 border border-gray-300 rounded-md"
+          />
+        </div>'''
+    
+    # Generate table headers
+    table_headers = ""
+    for field in fields:
+        table_headers += f'<th className="py-2 px-4 border-b">{field.replace("_", " ").title()}</th>'
+    
+    # Generate table cells
+    table_cells = ""
+    for field in fields:
+        table_cells += f'<td className="py-2 px-4 border-b">{{item.{field}}}</td>'
+    
+    # Generate form data initialization
+    form_data_fields = ", ".join([f"{field}: ''" for field in fields if field != 'id'])
+    form_data_reset = ", ".join([f"{field}: ''" for field in fields if field != 'id'])
+    
+    # Generate React component
+    react_component = f"""
+// React component for {module.get('MODULE_NAME')}
+import React, {{ useState, useEffect }} from 'react';
+import axios from 'axios';
+
+function {module.get('MODULE_NAME').replace(' ', '')}Component() {{
+  const [items, setItems] = useState([]);
+  const [formData, setFormData] = useState({{
+    {form_data_fields}
+  }});
+  const [loading, setLoading] = useState(false);
+
+  useEffect(() => {{
+    fetchItems();
+  }}, []);
+
+  const fetchItems = async () => {{
+    setLoading(true);
+    try {{
+      const response = await axios.get('/api/{table_name}');
+      setItems(response.data);
+    }} catch (error) {{
+      console.error('Error fetching data:', error);
+    }} finally {{
+      setLoading(false);
+    }}
+  }};
+
+  const handleInputChange = (e) => {{
+    const {{ name, value }} = e.target;
+    setFormData(prev => ({{ ...prev, [name]: value }}));
+  }};
+
+  const handleSubmit = async (e) => {{
+    e.preventDefault();
+    try {{
+      await axios.post('/api/{table_name}', formData);
+      // Reset form
+      setFormData({{ {form_data_reset} }});
+      // Refresh list
+      fetchItems();
+    }} catch (error) {{
+      console.error('Error creating item:', error);
+    }}
+  }};
+
+  const handleDelete = async (id) => {{
+    try {{
+      await axios.delete(`/api/{table_name}/${{id}}`);
+      fetchItems();
+    }} catch (error) {{
+      console.error('Error deleting item:', error);
+    }}
+  }};
+
+  return (
+    <div className="container mx-auto p-4">
+      <h1 className="text-2xl font-bold mb-4">{module.get('MODULE_NAME')}</h1>
+      
+      <form onSubmit={{handleSubmit}} className="mb-8 bg-white p-6 rounded-lg shadow-md">
+        <h2 className="text-xl font-semibold mb-4">Add New Item</h2>
+        {form_fields}
+        
+        <button 
+          type="submit" 
+          className="bg-blue-500 text-white px-4 py-2 rounded-md hover:bg-blue-600"
+        >
+          Save
+        </button>
+      </form>
+      
+      <div className="bg-white p-6 rounded-lg shadow-md">
+        <h2 className="text-xl font-semibold mb-4">Items</h2>
+        
+        {{loading ? (
+          <p>Loading...</p>
+        ): items.length === 0 ? (
+          <p>No items found.</p>
+        ): (
+          <div className="overflow-x-auto">
+            <table className="min-w-full bg-white">
+              <thead>
+                <tr>
+                  {table_headers}
+                  <th className="py-2 px-4 border-b">Actions</th>
+                </tr>
+              </thead>
+              <tbody>
+                {{items.map(item => (
+                  <tr key={{item.id}}>
+                    {table_cells}
+                    <td className="py-2 px-4 border-b">
+                      <button 
+                        onClick={{() => handleDelete(item.id)}} 
+                        className="text-red-500 hover:text-red-700"
+                      >
+                        Delete
+                      </button>
+                    </td>
+                  </tr>
+                ))}}
+              </tbody>
+            </table>
+          </div>
+        )}}
+      </div>
+    </div>
+  );
+}}
+
+export default {module.get('MODULE_NAME').replace(' ', '')}Component;
+"""
+
+    # Generate API fields
+    api_fields = ", ".join([f"'{field}'" for field in fields if field not in ('id', 'created_at', 'updated_at')])
+    
+    # Generate Flask API
+    flask_api = f"""
+# Flask API for {module.get('MODULE_NAME')}
+from flask import Blueprint, request, jsonify
+from app import db
+
+{table_name}_bp = Blueprint('{table_name}', __name__)
+
+@{table_name}_bp.route('/api/{table_name}', methods=['GET'])
+def get_all():
+    cursor = db.cursor(dictionary=True)
+    cursor.execute(f"SELECT * FROM {table_name}")
+    items = cursor.fetchall()
+    cursor.close()
+    return jsonify(items)
+
+@{table_name}_bp.route('/api/{table_name}/<int:id>', methods=['GET'])
+def get_one(id):
+    cursor = db.cursor(dictionary=True)
+    cursor.execute(f"SELECT * FROM {table_name} WHERE id = %s", (id,))
+    item = cursor.fetchone()
+    cursor.close()
+    
+    if not item:
+        return jsonify({{"error": "Item not found"}}), 404
+        
+    return jsonify(item)
+
+@{table_name}_bp.route('/api/{table_name}', methods=['POST'])
+def create():
+    data = request.json
+    fields = [{api_fields}]
+    
+    # Filter out any fields that aren't in our table
+    filtered_data = {{k: v for k, v in data.items() if k in fields}}
+    
+    if not filtered_data:
+        return jsonify({{"error": "No valid fields provided"}}), 400
+    
+    field_names = ', '.join(filtered_data.keys())
+    placeholders = ', '.join(['%s'] * len(filtered_data))
+    
+    cursor = db.cursor()
+    query = f"INSERT INTO {table_name} ({{field_names}}) VALUES ({{placeholders}})"
+    
+    cursor.execute(query, tuple(filtered_data.values()))
+    db.commit()
+    
+    new_id = cursor.lastrowid
+    cursor.close()
+    
+    return jsonify({{"id": new_id, "message": "Item created successfully"}}), 201
+
+@{table_name}_bp.route('/api/{table_name}/<int:id>', methods=['PUT'])
+def update(id):
+    data = request.json
+    fields = [{api_fields}]
+    
+    # Filter out any fields that aren't in our table
+    filtered_data = {{k: v for k, v in data.items() if k in fields}}
+    
+    if not filtered_data:
+        return jsonify({{"error": "No valid fields provided"}}), 400
+    
+    set_clause = ', '.join([f"{{field}} = %s" for field in filtered_data.keys()])
+    
+    cursor = db.cursor()
+    query = f"UPDATE {table_name} SET {{set_clause}} WHERE id = %s"
+    
+    cursor.execute(query, tuple(filtered_data.values()) + (id,))
+    db.commit()
+    
+    affected_rows = cursor.rowcount
+    cursor.close()
+    
+    if affected_rows == 0:
+        return jsonify({{"error": "Item not found or no changes made"}}), 404
+        
+    return jsonify({{"message": "Item updated successfully"}})
+
+@{table_name}_bp.route('/api/{table_name}/<int:id>', methods=['DELETE'])
+def delete(id):
+    cursor = db.cursor()
+    cursor.execute(f"DELETE FROM {table_name} WHERE id = %s", (id,))
+    db.commit()
+    
+    affected_rows = cursor.rowcount
+    cursor.close()
+    
+    if affected_rows == 0:
+        return jsonify({{"error": "Item not found"}}), 404
+        
+    return jsonify({{"message": "Item deleted successfully"}})
+"""
+
+    # Combine all code
+    combined_code = f"""
+# Generated Code for {module.get('MODULE_NAME')}
+
+## Database Schema
+```sql
+{creation_statement}
+```
+
+## React Component
+```jsx
+{react_component}
+```
+
+## Flask API
+```python
+{flask_api}
+```
+"""
+
+    return combined_code
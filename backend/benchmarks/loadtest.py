@@ -0,0 +1,368 @@
+"""Load test for the Flask backend against a seeded stand-in database
+
+    python benchmarks/loadtest.py --rows 1k --concurrency 8 --requests 400
+    python benchmarks/loadtest.py --rows 100k --save benchmarks/baselines/100k.json
+    python benchmarks/loadtest.py --rows 100k --compare benchmarks/baselines/100k.json
+
+Requests go through the real WSGI app (one Flask test client per worker
+thread), so routing, serialization, caching, pooling and SQL all run as in
+production; only the network hop is missing. By default the database is an
+in-process SQLite stand-in (fake_mysql.py) in a temporary directory.
+``--database mysql`` uses the DB_* settings from the environment instead,
+which must point at a disposable database: it is migrated, seeded and
+written to by the generate scenario. ``--replicas N`` routes list reads to N
+stand-in replicas (with ``--database mysql``, set DB_REPLICA_HOSTS instead).
+
+Each scenario reports throughput, latency percentiles, errors, SQL
+statements per request (from the backend's own instrumentation) and the
+mean Server-Timing breakdown. ``--save`` writes the results as a JSON
+baseline. ``--compare`` exits with status 1 if, for any scenario in the
+baseline, throughput fell or p95 latency rose by more than ``--tolerance``,
+or it issued more statements per request or had more errors.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = [
+    'inventory', 'customer', 'invoice', 'task', 'project', 'contact', 'order', 'product', 'employee',
+    'payroll', 'ticket', 'support', 'booking', 'hotel', 'flight', 'student', 'course', 'grade',
+    'library', 'book', 'member', 'event', 'venue', 'recipe', 'meal', 'fitness', 'workout', 'patient',
+    'appointment', 'clinic', 'vehicle', 'fleet', 'shipment', 'warehouse', 'supplier', 'budget',
+    'expense', 'asset', 'lease', 'property', 'tenant', 'survey', 'feedback', 'campaign', 'lead',
+    'donation', 'volunteer', 'newsletter', 'subscription', 'review', 'rating', 'menu', 'table',
+    'reservation', 'parking', 'permit', 'license', 'training', 'certificate', 'timesheet',
+]
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_rows(value):
+    """Parse a row count such as ``1000``, ``100k`` or ``1M``"""
+    multiplier = {'k': 1000, 'm': 1000000}.get(value[-1:].lower(), 1)
+    number = value[:-1] if multiplier > 1 else value
+    try:
+        return int(float(number) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid row count: {value}")
+
+
+def phrase(rng, words=2):
+    return ' '.join(rng.sample(WORDS, words))
+
+
+# -- setup ------------------------------------------------------------------
+
+def load_backend(args, workdir):
+    """Import app.py and point it at the benchmark database"""
+    os.environ['LIST_CACHE_ENABLED'] = '0' if args.no_list_cache else '1'
+
+    import app as backend
+    from db_pool import ConnectionPool
+
+    if args.database == 'fake':
+        from fake_mysql import FakeDatabase
+        stand_in = FakeDatabase(os.path.join(workdir, 'loadtest.db'))
+        backend.db_pool = ConnectionPool(
+            {}, size=backend.db_pool.size, max_overflow=backend.db_pool.max_overflow,
+            timeout=backend.db_pool.timeout, connect=stand_in.connect
+        )
+        if args.replicas:
+            from fake_mysql import FakeReplica
+            from replicas import ReplicaRouter
+            backend.replica_router = ReplicaRouter(
+                {
+                    f"replica-{n}": ConnectionPool(
+                        {}, size=backend.db_pool.size, max_overflow=backend.db_pool.max_overflow,
+                        timeout=backend.db_pool.timeout, connect=FakeReplica(stand_in).connect
+                    )
+                    for n in range(args.replicas)
+                },
+                max_lag=backend.replica_router.max_lag,
+                check_interval=backend.replica_router.check_interval,
+                strategy=backend.replica_router.strategy
+            )
+    if not backend.init_db():
+        raise SystemExit("Could not initialize the benchmark database")
+    return backend
+
+
+def seed(backend, rows, batch_size=5000):
+    """Fill the AIA_* tables with ``rows`` rows each unless they already hold data"""
+    with backend.db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM AIA_PROJECT")
+        existing = cursor.fetchone()[0]
+        if existing:
+            print(f"Database already holds {existing} projects; not seeding")
+            cursor.close()
+            return existing
+
+        rng = random.Random(42)
+        start = datetime.datetime(2024, 1, 1)
+
+        def stamp(n):
+            return start + datetime.timedelta(seconds=n * 30)
+
+        def project(n):
+            name = phrase(rng).title()
+            return (f"{name} Project", f"Project generated from prompt: {name.lower()}", "", f"seed-{n}", stamp(n))
+
+        def module(n):
+            name = phrase(rng).title()
+            return (f"{name} Module", f"Module generated from prompt: {name.lower()}",
+                    rng.randint(1, rows), f"seed_{n}_table", f"seed-{n}", stamp(n))
+
+        def module_database(n):
+            table = f"seed_{n}_table"
+            return (n, table, backend.generate_table_creation_statement(table, phrase(rng)), f"seed-{n}", stamp(n))
+
+        def llm_output(n):
+            prompt = phrase(rng, 3)
+            return (prompt, 'stub', f"Generated output for prompt: {prompt} using engine: stub", f"seed-{n}", stamp(n))
+
+        plans = [
+            ('AIA_PROJECT', ('PROJECT_NAME', 'PROJECT_DESCRIPTION', 'MODULE_DESCRIPTION'), project),
+            ('AIA_MODULE', ('MODULE_NAME', 'MODULE_DESCRIPTION', 'PROJECT_ID', 'DATABASE_TABLE'), module),
+            ('AIA_MODULE_DATABASES', ('MODULE_ID', 'DATABASE_TABLE', 'CREATION_STATEMENT'), module_database),
+            ('AIA_LLM_OUTPUTS', ('PROMPT', 'ENGINE', 'OUTPUT'), llm_output),
+        ]
+        began = time.perf_counter()
+        for table, columns, make_row in plans:
+            columns = columns + ('INSERT_ID', 'INSERT_DATE_TIME')
+            sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+            for offset in range(0, rows, batch_size):
+                cursor.executemany(sql, [make_row(n) for n in range(offset + 1, min(offset + batch_size, rows) + 1)])
+                conn.commit()
+        cursor.close()
+    print(f"Seeded {rows} rows into each table in {time.perf_counter() - began:.1f}s")
+    return rows
+
+
+# -- scenarios --------------------------------------------------------------
+
+def scenarios(rows):
+    """name -> function(i, rng) returning (method, path, json body)"""
+    return {
+        'projects': lambda i, rng: ('GET', '/api/projects?limit=50', None),
+        'modules': lambda i, rng: ('GET', f'/api/modules?projectId={rng.randint(1, rows)}&limit=50', None),
+        'module-databases': lambda i, rng: (
+            'GET', f'/api/module-databases?moduleId={rng.randint(1, rows)}&limit=50', None
+        ),
+        # Half of the prompts match seeded rows, half create new ones
+        'generate': lambda i, rng: ('POST', '/api/generate', {
+            'prompt': phrase(rng) if i % 2 else f"{phrase(rng)} n{i}",
+            'engine': 'stub',
+        }),
+    }
+
+
+def parse_server_timing(header):
+    timings = {}
+    for entry in (header or '').split(','):
+        parts = entry.strip().split(';')
+        for part in parts[1:]:
+            if part.startswith('dur='):
+                timings[parts[0]] = float(part[4:])
+    return timings
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, int(round(pct / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def run_scenario(backend, make_request, requests, concurrency, warmup, seed_value, headers=None):
+    rng = random.Random(seed_value)
+    specs = [make_request(i, rng) for i in range(warmup + requests)]
+
+    def drive(batch):
+        position = iter(range(len(batch)))
+        lock = threading.Lock()
+        samples = []
+
+        def worker():
+            client = backend.app.test_client()
+            while True:
+                with lock:
+                    index = next(position, None)
+                if index is None:
+                    return
+                method, path, body = batch[index]
+                start = time.perf_counter()
+                try:
+                    response = client.open(path, method=method, json=body, headers=headers)
+                    status, timing = response.status_code, response.headers.get('Server-Timing')
+                    response.close()
+                except Exception as e:
+                    print(f"Request {method} {path} failed: {e}")
+                    status, timing = None, None
+                latency = time.perf_counter() - start
+                with lock:
+                    samples.append((latency, status, timing))
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples, time.perf_counter() - began
+
+    drive(specs[:warmup])
+    queries_before = backend.db_metrics.query_seconds.totals()[0]
+    samples, wall = drive(specs[warmup:])
+    queries = backend.db_metrics.query_seconds.totals()[0] - queries_before
+
+    latencies = sorted(latency * 1000 for latency, _, _ in samples)
+    errors = sum(1 for _, status, _ in samples if status is None or status >= 400)
+    steps = {}
+    for _, _, timing in samples:
+        for name, duration in parse_server_timing(timing).items():
+            steps.setdefault(name, []).append(duration)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'seconds': round(wall, 4),
+        'throughput': round(len(samples) / wall, 2) if wall else 0.0,
+        'latencyMs': {
+            **{f'p{pct}': round(percentile(latencies, pct), 3) for pct in PERCENTILES},
+            'mean': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            'max': round(latencies[-1], 3) if latencies else 0.0,
+        },
+        'queriesPerRequest': round(queries / len(samples), 3) if samples else 0.0,
+        'serverTimingMs': {name: round(sum(values) / len(values), 3) for name, values in steps.items()},
+    }
+
+
+# -- baselines --------------------------------------------------------------
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages for scenarios present in both runs"""
+    for key in ('rows', 'concurrency', 'database', 'listCache'):
+        if results['meta'].get(key) != baseline['meta'].get(key):
+            print(f"warning: {key} differs from the baseline "
+                  f"({results['meta'].get(key)} vs {baseline['meta'].get(key)})")
+    failures = []
+    for name, base in baseline['scenarios'].items():
+        current = results['scenarios'].get(name)
+        if current is None:
+            continue
+        if current['throughput'] < base['throughput'] * (1 - tolerance):
+            failures.append(f"{name}: throughput {current['throughput']}/s < baseline {base['throughput']}/s")
+        if current['latencyMs']['p95'] > base['latencyMs']['p95'] * (1 + tolerance):
+            failures.append(f"{name}: p95 {current['latencyMs']['p95']}ms > baseline {base['latencyMs']['p95']}ms")
+        if current['queriesPerRequest'] > base['queriesPerRequest'] + 0.01:
+            failures.append(f"{name}: {current['queriesPerRequest']} queries/request > "
+                            f"baseline {base['queriesPerRequest']}")
+        if current['errors'] > base['errors']:
+            failures.append(f"{name}: {current['errors']} errors > baseline {base['errors']}")
+    return failures
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=parse_rows, default=parse_rows('1k'),
+                        help='Rows seeded into each table, e.g. 1k, 100k, 1M (default: 1k)')
+    parser.add_argument('--database', choices=('fake', 'mysql'), default='fake',
+                        help='SQLite stand-in (default) or the MySQL database from DB_* settings')
+    parser.add_argument('--scenarios', default='projects,modules,module-databases,generate',
+                        help='Comma-separated scenarios to run, in order')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=400, help='Measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=20, help='Unmeasured requests per scenario')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for request parameters')
+    parser.add_argument('--no-list-cache', action='store_true', help='Disable the list route cache')
+    parser.add_argument('--accept-encoding', default='',
+                        help='Accept-Encoding sent with every request, e.g. gzip or br (default: none)')
+    parser.add_argument('--replicas', type=int, default=0,
+                        help='Stand-in read replicas for the list routes (--database fake only)')
+    parser.add_argument('--save', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Allowed relative throughput/p95 regression (default: 0.15)')
+    args = parser.parse_args(argv)
+
+    available = scenarios(args.rows)
+    selected = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in selected if name not in available]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)} (choose from {', '.join(available)})")
+
+    with tempfile.TemporaryDirectory(prefix='aia-loadtest-') as workdir:
+        backend = load_backend(args, workdir)
+        seed(backend, args.rows)
+
+        results = {
+            'meta': {
+                'rows': args.rows,
+                'database': args.database,
+                'concurrency': args.concurrency,
+                'requests': args.requests,
+                'listCache': not args.no_list_cache,
+                'replicas': args.replicas,
+                'acceptEncoding': args.accept_encoding or None,
+                'revision': git_revision(),
+                'python': platform.python_version(),
+                'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            },
+            'scenarios': {},
+        }
+        print(f"{'scenario':>16}  {'req/s':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  "
+              f"{'max ms':>8}  {'queries':>7}  {'errors':>6}")
+        for index, name in enumerate(selected):
+            result = run_scenario(
+                backend, available[name], args.requests, args.concurrency, args.warmup, args.seed + index,
+                headers={'Accept-Encoding': args.accept_encoding} if args.accept_encoding else None
+            )
+            results['scenarios'][name] = result
+            latency = result['latencyMs']
+            print(f"{name:>16}  {result['throughput']:>8.1f}  {latency['p50']:>8.2f}  {latency['p95']:>8.2f}  "
+                  f"{latency['p99']:>8.2f}  {latency['max']:>8.2f}  {result['queriesPerRequest']:>7.2f}  "
+                  f"{result['errors']:>6}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"Results written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        failures = compare(results, baseline, args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            return 1
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""Template-compiled application code generator
+
+Templates use ``<%= name %>`` placeholders. Each one is parsed and compiled
+once at import time, so rendering is a single join over precomputed
+segments instead of per-request f-string assembly and ``+=`` loops.
+
+Output targets (React component, Flask blueprint, ...) are registered with
+``register_target`` and rendered into one markdown bundle. New targets only
+need a template and a function that builds its placeholder values.
+"""
+import functools
+import os
+import re
+
+from schema_catalog import column_catalog
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generator_templates')
+
+_PLACEHOLDER_RE = re.compile(r'<%=\s*(\w+)\s*%>')
+
+# Columns filled in by the database rather than by a form
+_GENERATED_COLUMNS = frozenset(('id', 'created_at', 'updated_at'))
+
+
+class Template:
+    """A template compiled into a Python function
+
+    The source is split once into literal segments and placeholders, and
+    turned into a function whose body is a single ``''.join`` over a tuple
+    of constant literals and context lookups, so rendering does no parsing
+    and builds the output string in one pass.
+    """
+
+    __slots__ = ('source', 'names', 'segments', 'render')
+
+    def __init__(self, source):
+        self.source = source
+        segments = []
+        pos = 0
+        for match in _PLACEHOLDER_RE.finditer(source):
+            if match.start() > pos:
+                segments.append((False, source[pos:match.start()]))
+            segments.append((True, match.group(1)))
+            pos = match.end()
+        if pos < len(source):
+            segments.append((False, source[pos:]))
+        self.segments = tuple(segments)
+        self.names = frozenset(value for is_name, value in segments if is_name)
+        self.render = self._compile(segments)
+
+    @staticmethod
+    def _compile(segments):
+        items = [f"c[{value!r}]" if is_name else repr(value) for is_name, value in segments]
+        if not items:
+            body = "''"
+        elif len(items) == 1:
+            body = f"str({items[0]})"
+        else:
+            body = f"''.join(({', '.join(items)},))"
+        namespace = {}
+        exec(f"def render(c):\n    return {body}\n", namespace)
+        return namespace['render']
+
+
+_SECTION_HEADING = Template('''
+## <%= title %>
+```<%= language %>
+
+''')
+
+
+def load_template(filename):
+    """Read and compile a template from the generator_templates directory"""
+    with open(os.path.join(TEMPLATE_DIR, filename), 'r', encoding='utf-8') as f:
+        return Template(f.read())
+
+
+class Target:
+    """One generated artifact in the output bundle"""
+
+    def __init__(self, name, title, language, template, build_context):
+        self.name = name
+        self.title = title
+        self.language = language
+        self.template = template
+        self.build_context = build_context
+        self.heading = _SECTION_HEADING.render({'title': title, 'language': language})
+
+    def render(self, spec):
+        return self.template.render(self.build_context(spec))
+
+
+TARGETS = {}
+DEFAULT_TARGETS = []
+
+
+def register_target(target, default=True):
+    """Make a target available by name, optionally including it by default"""
+    TARGETS[target.name] = target
+    if default and target.name not in DEFAULT_TARGETS:
+        DEFAULT_TARGETS.append(target.name)
+    return target
+
+
+def build_spec(module, module_database):
+    """Collect everything the targets need from the module metadata"""
+    columns = column_catalog(module_database)
+    return {
+        'module_name': module.get('MODULE_NAME'),
+        'table_name': module_database.get('DATABASE_TABLE'),
+        'creation_statement': module_database.get('CREATION_STATEMENT'),
+        'columns': columns,
+        'fields': tuple(column['name'] for column in columns),
+    }
+
+
+# -- React target -------------------------------------------------------------
+
+_FORM_FIELD = Template('''
+        <div className="mb-4">
+          <label className="block text-gray-700 mb-2" htmlFor="<%= field %>"><%= label %></label>
+          <input
+            type="text"
+            id="<%= field %>"
+            name="<%= field %>"
+            value={formData.<%= field %>}
+            onChange={handleInputChange}
+            className="w-full px-3 py-2 border border-gray-300 rounded-md"
+          />
+        </div>''')
+_TABLE_HEADER = Template('<th className="py-2 px-4 border-b"><%= label %></th>')
+_TABLE_CELL = Template('<td className="py-2 px-4 border-b">{item.<%= field %>}</td>')
+
+
+@functools.lru_cache(maxsize=4096)
+def _field_fragments(field):
+    # Column names repeat across nearly every generated table, so each
+    # field's form/header/cell markup is rendered once and reused.
+    context = {'field': field, 'label': field.replace('_', ' ').title()}
+    form_field = '' if field in _GENERATED_COLUMNS else _FORM_FIELD.render(context)
+    return form_field, _TABLE_HEADER.render(context), _TABLE_CELL.render(context)
+
+
+def _react_context(spec):
+    fields = spec['fields']
+    fragments = [_field_fragments(field) for field in fields]
+    form_data = ", ".join([f"{field}: ''" for field in fields if field != 'id'])
+    return {
+        'module_name': spec['module_name'],
+        'component_name': spec['module_name'].replace(' ', ''),
+        'table_name': spec['table_name'],
+        'form_data_fields': form_data,
+        'form_data_reset': form_data,
+        'form_fields': ''.join([f[0] for f in fragments]),
+        'table_headers': ''.join([f[1] for f in fragments]),
+        'table_cells': ''.join([f[2] for f in fragments]),
+    }
+
+
+# -- Flask target -------------------------------------------------------------
+
+def _flask_context(spec):
+    return {
+        'module_name': spec['module_name'],
+        'table_name': spec['table_name'],
+        'api_fields': ", ".join(
+            f"'{field}'" for field in spec['fields'] if field not in _GENERATED_COLUMNS
+        ),
+    }
+
+
+register_target(Target('react', 'React Component', 'jsx',
+                       load_template('react_component.jsx.tpl'), _react_context))
+register_target(Target('flask', 'Flask API', 'python',
+                       load_template('flask_api.py.tpl'), _flask_context))
+
+
+# -- Bundle -------------------------------------------------------------------
+
+_BUNDLE_HEADING = Template('''
+# Generated Code for <%= module_name %>
+
+## Database Schema
+```sql
+<%= creation_statement %>
+```
+''')
+_SECTION_END = '\n```\n'
+
+
+def iter_bundle(module, module_database, targets=None):
+    """Yield the markdown bundle one section at a time
+
+    The database schema section comes first, then one section per target,
+    each rendered only when the previous one has been consumed.
+    """
+    spec = build_spec(module, module_database)
+    yield _BUNDLE_HEADING.render(spec)
+    for name in targets or DEFAULT_TARGETS:
+        target = TARGETS[name]
+        yield ''.join((target.heading, target.render(spec), _SECTION_END))
+
+
+def render_bundle(module, module_database, targets=None):
+    """Render the markdown bundle for the given (or default) targets"""
+    return ''.join(iter_bundle(module, module_database, targets))
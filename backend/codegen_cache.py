@@ -0,0 +1,165 @@
+"""Content-addressed cache for generated code
+
+Entries are keyed by a SHA-256 of everything the generator's output depends
+on, so a key never needs invalidating: a different schema or generator
+version simply produces a different key. An in-process LRU tier is backed by
+an optional on-disk tier shared by all workers on the host.
+"""
+import collections
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+
+def cache_key(*parts):
+    """Return a stable hex digest for the given key parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = ('' if part is None else str(part)).encode()
+        # Length-prefix each part so ('ab', 'c') and ('a', 'bc') differ
+        digest.update(len(data).to_bytes(8, 'big'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class GenerationCache:
+    """Two-tier (memory LRU + optional disk) cache of generated text"""
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, ttl=None, disk_dir=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._disk_errors = 0
+
+    # -- memory tier ------------------------------------------------------
+
+    def _get_memory(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        if self.ttl and now - stored_at > self.ttl:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_memory(self, key, value, now):
+        if key in self._entries:
+            self._drop(key)
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, now)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._evictions += 1
+
+    def _drop(self, key):
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    # -- disk tier --------------------------------------------------------
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + '.txt')
+
+    def _get_disk(self, key):
+        path = self._path(key)
+        try:
+            if self.ttl and time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError:
+            self._disk_errors += 1
+            return None
+
+    def _put_disk(self, key, value):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(value)
+            # Atomic rename so concurrent readers never see a partial file
+            os.replace(tmp, path)
+        except OSError as err:
+            self._disk_errors += 1
+            print(f"Error writing code cache entry: {err}")
+
+    # -- public API -------------------------------------------------------
+
+    def get(self, key):
+        """Return the cached value for ``key`` or None"""
+        now = time.monotonic()
+        with self._lock:
+            value = self._get_memory(key, now)
+            if value is not None:
+                self._memory_hits += 1
+                return value
+        if self.disk_dir:
+            value = self._get_disk(key)
+            if value is not None:
+                with self._lock:
+                    self._disk_hits += 1
+                    self._put_memory(key, value, now)
+                return value
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._put_memory(key, value, time.monotonic())
+        if self.disk_dir:
+            self._put_disk(key, value)
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for ``key``, calling ``factory`` on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            lookups = hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'maxEntries': self.max_entries,
+                'maxBytes': self.max_bytes,
+                'hits': hits,
+                'memoryHits': self._memory_hits,
+                'diskHits': self._disk_hits,
+                'misses': self._misses,
+                'hitRatio': round(hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'diskErrors': self._disk_errors,
+                'diskEnabled': bool(self.disk_dir),
+            }
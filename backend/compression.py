@@ -0,0 +1,217 @@
+"""Negotiated gzip/brotli compression of API responses
+
+``ResponseCompressor.compress_response`` is installed as an after_request
+hook. It compresses a complete (not streamed) 200 response with a text or
+JSON body of at least ``min_size`` bytes, in the encoding the client
+prefers among those available: ``br`` when the brotli package is installed,
+and ``gzip``.
+
+Compressed bodies that are likely to be served again are kept in an
+in-process LRU of compressed bytes, so they are compressed once rather than
+per request. Responses with an ETag (the list routes and the project tree)
+are keyed by ETag and encoding. Other bodies are keyed by a SHA-256 of their
+content, but only from the second time the same body is seen, so one-off
+bodies such as /api/generate results do not push reusable entries out.
+
+A body that is unique as a whole can still repeat in large part: every
+/api/generate response carries a fresh INSERT_ID and timestamps around the
+same cached generatedCode. ``add_segment`` marks such a part of the body
+with a key. For a client that accepts gzip, the marked parts are deflated
+once per key and spliced between freshly deflated surrounding bytes into a
+single gzip stream. Brotli streams cannot be spliced, so gzip is used for
+these responses even when the client prefers ``br``.
+"""
+import collections
+import gzip
+import hashlib
+import struct
+import threading
+import time
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = frozenset((
+    'application/json', 'application/x-ndjson', 'application/javascript', 'image/svg+xml',
+))
+
+
+def _compressible(mimetype):
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_MIMETYPES
+
+
+class ResponseCompressor:
+    """Compresses Flask responses and caches the compressed bytes"""
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=5, cache_entries=256,
+                 cache_bytes=16 * 1024 * 1024):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_entries = cache_entries
+        self.cache_bytes = cache_bytes
+        self.encodings = ('br', 'gzip') if brotli else ('gzip',)
+
+        self._lock = threading.Lock()
+        self._cache = collections.OrderedDict()
+        self._cached_bytes = 0
+        # Digests of bodies seen once, admitted to the cache when seen again
+        self._seen = collections.OrderedDict()
+
+        self._compressed = {encoding: 0 for encoding in self.encodings}
+        self._skipped_small = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._bytes_in = 0
+        self._bytes_out = 0
+        self._cpu_seconds = 0.0
+
+    def compress(self, body, encoding):
+        """Compress ``body`` and record the bytes saved and CPU time spent"""
+        start = time.thread_time()
+        if encoding == 'br':
+            data = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            data = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        elapsed = time.thread_time() - start
+        with self._lock:
+            self._cpu_seconds += elapsed
+        return data
+
+    def _deflate(self, data):
+        """Raw deflate of ``data`` that can be followed by other deflate output"""
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush(zlib.Z_FULL_FLUSH)
+
+    def _gzip_spliced(self, body, segments):
+        """gzip ``body``, reusing the cached deflate output of each marked segment"""
+        start = time.thread_time()
+        parts = [b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff']
+        pos = 0
+        for key, segment in segments:
+            at = body.find(segment, pos)
+            if at < 0:
+                continue
+            parts.append(self._deflate(body[pos:at]))
+            cache_key = f"segment:{key}:gzip"
+            data = self._cache_get(cache_key)
+            if data is None:
+                data = self._deflate(segment)
+                self._cache_put(cache_key, data)
+            parts.append(data)
+            pos = at + len(segment)
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        parts.append(compressor.compress(body[pos:]) + compressor.flush())
+        parts.append(struct.pack('<II', zlib.crc32(body), len(body) & 0xffffffff))
+        elapsed = time.thread_time() - start
+        with self._lock:
+            self._cpu_seconds += elapsed
+        return b''.join(parts)
+
+    def add_segment(self, response, key, segment):
+        """Mark bytes ``segment`` of ``response``'s body as compressible once per ``key``
+
+        Segments must be added in the order they appear in the body.
+        """
+        response.compression_segments = getattr(response, 'compression_segments', []) + [(key, segment)]
+
+    def _cache_key(self, response, body, encoding):
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            return f"etag:{etag}:{encoding}"
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            if digest in self._seen:
+                del self._seen[digest]
+                return f"sha256:{digest}:{encoding}"
+            self._seen[digest] = True
+            if len(self._seen) > self.cache_entries * 4:
+                self._seen.popitem(last=False)
+        return None
+
+    def _cache_get(self, key):
+        with self._lock:
+            data = self._cache.get(key)
+            if data is None:
+                self._cache_misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self._cache_hits += 1
+            return data
+
+    def _cache_put(self, key, data):
+        if len(data) > self.cache_bytes:
+            return
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = data
+            self._cached_bytes += len(data)
+            while len(self._cache) > self.cache_entries or self._cached_bytes > self.cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_bytes -= len(evicted)
+
+    def compress_response(self, request, response):
+        """Compress ``response`` in place if the client accepts an available encoding"""
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers or not _compressible(response.mimetype)):
+            return response
+        response.vary.add('Accept-Encoding')
+        segments = getattr(response, 'compression_segments', None)
+        if segments and request.accept_encodings.best_match(('gzip',)):
+            encoding = 'gzip'
+        else:
+            segments = None
+            encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < self.min_size:
+            with self._lock:
+                self._skipped_small += 1
+            return response
+
+        if segments:
+            data = self._gzip_spliced(body, segments)
+        else:
+            key = self._cache_key(response, body, encoding)
+            data = self._cache_get(key) if key else None
+            if data is None:
+                data = self.compress(body, encoding)
+                if key:
+                    self._cache_put(key, data)
+        with self._lock:
+            self._compressed[encoding] += 1
+            self._bytes_in += len(body)
+            self._bytes_out += len(data)
+
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # The compressed representation is not byte-identical to the plain one
+            response.set_etag(etag, weak=True)
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                'encodings': list(self.encodings),
+                'minSize': self.min_size,
+                'compressed': sum(self._compressed.values()),
+                'gzip': self._compressed['gzip'],
+                'brotli': self._compressed.get('br', 0),
+                'skippedSmall': self._skipped_small,
+                'bytesIn': self._bytes_in,
+                'bytesOut': self._bytes_out,
+                'bytesSaved': self._bytes_in - self._bytes_out,
+                'ratio': round(self._bytes_out / self._bytes_in, 4) if self._bytes_in else 0.0,
+                'cpuSeconds': round(self._cpu_seconds, 6),
+                'cacheEntries': len(self._cache),
+                'cacheBytes': self._cached_bytes,
+                'cacheHits': self._cache_hits,
+                'cacheMisses': self._cache_misses,
+            }
@@ -0,0 +1,257 @@
+import collections
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the checkout timeout"""
+
+
+class _PooledConnection:
+    """Bookkeeping wrapper around a raw MySQL connection"""
+
+    __slots__ = ('conn', 'created_at', 'last_used')
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of MySQL connections
+
+    Up to ``size`` connections are kept open between requests. When all of
+    them are checked out, up to ``max_overflow`` extra connections may be
+    opened; those are closed again on check-in instead of being kept idle.
+    Once ``size + max_overflow`` connections are in use, callers wait up to
+    ``timeout`` seconds for one to be returned.
+    """
+
+    def __init__(self, config, size=5, max_overflow=10, timeout=30.0,
+                 recycle=3600, idle_timeout=300, pre_ping=True, connect=None):
+        self.config = dict(config)
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.idle_timeout = idle_timeout
+        self.pre_ping = pre_ping
+        self._connect = connect or mysql.connector.connect
+
+        self._cond = threading.Condition()
+        self._idle = collections.deque()
+        self._in_use = 0
+        self._waiters = 0
+        self._pid = os.getpid()
+
+        self._connects = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._invalidated = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # -- internal helpers -------------------------------------------------
+
+    def _open(self):
+        conn = self._connect(**self.config)
+        with self._cond:
+            self._connects += 1
+        return _PooledConnection(conn)
+
+    def _close(self, entry):
+        try:
+            entry.conn.close()
+        except Exception:
+            pass
+
+    def _is_stale(self, entry, now):
+        if self.recycle and now - entry.created_at > self.recycle:
+            return True
+        if self.idle_timeout and now - entry.last_used > self.idle_timeout:
+            return True
+        return False
+
+    def _is_alive(self, entry):
+        try:
+            entry.conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _check_fork(self):
+        # Connections must never be shared across a fork; a child process
+        # starts with an empty pool of its own.
+        pid = os.getpid()
+        if pid != self._pid:
+            self._pid = pid
+            self._idle = collections.deque()
+            self._in_use = 0
+            self._waiters = 0
+
+    # -- public API -------------------------------------------------------
+
+    def acquire(self):
+        """Check a connection out of the pool, opening one if allowed"""
+        start = time.monotonic()
+        deadline = start + self.timeout if self.timeout is not None else None
+        with self._cond:
+            self._check_fork()
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use + len(self._idle) < self.size + self.max_overflow:
+                    entry = None
+                    self._in_use += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"Connection pool exhausted ({self.size + self.max_overflow} in use)"
+                    )
+                self._waiters += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+
+            waited = time.monotonic() - start
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        # Connecting and pinging happen outside the lock so a slow server
+        # does not block other threads returning connections.
+        try:
+            if entry is not None:
+                now = time.monotonic()
+                if self._is_stale(entry, now):
+                    self._close(entry)
+                    entry = None
+                    with self._cond:
+                        self._recycled += 1
+                elif self.pre_ping and not self._is_alive(entry):
+                    self._close(entry)
+                    entry = None
+                    with self._cond:
+                        self._invalidated += 1
+            if entry is None:
+                entry = self._open()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return entry
+
+    def release(self, entry, discard=False):
+        """Return a checked-out connection to the pool"""
+        if not discard:
+            try:
+                conn = entry.conn
+                if getattr(conn, 'unread_result', False):
+                    discard = True
+                elif getattr(conn, 'in_transaction', False):
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            keep = not discard and len(self._idle) < self.size
+            if keep:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+            elif discard:
+                self._invalidated += 1
+            self._cond.notify()
+        if not keep:
+            self._close(entry)
+
+    @contextmanager
+    def connection(self):
+        """Yield a pooled connection, returning it to the pool on exit
+
+        Uncommitted work is rolled back on check-in, and a connection that
+        raised a MySQL error is discarded rather than reused.
+        """
+        entry = self.acquire()
+        discard = False
+        try:
+            yield entry.conn
+        except mysql.connector.Error:
+            discard = True
+            raise
+        finally:
+            self.release(entry, discard=discard)
+
+    def warm(self, count):
+        """Open connections until ``count`` (at most ``size``) are idle; returns the number opened
+
+        Used at worker start so the first requests do not pay the connect
+        cost. Connection errors are left to the first real checkout.
+        """
+        with self._cond:
+            self._check_fork()
+            missing = min(count, self.size) - len(self._idle) - self._in_use
+        opened = 0
+        for _ in range(max(0, missing)):
+            try:
+                entry = self._open()
+            except Exception as err:
+                print(f"Could not warm connection pool: {err}")
+                break
+            with self._cond:
+                full = len(self._idle) + self._in_use >= self.size
+                if not full:
+                    self._idle.append(entry)
+                    self._cond.notify()
+            if full:
+                self._close(entry)
+                break
+            opened += 1
+        return opened
+
+    def dispose(self):
+        """Close every idle connection
+
+        After a fork the inherited connections are dropped without being
+        closed: closing one would send COM_QUIT on the socket the parent
+        still uses.
+        """
+        with self._cond:
+            self._check_fork()
+            idle, self._idle = list(self._idle), collections.deque()
+        for entry in idle:
+            self._close(entry)
+
+    def stats(self):
+        """Return a snapshot of pool usage counters"""
+        with self._cond:
+            opened = self._in_use + len(self._idle)
+            return {
+                'size': self.size,
+                'maxOverflow': self.max_overflow,
+                'inUse': self._in_use,
+                'idle': len(self._idle),
+                'overflow': max(0, opened - self.size),
+                'waiters': self._waiters,
+                'checkouts': self._checkouts,
+                'connects': self._connects,
+                'timeouts': self._timeouts,
+                'recycled': self._recycled,
+                'invalidated': self._invalidated,
+                'waitTimeTotal': round(self._wait_total, 6),
+                'waitTimeMax': round(self._wait_max, 6),
+                'waitTimeAvg': round(self._wait_total / self._checkouts, 6) if self._checkouts else 0.0,
+            }
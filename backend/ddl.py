@@ -0,0 +1,194 @@
+"""Background execution of generated CREATE TABLE statements
+
+MySQL commits DDL implicitly and holds metadata locks while it runs, so the
+generate routes only record a table definition in AIA_MODULE_DATABASES
+(with DDL_STATUS 'pending') and hand its id to a DDLExecutor after their
+transaction commits. A fixed number of worker threads apply the statements
+with a bounded lock_wait_timeout and record the outcome per row:
+
+- ``pending``: waiting to be applied (or to be retried after a lock timeout)
+- ``running``: claimed by a worker
+- ``applied``: the table exists
+- ``failed``: the statement failed; DDL_ERROR holds the reason
+
+Claiming a row is a conditional UPDATE, so when several processes queue
+the same id only one of them runs the statement. ``sweep`` re-queues rows
+left pending, or left running by a process that died, by earlier processes.
+"""
+import datetime
+import queue
+import threading
+
+import mysql.connector
+
+TABLE = 'AIA_MODULE_DATABASES'
+ID_COLUMN = 'MODULE_DATABASE_ID'
+
+ER_TABLE_EXISTS = 1050
+ER_LOCK_WAIT_TIMEOUT = 1205
+
+
+class DDLExecutor:
+    """Fixed pool of worker threads applying queued table definitions
+
+    ``connection`` is a context manager factory yielding a database
+    connection (app.db_connection), so DDL draws from the same pool as
+    requests but never holds more than ``workers`` connections.
+    ``on_status`` is called with the row's MODULE_ID after each status change
+    is committed.
+    """
+
+    def __init__(self, connection, workers=2, lock_wait_timeout=5, max_attempts=3, retry_delay=1.0,
+                 stale_after=600, on_status=None):
+        self.connection = connection
+        self.on_status = on_status
+        self.workers = workers
+        self.lock_wait_timeout = lock_wait_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.stale_after = stale_after
+
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._running = 0
+        self._submitted = 0
+        self._applied = 0
+        self._failed = 0
+        self._retried = 0
+        self._skipped = 0
+
+    def _ensure_started(self):
+        # Threads are started lazily so a forking server starts them in
+        # each worker process rather than in the parent.
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"ddl-worker-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, module_database_id):
+        """Queue the table definition with this id unless it is already queued"""
+        self._ensure_started()
+        with self._lock:
+            if module_database_id in self._queued:
+                return
+            self._queued.add(module_database_id)
+            self._submitted += 1
+        self._queue.put(module_database_id)
+
+    def sweep(self, limit=1000):
+        """Queue up to ``limit`` pending definitions left by earlier processes; returns the count
+
+        Rows claimed more than ``stale_after`` seconds ago and still running
+        are assumed abandoned and made pending again first.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"UPDATE {TABLE} SET DDL_STATUS = 'pending' WHERE DDL_STATUS = 'running' AND DDL_UPDATED_AT < %s",
+                (datetime.datetime.now() - datetime.timedelta(seconds=self.stale_after),)
+            )
+            conn.commit()
+            cursor.execute(
+                f"SELECT {ID_COLUMN} FROM {TABLE} WHERE DDL_STATUS = 'pending' ORDER BY {ID_COLUMN} LIMIT %s",
+                (limit,)
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+        for module_database_id in ids:
+            self.submit(module_database_id)
+        return len(ids)
+
+    def _work(self):
+        while True:
+            module_database_id = self._queue.get()
+            with self._lock:
+                self._queued.discard(module_database_id)
+                self._running += 1
+            try:
+                self._apply(module_database_id)
+            except Exception as e:
+                print(f"Error applying table definition {module_database_id}: {e}")
+            finally:
+                with self._lock:
+                    self._running -= 1
+                self._queue.task_done()
+
+    def _apply(self, module_database_id):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"UPDATE {TABLE} SET DDL_STATUS = 'running', DDL_ATTEMPTS = DDL_ATTEMPTS + 1, "
+                f"DDL_UPDATED_AT = %s WHERE {ID_COLUMN} = %s AND DDL_STATUS = 'pending'",
+                (datetime.datetime.now(), module_database_id)
+            )
+            claimed = cursor.rowcount == 1
+            conn.commit()
+            if not claimed:
+                # Already applied, or claimed by another process
+                with self._lock:
+                    self._skipped += 1
+                cursor.close()
+                return
+            cursor.execute(
+                f"SELECT MODULE_ID, CREATION_STATEMENT, DDL_ATTEMPTS FROM {TABLE} WHERE {ID_COLUMN} = %s",
+                (module_database_id,)
+            )
+            module_id, creation_statement, attempts = cursor.fetchone()
+
+            status, error = 'applied', None
+            cursor.execute(f"SET SESSION lock_wait_timeout = {int(self.lock_wait_timeout)}")
+            try:
+                cursor.execute(creation_statement)
+            except mysql.connector.Error as err:
+                if err.errno == ER_TABLE_EXISTS:
+                    pass
+                elif err.errno == ER_LOCK_WAIT_TIMEOUT and attempts < self.max_attempts:
+                    status, error = 'pending', str(err)
+                else:
+                    status, error = 'failed', str(err)
+            finally:
+                cursor.execute("SET SESSION lock_wait_timeout = DEFAULT")
+
+            cursor.execute(
+                f"UPDATE {TABLE} SET DDL_STATUS = %s, DDL_ERROR = %s, DDL_UPDATED_AT = %s WHERE {ID_COLUMN} = %s",
+                (status, error, datetime.datetime.now(), module_database_id)
+            )
+            conn.commit()
+            cursor.close()
+
+        if self.on_status:
+            self.on_status(module_id)
+        with self._lock:
+            if status == 'applied':
+                self._applied += 1
+            elif status == 'failed':
+                self._failed += 1
+            else:
+                self._retried += 1
+        if status == 'failed':
+            print(f"Error creating table for definition {module_database_id}: {error}")
+        elif status == 'pending':
+            timer = threading.Timer(self.retry_delay * attempts, self.submit, (module_database_id,))
+            timer.daemon = True
+            timer.start()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'lockWaitTimeout': self.lock_wait_timeout,
+                'queued': self._queue.qsize(),
+                'running': self._running,
+                'submitted': self._submitted,
+                'applied': self._applied,
+                'failed': self._failed,
+                'retried': self._retried,
+                'skipped': self._skipped,
+            }
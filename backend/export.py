@@ -0,0 +1,118 @@
+"""Streaming NDJSON export of the AIA_* tables
+
+Rows are read through an unbuffered (server-side) cursor in fixed-size
+batches and written out one JSON object per line, so memory use does not
+depend on table size. Can be used from the /api/export route or from the
+command line:
+
+    python export.py AIA_LLM_OUTPUTS --gzip -o llm_outputs.ndjson.gz
+"""
+import argparse
+import sys
+import zlib
+
+from listing import TABLE_COLUMNS
+from retention import OUTPUT_TABLE, inflate_output, outputs_query
+from serialization import dumps_line
+
+EXPORT_TABLES = {
+    'projects': 'AIA_PROJECT',
+    'modules': 'AIA_MODULE',
+    'module-databases': 'AIA_MODULE_DATABASES',
+    'llm-outputs': 'AIA_LLM_OUTPUTS',
+}
+
+TABLE_ID_COLUMNS = {
+    'AIA_PROJECT': 'PROJECT_ID',
+    'AIA_MODULE': 'MODULE_ID',
+    'AIA_MODULE_DATABASES': 'MODULE_DATABASE_ID',
+    'AIA_LLM_OUTPUTS': 'OUTPUT_ID',
+}
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def resolve_table(name):
+    """Map an export alias or table name to a table name, or None"""
+    if name in EXPORT_TABLES:
+        return EXPORT_TABLES[name]
+    name = name.upper()
+    return name if name in TABLE_COLUMNS else None
+
+
+def iter_rows(conn, table, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield lists of row dicts, ``batch_size`` at a time, in primary-key order
+
+    LLM outputs are returned with their compressed bodies inflated.
+    """
+    columns = TABLE_COLUMNS[table]
+    cursor = conn.cursor(dictionary=True, buffered=False)
+    try:
+        if table == OUTPUT_TABLE:
+            cursor.execute(outputs_query(columns))
+        else:
+            cursor.execute(
+                f"SELECT {', '.join(columns)} FROM {table} ORDER BY {TABLE_ID_COLUMNS[table]}"
+            )
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            if table == OUTPUT_TABLE:
+                batch = [inflate_output(row) for row in batch]
+            yield batch
+    finally:
+        cursor.close()
+
+
+def iter_ndjson(batches):
+    """Encode batches of rows as NDJSON, one bytes chunk per batch"""
+    for batch in batches:
+        yield b''.join([dumps_line(row) for row in batch])
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip-compress a stream of chunks, flushing after each one"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_table(conn, table, batch_size=DEFAULT_BATCH_SIZE, gzip=False, level=6):
+    """Yield the encoded export of ``table`` as a stream of bytes chunks"""
+    chunks = iter_ndjson(iter_rows(conn, table, batch_size))
+    if gzip:
+        chunks = gzip_chunks(chunks, level)
+    return chunks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export an AIA_* table as NDJSON')
+    parser.add_argument('table', help='Table name or alias: ' + ', '.join(EXPORT_TABLES))
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    parser.add_argument('--gzip', action='store_true', help='Gzip-compress the output')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    table = resolve_table(args.table)
+    if not table:
+        parser.error(f"Unknown table: {args.table}")
+
+    from app import db_connection
+
+    out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        with db_connection() as conn:
+            for chunk in export_table(conn, table, args.batch_size, args.gzip):
+                out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
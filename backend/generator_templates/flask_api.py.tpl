@@ -0,0 +1,91 @@
+# Flask API for <%= module_name %>
+from flask import Blueprint, request, jsonify
+from app import db
+
+<%= table_name %>_bp = Blueprint('<%= table_name %>', __name__)
+
+@<%= table_name %>_bp.route('/api/<%= table_name %>', methods=['GET'])
+def get_all():
+    cursor = db.cursor(dictionary=True)
+    cursor.execute(f"SELECT * FROM <%= table_name %>")
+    items = cursor.fetchall()
+    cursor.close()
+    return jsonify(items)
+
+@<%= table_name %>_bp.route('/api/<%= table_name %>/<int:id>', methods=['GET'])
+def get_one(id):
+    cursor = db.cursor(dictionary=True)
+    cursor.execute(f"SELECT * FROM <%= table_name %> WHERE id = %s", (id,))
+    item = cursor.fetchone()
+    cursor.close()
+    
+    if not item:
+        return jsonify({"error": "Item not found"}), 404
+        
+    return jsonify(item)
+
+@<%= table_name %>_bp.route('/api/<%= table_name %>', methods=['POST'])
+def create():
+    data = request.json
+    fields = [<%= api_fields %>]
+    
+    # Filter out any fields that aren't in our table
+    filtered_data = {k: v for k, v in data.items() if k in fields}
+    
+    if not filtered_data:
+        return jsonify({"error": "No valid fields provided"}), 400
+    
+    field_names = ', '.join(filtered_data.keys())
+    placeholders = ', '.join(['%s'] * len(filtered_data))
+    
+    cursor = db.cursor()
+    query = f"INSERT INTO <%= table_name %> ({field_names}) VALUES ({placeholders})"
+    
+    cursor.execute(query, tuple(filtered_data.values()))
+    db.commit()
+    
+    new_id = cursor.lastrowid
+    cursor.close()
+    
+    return jsonify({"id": new_id, "message": "Item created successfully"}), 201
+
+@<%= table_name %>_bp.route('/api/<%= table_name %>/<int:id>', methods=['PUT'])
+def update(id):
+    data = request.json
+    fields = [<%= api_fields %>]
+    
+    # Filter out any fields that aren't in our table
+    filtered_data = {k: v for k, v in data.items() if k in fields}
+    
+    if not filtered_data:
+        return jsonify({"error": "No valid fields provided"}), 400
+    
+    set_clause = ', '.join([f"{field} = %s" for field in filtered_data.keys()])
+    
+    cursor = db.cursor()
+    query = f"UPDATE <%= table_name %> SET {set_clause} WHERE id = %s"
+    
+    cursor.execute(query, tuple(filtered_data.values()) + (id,))
+    db.commit()
+    
+    affected_rows = cursor.rowcount
+    cursor.close()
+    
+    if affected_rows == 0:
+        return jsonify({"error": "Item not found or no changes made"}), 404
+        
+    return jsonify({"message": "Item updated successfully"})
+
+@<%= table_name %>_bp.route('/api/<%= table_name %>/<int:id>', methods=['DELETE'])
+def delete(id):
+    cursor = db.cursor()
+    cursor.execute(f"DELETE FROM <%= table_name %> WHERE id = %s", (id,))
+    db.commit()
+    
+    affected_rows = cursor.rowcount
+    cursor.close()
+    
+    if affected_rows == 0:
+        return jsonify({"error": "Item not found"}), 404
+        
+    return jsonify({"message": "Item deleted successfully"})
@@ -0,0 +1,110 @@
+// React component for <%= module_name %>
+import React, { useState, useEffect } from 'react';
+import axios from 'axios';
+
+function <%= component_name %>Component() {
+  const [items, setItems] = useState([]);
+  const [formData, setFormData] = useState({
+    <%= form_data_fields %>
+  });
+  const [loading, setLoading] = useState(false);
+
+  useEffect(() => {
+    fetchItems();
+  }, []);
+
+  const fetchItems = async () => {
+    setLoading(true);
+    try {
+      const response = await axios.get('/api/<%= table_name %>');
+      setItems(response.data);
+    } catch (error) {
+      console.error('Error fetching data:', error);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const handleInputChange = (e) => {
+    const { name, value } = e.target;
+    setFormData(prev => ({ ...prev, [name]: value }));
+  };
+
+  const handleSubmit = async (e) => {
+    e.preventDefault();
+    try {
+      await axios.post('/api/<%= table_name %>', formData);
+      // Reset form
+      setFormData({ <%= form_data_reset %> });
+      // Refresh list
+      fetchItems();
+    } catch (error) {
+      console.error('Error creating item:', error);
+    }
+  };
+
+  const handleDelete = async (id) => {
+    try {
+      await axios.delete(`/api/<%= table_name %>/${id}`);
+      fetchItems();
+    } catch (error) {
+      console.error('Error deleting item:', error);
+    }
+  };
+
+  return (
+    <div className="container mx-auto p-4">
+      <h1 className="text-2xl font-bold mb-4"><%= module_name %></h1>
+      
+      <form onSubmit={handleSubmit} className="mb-8 bg-white p-6 rounded-lg shadow-md">
+        <h2 className="text-xl font-semibold mb-4">Add New Item</h2>
+        <%= form_fields %>
+        
+        <button 
+          type="submit" 
+          className="bg-blue-500 text-white px-4 py-2 rounded-md hover:bg-blue-600"
+        >
+          Save
+        </button>
+      </form>
+      
+      <div className="bg-white p-6 rounded-lg shadow-md">
+        <h2 className="text-xl font-semibold mb-4">Items</h2>
+        
+        {loading ? (
+          <p>Loading...</p>
+        ): items.length === 0 ? (
+          <p>No items found.</p>
+        ): (
+          <div className="overflow-x-auto">
+            <table className="min-w-full bg-white">
+              <thead>
+                <tr>
+                  <%= table_headers %>
+                  <th className="py-2 px-4 border-b">Actions</th>
+                </tr>
+              </thead>
+              <tbody>
+                {items.map(item => (
+                  <tr key={item.id}>
+                    <%= table_cells %>
+                    <td className="py-2 px-4 border-b">
+                      <button 
+                        onClick={() => handleDelete(item.id)} 
+                        className="text-red-500 hover:text-red-700"
+                      >
+                        Delete
+                      </button>
+                    </td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        )}
+      </div>
+    </div>
+  );
+}
+
+export default <%= component_name %>Component;
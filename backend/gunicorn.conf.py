@@ -0,0 +1,92 @@
+"""Gunicorn settings for serving the backend in production
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Every setting can be overridden from the environment (or .env). Workers are
+processes, each with SERVER_THREADS request threads (gthread), its own
+connection pool and its own in-process caches.
+
+List cache versions and background job status only reach other worker
+processes through a shared store, so unless LIST_CACHE_URL points at Redis
+the default is a single worker, and WEB_CONCURRENCY above 1 is refused.
+
+Reloading: with SERVER_PRELOAD=1 (the default) the application is imported
+once in the master and forked into the workers, so startup cost is paid
+once. SIGHUP then restarts the workers gracefully but keeps the preloaded
+code; to deploy new code send SIGUSR2 (start a new master alongside the old
+one) followed by SIGTERM to the old master, or set SERVER_PRELOAD=0 so that
+SIGHUP also reloads code.
+
+Migrations (DB_MIGRATE_ON_START=1) run as a ``python migrate.py`` child
+process on start and again on every SIGHUP, so the master only imports the
+application when it preloads it and a reload applies new migrations before
+the new workers start.
+"""
+import multiprocessing
+import os
+import subprocess
+import sys
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+bind = os.getenv('SERVER_BIND', '0.0.0.0:5000')
+SHARED_STORE = not os.getenv('LIST_CACHE_URL', 'memory://').startswith('memory://')
+workers = int(os.getenv('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8) if SHARED_STORE else 1))
+if workers > 1 and not SHARED_STORE:
+    raise RuntimeError(
+        f"WEB_CONCURRENCY={workers} needs LIST_CACHE_URL=redis://...: with the in-process list "
+        "cache and job store, workers would serve stale lists and lose track of each other's jobs"
+    )
+threads = int(os.getenv('SERVER_THREADS', 4))
+worker_class = 'gthread'
+preload_app = os.getenv('SERVER_PRELOAD', '1') != '0'
+
+# Seconds to keep an idle client connection open between requests
+keepalive = int(os.getenv('SERVER_KEEPALIVE', 5))
+# A worker that makes no progress for this many seconds is killed and restarted
+timeout = int(os.getenv('SERVER_TIMEOUT', 60))
+# Time given to in-flight requests on reload or shutdown
+graceful_timeout = int(os.getenv('SERVER_GRACEFUL_TIMEOUT', 30))
+# Recycle workers after this many requests (0 = never), with jitter so they
+# do not all restart at once
+max_requests = int(os.getenv('SERVER_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.getenv('SERVER_MAX_REQUESTS_JITTER', 50))
+
+accesslog = os.getenv('SERVER_ACCESS_LOG', '-')
+errorlog = '-'
+
+DB_MIGRATE_ON_START = os.getenv('DB_MIGRATE_ON_START', '1') != '0'
+DB_MIGRATE_LOCK_TIMEOUT = os.getenv('DB_MIGRATE_LOCK_TIMEOUT', '60')
+
+
+def migrate(server):
+    """Run migrate.py in a child process, so the master opens no connections"""
+    if not DB_MIGRATE_ON_START:
+        return
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, os.path.join(backend_dir, 'migrate.py'), '--lock-timeout', DB_MIGRATE_LOCK_TIMEOUT],
+        cwd=backend_dir
+    )
+    if result.returncode != 0:
+        # Workers still start; /api/ready reports 503 until the schema is current
+        server.log.error("Schema migration failed (exit status %s)", result.returncode)
+
+
+def on_starting(server):
+    """Migrate the schema once before any worker starts"""
+    migrate(server)
+
+
+def on_reload(server):
+    """Apply migrations shipped with new code before SIGHUP starts new workers"""
+    migrate(server)
+
+
+def post_fork(server, worker):
+    from app import init_worker
+    init_worker()
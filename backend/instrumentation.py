@@ -0,0 +1,479 @@
+"""Request timing, Prometheus metrics and slow-request profiling
+
+- MetricsRegistry holds counters and histograms and renders them, together
+  with gauges read from stats() snapshots, in the Prometheus text format.
+- RequestTimings collects the step, query and pool-wait timings of one
+  request and formats them as a ``Server-Timing`` header. The timings of the
+  request being handled are found through a context variable, so code deep
+  in the pipeline can record into them without threading an argument
+  through.
+- StepTimer times the named steps of a pipeline.
+- InstrumentedConnection wraps a DB-API connection so every statement is
+  timed and counted, optionally with MySQL's rows-examined figure.
+- SlowRequestProfiler samples the stack of a request's thread and writes
+  collapsed stacks (flamegraph.pl / speedscope input) for slow requests.
+"""
+import bisect
+import collections
+import contextvars
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    type = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = collections.defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            self._values[key] += amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, self.labelnames, key, value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    type = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def totals(self):
+        """Return ``(count, sum)`` over every label combination"""
+        with self._lock:
+            return (sum(series[2] for series in self._series.values()),
+                    sum(series[1] for series in self._series.values()))
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(counts), total, count))
+                     for key, (counts, total, count) in sorted(self._series.items())]
+        names = self.labelnames + ('le',)
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield self.name + '_bucket', names, key + (_format_value(float(bound)),), cumulative
+            yield self.name + '_sum', self.labelnames, key, total
+            yield self.name + '_count', self.labelnames, key, count
+
+
+def _snake_case(name):
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+
+
+class MetricsRegistry:
+    """Set of metrics rendered together by the /metrics endpoint"""
+
+    def __init__(self, prefix='aia_'):
+        self.prefix = prefix
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help, labelnames=()):
+        metric = Counter(self.prefix + name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(self.prefix + name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_stats(self, subsystem, stats, label=None):
+        """Export the numeric fields of ``stats()`` as gauges
+
+        Each numeric key of the returned dict becomes a gauge named
+        ``<prefix><subsystem>_<key in snake_case>``. If ``label`` is given,
+        ``stats()`` returns ``{label value: dict}`` and each dict becomes one
+        labelled series.
+        """
+        self._collectors.append((subsystem, stats, label))
+
+    def _collect_stats(self):
+        gauges = collections.OrderedDict()
+        for subsystem, stats, label in self._collectors:
+            try:
+                snapshot = stats()
+            except Exception as e:
+                print(f"Error collecting {subsystem} metrics: {e}")
+                continue
+            groups = snapshot.items() if label else [(None, snapshot)]
+            for label_value, values in groups:
+                for key, value in values.items():
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        continue
+                    name = f"{self.prefix}{subsystem}_{_snake_case(key)}"
+                    labelnames = (label,) if label else ()
+                    key = (label_value,) if label else ()
+                    gauges.setdefault(name, (labelnames, []))[1].append((key, value))
+        return gauges
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labelnames, key, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+        for name, (labelnames, values) in self._collect_stats().items():
+            lines.append(f"# TYPE {name} gauge")
+            for key, value in values:
+                lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+# -- per-request timings ----------------------------------------------------
+
+_current_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Step, query and pool-wait timings for one request"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.steps = collections.OrderedDict()
+        self.query_count = 0
+        self.query_time = 0.0
+        self.rows = 0
+        # Stays None unless rows examined are collected (DB_METRICS_ROWS_EXAMINED=1)
+        self.rows_examined = None
+        self.pool_wait = 0.0
+
+    def add_step(self, name, duration):
+        self.steps[name] = self.steps.get(name, 0.0) + duration
+
+    def add_query(self, duration):
+        self.query_count += 1
+        self.query_time += duration
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def server_timing(self):
+        """Format the timings as a Server-Timing header value (durations in ms)"""
+        entries = [f"{name};dur={duration * 1000:.1f}" for name, duration in self.steps.items()]
+        if self.query_count:
+            desc = f"{self.query_count} queries, {self.rows} rows"
+            if self.rows_examined is not None:
+                desc += f", {self.rows_examined} examined"
+            entries.append(f'db;dur={self.query_time * 1000:.1f};desc="{desc}"')
+        if self.pool_wait:
+            entries.append(f"pool;dur={self.pool_wait * 1000:.1f}")
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ', '.join(entries)
+
+
+def begin_request():
+    """Start collecting timings for the current context; returns a reset token"""
+    timings = RequestTimings()
+    return timings, _current_timings.set(timings)
+
+
+def end_request(token):
+    try:
+        _current_timings.reset(token)
+    except ValueError:
+        # Token created in another context (e.g. a streamed response)
+        _current_timings.set(None)
+
+
+def current_timings():
+    """Timings of the request being handled, or None outside a request"""
+    return _current_timings.get()
+
+
+class StepTimer:
+    """Times consecutive named steps; each ``mark`` ends the previous step"""
+
+    def __init__(self, histogram, pipeline):
+        self.histogram = histogram
+        self.pipeline = pipeline
+        self._step = None
+        self._start = None
+
+    def mark(self, step):
+        self.finish()
+        self._step = step
+        self._start = time.perf_counter()
+
+    def finish(self):
+        if self._step is None:
+            return
+        duration = time.perf_counter() - self._start
+        self.histogram.observe(duration, pipeline=self.pipeline, step=self._step)
+        timings = current_timings()
+        if timings is not None:
+            timings.add_step(self._step, duration)
+        self._step = None
+
+
+# -- database instrumentation -----------------------------------------------
+
+ROWS_EXAMINED_QUERY = (
+    "SELECT ROWS_EXAMINED FROM performance_schema.events_statements_history "
+    "WHERE THREAD_ID = PS_CURRENT_THREAD_ID() ORDER BY EVENT_ID DESC LIMIT 1"
+)
+
+
+class DatabaseMetrics:
+    """Metrics recorded for every statement and connection checkout"""
+
+    def __init__(self, registry, rows_examined=False):
+        self.rows_examined = rows_examined
+        self.query_seconds = registry.histogram(
+            'db_query_duration_seconds', 'Time spent executing SQL statements', ('statement',))
+        self.query_rows = registry.counter(
+            'db_query_rows_total', 'Rows returned or affected by SQL statements', ('statement',))
+        self.query_rows_examined = registry.counter(
+            'db_query_rows_examined_total', 'Rows examined by SQL statements (DB_METRICS_ROWS_EXAMINED=1)',
+            ('statement',))
+        self.pool_wait_seconds = registry.histogram(
+            'db_pool_wait_seconds', 'Time spent checking a connection out of the pool')
+
+    def record_pool_wait(self, duration):
+        self.pool_wait_seconds.observe(duration)
+        timings = current_timings()
+        if timings is not None:
+            timings.pool_wait += duration
+
+    def record_query(self, kind, duration):
+        self.query_seconds.observe(duration, statement=kind)
+        timings = current_timings()
+        if timings is not None:
+            timings.add_query(duration)
+
+    def record_rows(self, kind, rows):
+        self.query_rows.inc(rows, statement=kind)
+        timings = current_timings()
+        if timings is not None:
+            timings.rows += rows
+
+    def record_rows_examined(self, kind, rows):
+        self.query_rows_examined.inc(rows, statement=kind)
+        timings = current_timings()
+        if timings is not None:
+            timings.rows_examined = (timings.rows_examined or 0) + rows
+
+    def instrument(self, conn):
+        return InstrumentedConnection(conn, self)
+
+
+def statement_kind(operation):
+    """First keyword of a SQL statement, e.g. ``SELECT``; used as a metric label"""
+    match = re.match(r'\s*(\w+)', operation)
+    return match.group(1).upper() if match else 'UNKNOWN'
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors time and count every statement
+
+    Row counts are only final once a result set has been read, so they are
+    collected just before the next statement on the same connection (or on
+    ``flush``). When rows-examined collection is enabled, MySQL's figure for
+    the statement is read from performance_schema at the same point.
+    """
+
+    def __init__(self, conn, metrics):
+        self._conn = conn
+        self._metrics = metrics
+        self._pending = None
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs), self)
+
+    def _collect_pending(self):
+        if self._pending is None:
+            return
+        (kind, cursor), self._pending = self._pending, None
+        rows = getattr(cursor, 'rowcount', -1)
+        if rows and rows > 0:
+            self._metrics.record_rows(kind, rows)
+        if not self._metrics.rows_examined or getattr(self._conn, 'unread_result', False):
+            return
+        probe = self._conn.cursor()
+        try:
+            probe.execute(ROWS_EXAMINED_QUERY)
+            row = probe.fetchone()
+        except Exception:
+            # performance_schema disabled or not readable: stop probing
+            self._metrics.rows_examined = False
+            return
+        finally:
+            probe.close()
+        if row and row[0] is not None:
+            self._metrics.record_rows_examined(kind, int(row[0]))
+
+    def _record(self, kind, cursor, duration):
+        self._metrics.record_query(kind, duration)
+        self._pending = (kind, cursor)
+
+    def flush(self):
+        """Collect the figures of the last statement before the connection is released"""
+        self._collect_pending()
+
+
+class InstrumentedCursor:
+    """Cursor proxy that reports statement timings to its connection"""
+
+    def __init__(self, cursor, connection):
+        self._cursor = cursor
+        self._connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def _timed(self, method, operation, *args, **kwargs):
+        self._connection._collect_pending()
+        start = time.perf_counter()
+        try:
+            return method(operation, *args, **kwargs)
+        finally:
+            self._connection._record(statement_kind(operation), self._cursor, time.perf_counter() - start)
+
+    def execute(self, operation, *args, **kwargs):
+        return self._timed(self._cursor.execute, operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        return self._timed(self._cursor.executemany, operation, *args, **kwargs)
+
+
+# -- sampling profiler --------------------------------------------------------
+
+class _Sampling:
+    """Background sampler of one thread's stack"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+class SlowRequestProfiler:
+    """Opt-in sampling profiler that keeps profiles of slow requests only
+
+    A ``sample_rate`` fraction of requests is sampled every ``interval``
+    seconds. When a sampled request takes at least ``threshold`` seconds,
+    its stacks are written to ``output_dir`` in collapsed format, one
+    ``frame;frame;frame count`` line per distinct stack, which
+    flamegraph.pl, speedscope and similar tools read directly.
+    """
+
+    def __init__(self, threshold, output_dir, interval=0.005, sample_rate=1.0):
+        self.threshold = threshold
+        self.output_dir = output_dir
+        self.interval = interval
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._sampled = 0
+        self._written = 0
+
+    def start(self):
+        """Start sampling the calling thread; returns a handle or None if not sampled"""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return None
+        with self._lock:
+            self._sampled += 1
+        return _Sampling(threading.get_ident(), self.interval)
+
+    def finish(self, sampling, duration, label):
+        """Stop sampling and write the profile if the request was slow; returns its path"""
+        stacks = sampling.stop()
+        if duration < self.threshold or not stacks:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_label = re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('_') or 'request'
+        path = os.path.join(
+            self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{int(duration * 1000)}ms-{safe_label}.folded"
+        )
+        with open(path, 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with self._lock:
+            self._written += 1
+        return path
+
+    def stats(self):
+        with self._lock:
+            return {'sampled': self._sampled, 'profilesWritten': self._written}
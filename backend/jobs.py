@@ -0,0 +1,203 @@
+"""Bounded background job queue for long-running requests
+
+Jobs are executed by a fixed number of worker threads pulling from a
+bounded queue. ``submit`` raises QueueFull instead of blocking once the
+queue is at capacity, so the caller can shed load (HTTP 429). Finished
+jobs are kept for ``result_ttl`` seconds so clients can poll for results.
+
+A job runs in the process that queued it. With a shared ``store`` (a
+response_cache.RedisStore) every status change is also published there, so
+a poll answered by another worker process still finds the job.
+"""
+import datetime
+import json
+import queue
+import threading
+import time
+import uuid
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+class Job:
+    """A unit of work plus its status, per-step progress and result"""
+
+    def __init__(self, func, args, kwargs, on_change=None):
+        self.id = str(uuid.uuid4())
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.status = 'queued'
+        self.steps = []
+        self.result = None
+        self.error = None
+        self.created_at = datetime.datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self._finished_monotonic = None
+        self._on_change = on_change
+        self._lock = threading.Lock()
+
+    def _changed(self):
+        if self._on_change is not None:
+            self._on_change(self)
+
+    def report(self, step):
+        """Record that the job has moved on to ``step``"""
+        now = datetime.datetime.now()
+        with self._lock:
+            if self.steps and self.steps[-1]['finishedAt'] is None:
+                self.steps[-1]['finishedAt'] = now.isoformat()
+            self.steps.append({'name': step, 'startedAt': now.isoformat(), 'finishedAt': None})
+        self._changed()
+
+    def _finish(self, status, result=None, error=None):
+        now = datetime.datetime.now()
+        with self._lock:
+            if self.steps and self.steps[-1]['finishedAt'] is None:
+                self.steps[-1]['finishedAt'] = now.isoformat()
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = now
+            self._finished_monotonic = time.monotonic()
+        self._changed()
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'jobId': self.id,
+                'status': self.status,
+                'currentStep': self.steps[-1]['name'] if self.steps else None,
+                'steps': [dict(step) for step in self.steps],
+                'createdAt': self.created_at.isoformat(),
+                'startedAt': self.started_at.isoformat() if self.started_at else None,
+                'finishedAt': self.finished_at.isoformat() if self.finished_at else None,
+                'result': self.result,
+                'error': self.error,
+            }
+
+
+class JobQueue:
+    """Fixed pool of worker threads executing queued jobs"""
+
+    def __init__(self, workers=4, max_queued=100, result_ttl=600, store=None):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.store = store
+
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+        self._running = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._publish_errors = 0
+
+    def _ensure_started(self):
+        # Threads are started lazily so a forking server starts them in
+        # each worker process rather than in the parent.
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, func, *args, **kwargs):
+        """Queue ``func(*args, progress=job.report, **kwargs)`` and return the Job"""
+        self._ensure_started()
+        self._purge_expired()
+        job = Job(func, args, kwargs, on_change=self._publish if self.store is not None else None)
+        with self._lock:
+            self._jobs[job.id] = job
+        # Published before a worker can pick it up, so 'queued' never overwrites 'running'
+        job._changed()
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+                self._rejected += 1
+            raise QueueFull(f"Job queue is full ({self.max_queued} pending)")
+        with self._lock:
+            self._submitted += 1
+        return job
+
+    def get(self, job_id):
+        """The Job object, if it was queued by this process"""
+        return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        """The job's ``to_dict()`` from this process or the shared store, or None"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.store is None:
+            return None
+        data = self.store.get(job_id)
+        return json.loads(data) if data is not None else None
+
+    def _publish(self, job):
+        try:
+            self.store.set(job.id, json.dumps(job.to_dict(), default=str).encode(), self.result_ttl)
+        except Exception as e:
+            # Polls served by this process still see the job
+            print(f"Failed to publish job {job.id}: {e}")
+            with self._lock:
+                self._publish_errors += 1
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                self._running += 1
+            job.status = 'running'
+            job.started_at = datetime.datetime.now()
+            job._changed()
+            try:
+                result = job.func(*job.args, progress=job.report, **job.kwargs)
+                job._finish('succeeded', result=result)
+                with self._lock:
+                    self._completed += 1
+            except Exception as e:
+                print(f"Error in background job {job.id}: {e}")
+                job._finish('failed', error=str(e))
+                with self._lock:
+                    self._failed += 1
+            finally:
+                with self._lock:
+                    self._running -= 1
+                self._queue.task_done()
+
+    def _purge_expired(self):
+        cutoff = time.monotonic() - self.result_ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job._finished_monotonic is not None and job._finished_monotonic < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'maxQueued': self.max_queued,
+                'queued': self._queue.qsize(),
+                'running': self._running,
+                'submitted': self._submitted,
+                'rejected': self._rejected,
+                'completed': self._completed,
+                'failed': self._failed,
+                'tracked': len(self._jobs),
+                'publishErrors': self._publish_errors,
+            }
@@ -0,0 +1,189 @@
+"""Keyset pagination and column projection for the list routes"""
+import base64
+import datetime
+import json
+
+TABLE_COLUMNS = {
+    'AIA_PROJECT': ('PROJECT_ID', 'PROJECT_NAME', 'PROJECT_DESCRIPTION', 'MODULE_DESCRIPTION',
+                    'INSERT_ID', 'INSERT_DATE_TIME'),
+    'AIA_MODULE': ('MODULE_ID', 'MODULE_NAME', 'MODULE_DESCRIPTION', 'PROJECT_ID', 'DATABASE_TABLE',
+                   'INSERT_ID', 'INSERT_DATE_TIME'),
+    'AIA_MODULE_DATABASES': ('MODULE_DATABASE_ID', 'MODULE_ID', 'DATABASE_TABLE', 'CREATION_STATEMENT',
+                             'DDL_STATUS', 'DDL_ERROR', 'DDL_UPDATED_AT', 'INSERT_ID', 'INSERT_DATE_TIME'),
+    'AIA_LLM_OUTPUTS': ('OUTPUT_ID', 'PROMPT', 'ENGINE', 'OUTPUT', 'INSERT_ID', 'INSERT_DATE_TIME'),
+}
+
+SORT_COLUMN = 'INSERT_DATE_TIME'
+
+
+class ListQueryError(ValueError):
+    """Raised for malformed limit, cursor or fields parameters"""
+
+
+def encode_cursor(insert_date_time, row_id):
+    """Return an opaque token pointing just past the given row"""
+    if isinstance(insert_date_time, datetime.datetime):
+        insert_date_time = insert_date_time.isoformat()
+    raw = json.dumps([insert_date_time, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return the (insert_date_time, row_id) pair encoded in a cursor token"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        stamp, row_id = json.loads(raw)
+        return datetime.datetime.fromisoformat(stamp), int(row_id)
+    except (ValueError, TypeError) as err:
+        raise ListQueryError(f"Invalid cursor: {token}") from err
+
+
+def parse_limit(raw, default=None, maximum=1000):
+    """Parse the ``limit`` parameter; None means unbounded"""
+    if raw in (None, ''):
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ListQueryError(f"Invalid limit: {raw}")
+    if limit < 1:
+        raise ListQueryError("limit must be a positive integer")
+    return min(limit, maximum)
+
+
+def parse_fields(raw, table, id_column):
+    """Parse a comma-separated ``fields`` parameter into a column list
+
+    The id and INSERT_DATE_TIME columns are always selected because the
+    next-page cursor is built from them.
+    """
+    allowed = TABLE_COLUMNS[table]
+    if not raw:
+        return list(allowed)
+    requested = [f.strip().upper() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ListQueryError(f"Unknown fields for {table}: {', '.join(unknown)}")
+    columns = [id_column] if id_column not in requested else []
+    columns += requested
+    if SORT_COLUMN not in columns:
+        columns.append(SORT_COLUMN)
+    return columns
+
+
+def fetch_page(cursor, table, id_column, columns, filters=None, after=None, limit=None):
+    """Fetch one page of rows newest first; returns (rows, next_cursor)
+
+    ``filters`` is a list of (column, value) equality conditions. ``after``
+    is a decoded cursor; rows strictly older than it are returned. The
+    ordering (INSERT_DATE_TIME DESC, id DESC) is served by the
+    INSERT_DATE_TIME secondary indexes, so each page costs O(limit).
+    """
+    where = []
+    params = []
+    for column, value in filters or ():
+        where.append(f"{column} = %s")
+        params.append(value)
+    if after is not None:
+        stamp, row_id = after
+        where.append(f"({SORT_COLUMN} < %s OR ({SORT_COLUMN} = %s AND {id_column} < %s))")
+        params.extend([stamp, stamp, row_id])
+
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {SORT_COLUMN} DESC, {id_column} DESC"
+    if limit is not None:
+        # One extra row tells us whether another page exists
+        sql += " LIMIT %s"
+        params.append(limit + 1)
+
+    cursor.execute(sql, tuple(params))
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last[SORT_COLUMN], last[id_column])
+    return rows, next_cursor
+
+
+def parse_depth(raw, default=2, maximum=2):
+    """Parse the ``depth`` parameter of the tree routes (0 to ``maximum``)"""
+    if raw in (None, ''):
+        return default
+    allowed = [str(depth) for depth in range(maximum + 1)]
+    if raw not in allowed:
+        raise ListQueryError(f"Invalid depth: {raw} (expected {', '.join(allowed[:-1])} or {allowed[-1]})")
+    return int(raw)
+
+
+def fetch_project_tree(cursor, project_id, depth=2, project_columns=None, module_columns=None,
+                       database_columns=None):
+    """Return a project with its modules (depth 1) and their table definitions (depth 2)
+
+    Each level is one query, so the tree costs at most three queries however
+    many modules the project has. Modules are newest first, as on the list
+    routes. Returns None if the project does not exist.
+    """
+    project_columns = project_columns or TABLE_COLUMNS['AIA_PROJECT']
+    cursor.execute(
+        f"SELECT {', '.join(project_columns)} FROM AIA_PROJECT WHERE PROJECT_ID = %s",
+        (project_id,)
+    )
+    project = cursor.fetchone()
+    if project is None or depth < 1:
+        return project
+
+    module_columns = module_columns or TABLE_COLUMNS['AIA_MODULE']
+    cursor.execute(
+        f"SELECT {', '.join(module_columns)} FROM AIA_MODULE WHERE PROJECT_ID = %s "
+        f"ORDER BY {SORT_COLUMN} DESC, MODULE_ID DESC",
+        (project_id,)
+    )
+    project['modules'] = cursor.fetchall()
+    if depth < 2:
+        return project
+
+    by_module = {}
+    for module in project['modules']:
+        module['moduleDatabases'] = by_module[module['MODULE_ID']] = []
+    database_columns = list(database_columns or TABLE_COLUMNS['AIA_MODULE_DATABASES'])
+    if 'MODULE_ID' not in database_columns:
+        # Needed to attach each row to its module
+        database_columns.append('MODULE_ID')
+    if by_module:
+        cursor.execute(
+            f"SELECT {', '.join(f'd.{column}' for column in database_columns)} "
+            "FROM AIA_MODULE_DATABASES d JOIN AIA_MODULE m ON m.MODULE_ID = d.MODULE_ID "
+            "WHERE m.PROJECT_ID = %s ORDER BY d.MODULE_DATABASE_ID",
+            (project_id,)
+        )
+        for row in cursor.fetchall():
+            by_module[row['MODULE_ID']].append(row)
+    return project
+
+
+def fetch_module_tree(cursor, module_id, depth=1, module_columns=None, database_columns=None):
+    """Return a module with its table definitions (depth 1) in at most two queries
+
+    Returns None if the module does not exist.
+    """
+    module_columns = module_columns or TABLE_COLUMNS['AIA_MODULE']
+    cursor.execute(
+        f"SELECT {', '.join(module_columns)} FROM AIA_MODULE WHERE MODULE_ID = %s",
+        (module_id,)
+    )
+    module = cursor.fetchone()
+    if module is None or depth < 1:
+        return module
+
+    database_columns = database_columns or TABLE_COLUMNS['AIA_MODULE_DATABASES']
+    cursor.execute(
+        f"SELECT {', '.join(database_columns)} FROM AIA_MODULE_DATABASES WHERE MODULE_ID = %s "
+        "ORDER BY MODULE_DATABASE_ID",
+        (module_id,)
+    )
+    module['moduleDatabases'] = cursor.fetchall()
+    return module
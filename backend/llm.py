@@ -0,0 +1,413 @@
+"""LLM engine abstraction used by the generate pipeline
+
+An engine turns a (task, prompt, context) request into text. Engines are
+wrapped in an EngineClient, which adds:
+
+- a per-engine concurrency limit (a bounded worker pool),
+- coalescing of identical in-flight requests into a single call,
+- optional micro-batching for engines that implement ``complete_batch``,
+- per-attempt timeouts and retries bounded by a shared retry budget,
+- streaming of answers chunk by chunk through ``stream``.
+
+StubEngine is a deterministic local engine with configurable latency, used
+by default and for load-testing the pipeline offline.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+
+class EngineError(Exception):
+    """Raised when an engine call fails after all permitted retries"""
+
+
+class EngineTimeout(EngineError):
+    """Raised when an engine call does not complete within its timeout"""
+
+
+class LLMEngine:
+    """Base class for engines; subclasses implement ``complete``"""
+
+    name = 'engine'
+
+    def complete(self, task, prompt, context):
+        raise NotImplementedError
+
+    def complete_batch(self, requests):
+        """Complete several (task, prompt, context) requests in one call"""
+        return [self.complete(task, prompt, context) for task, prompt, context in requests]
+
+    def stream(self, task, prompt, context):
+        """Yield the answer in chunks; engines that cannot stream yield it whole"""
+        yield self.complete(task, prompt, context)
+
+
+class StubEngine(LLMEngine):
+    """Deterministic offline engine
+
+    Each task is answered by a local handler function. ``latency`` is added
+    once per call (or batch) and ``per_item_latency`` once per request, to
+    imitate a remote model. ``failure_rate`` injects seeded, reproducible
+    failures for exercising retries. Tasks with an entry in
+    ``stream_handlers`` (a function returning an iterable of chunks) are
+    streamed chunk by chunk.
+    """
+
+    name = 'stub'
+
+    def __init__(self, handlers, latency=0.0, per_item_latency=0.0, failure_rate=0.0, seed=0,
+                 stream_handlers=None):
+        self.handlers = dict(handlers)
+        self.stream_handlers = dict(stream_handlers or {})
+        self.latency = latency
+        self.per_item_latency = per_item_latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    def _maybe_fail(self):
+        if not self.failure_rate:
+            return
+        with self._random_lock:
+            roll = self._random.random()
+        if roll < self.failure_rate:
+            raise EngineError("Injected stub engine failure")
+
+    def _answer(self, task, prompt, context):
+        handler = self.handlers.get(task)
+        if handler is None:
+            raise EngineError(f"Stub engine has no handler for task '{task}'")
+        return handler(prompt, **context)
+
+    def complete(self, task, prompt, context):
+        time.sleep(self.latency + self.per_item_latency)
+        self._maybe_fail()
+        return self._answer(task, prompt, context)
+
+    def complete_batch(self, requests):
+        time.sleep(self.latency + self.per_item_latency * len(requests))
+        self._maybe_fail()
+        return [self._answer(task, prompt, context) for task, prompt, context in requests]
+
+    def stream(self, task, prompt, context):
+        time.sleep(self.latency + self.per_item_latency)
+        self._maybe_fail()
+        handler = self.stream_handlers.get(task)
+        if handler is None:
+            yield self._answer(task, prompt, context)
+            return
+        yield from handler(prompt, **context)
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a fraction of total requests
+
+    Every request deposits ``ratio`` tokens and every retry withdraws one,
+    so a failing engine sees at most ``1 + ratio`` times its normal load
+    instead of ``1 + max_retries`` times.
+    """
+
+    def __init__(self, ratio=0.1, capacity=10.0):
+        self.ratio = ratio
+        self.capacity = capacity
+        self._tokens = capacity
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+def request_key(task, prompt, context):
+    """Return the coalescing key for a request"""
+    raw = json.dumps([task, prompt, context], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class EngineClient:
+    """Concurrency-limited, coalescing, retrying front for one engine
+
+    A call that exceeds ``timeout`` cannot be interrupted; it is abandoned.
+    Unbatched calls take one of ``max_concurrency`` slots per attempt and
+    give it back when the attempt ends, including on timeout, so a retry
+    does not queue behind the call it replaces. Abandoned calls keep running
+    on up to ``max_abandoned`` extra threads; beyond that, new calls wait
+    for a thread. Batched calls are limited by the worker threads alone, so
+    for them the limit does count abandoned batches.
+    """
+
+    def __init__(self, engine, max_concurrency=4, timeout=30.0, max_retries=2,
+                 backoff=0.1, retry_budget=None, batch_window=0.0, max_batch_size=8,
+                 max_abandoned=None):
+        self.engine = engine
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.retry_budget = retry_budget or RetryBudget()
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_abandoned = max_concurrency if max_abandoned is None else max_abandoned
+
+        threads = max_concurrency if batch_window > 0 else max_concurrency + self.max_abandoned
+        self._executor = ThreadPoolExecutor(threads, thread_name_prefix=f"llm-{engine.name}")
+        # Unbatched attempts hold a slot while their caller waits for them
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        # Streams run on the caller's thread, so they are limited separately
+        self._stream_slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._pending = []
+        self._flush_timer = None
+
+        self._requests = 0
+        self._streams = 0
+        self._coalesced = 0
+        self._calls = 0
+        self._batches = 0
+        self._retries = 0
+        self._timeouts = 0
+        self._failures = 0
+        self._abandoned = 0
+        self._latency_total = 0.0
+
+    # -- dispatch ---------------------------------------------------------
+
+    def _dispatch(self, task, prompt, context):
+        if self.batch_window > 0:
+            future = Future()
+            with self._lock:
+                self._pending.append((task, prompt, context, future))
+                if len(self._pending) >= self.max_batch_size:
+                    self._flush_locked()
+                elif self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.batch_window, self._flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+            return future
+        with self._lock:
+            self._calls += 1
+        return self._executor.submit(self.engine.complete, task, prompt, context)
+
+    def _flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self._calls += 1
+        self._batches += 1
+        self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch):
+        try:
+            results = self.engine.complete_batch([(t, p, c) for t, p, c, _ in batch])
+            if len(results) != len(batch):
+                raise EngineError(f"Engine returned {len(results)} results for a batch of {len(batch)}")
+        except Exception as e:
+            for *_, future in batch:
+                future.set_exception(e)
+            return
+        for (*_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    # -- public API -------------------------------------------------------
+
+    def complete(self, task, prompt, context=None):
+        """Return the engine's answer, sharing the call with identical in-flight requests"""
+        context = context or {}
+        key = request_key(task, prompt, context)
+        with self._lock:
+            self._requests += 1
+            shared = self._inflight.get(key)
+            if shared is None:
+                shared = Future()
+                self._inflight[key] = shared
+                leader = True
+            else:
+                self._coalesced += 1
+                leader = False
+        self.retry_budget.deposit()
+
+        if not leader:
+            try:
+                return shared.result(timeout=self.timeout * (self.max_retries + 1))
+            except FutureTimeout:
+                raise EngineTimeout(f"Timed out waiting for engine '{self.engine.name}'")
+
+        try:
+            result = self._call_with_retries(task, prompt, context)
+        except Exception as e:
+            shared.set_exception(e)
+            raise
+        else:
+            shared.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stream(self, task, prompt, context=None):
+        """Yield the engine's answer in chunks as it is produced
+
+        At most ``max_concurrency`` streams run at once; waiting longer than
+        ``timeout`` for a slot raises EngineTimeout. Streams are neither
+        coalesced nor batched, and a failure is retried only if no chunk
+        has been yielded yet.
+        """
+        context = context or {}
+        with self._lock:
+            self._requests += 1
+            self._streams += 1
+        self.retry_budget.deposit()
+        if not self._stream_slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._timeouts += 1
+                self._failures += 1
+            raise EngineTimeout(f"Timed out waiting for a stream from engine '{self.engine.name}'")
+
+        try:
+            attempt = 0
+            while True:
+                started = False
+                start = time.monotonic()
+                with self._lock:
+                    self._calls += 1
+                try:
+                    for chunk in self.engine.stream(task, prompt, context):
+                        started = True
+                        yield chunk
+                    with self._lock:
+                        self._latency_total += time.monotonic() - start
+                    return
+                except Exception as e:
+                    error = e
+                if started or attempt >= self.max_retries or not self.retry_budget.withdraw():
+                    with self._lock:
+                        self._failures += 1
+                    if isinstance(error, EngineError):
+                        raise error
+                    raise EngineError(f"Engine '{self.engine.name}' failed: {error}") from error
+                attempt += 1
+                with self._lock:
+                    self._retries += 1
+                time.sleep(self.backoff * (2 ** (attempt - 1)))
+        finally:
+            self._stream_slots.release()
+
+    def _attempt(self, task, prompt, context):
+        """One call, waiting at most ``timeout``; raises FutureTimeout when it does not finish"""
+        if self.batch_window > 0:
+            return self._dispatch(task, prompt, context).result(timeout=self.timeout)
+        deadline = time.monotonic() + self.timeout
+        if not self._slots.acquire(timeout=self.timeout):
+            raise FutureTimeout()
+        try:
+            future = self._dispatch(task, prompt, context)
+            try:
+                return future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                if not future.cancel():
+                    # Still running: it no longer holds a slot, only a thread
+                    with self._lock:
+                        self._abandoned += 1
+                    future.add_done_callback(self._abandoned_done)
+                raise
+        finally:
+            self._slots.release()
+
+    def _abandoned_done(self, future):
+        with self._lock:
+            self._abandoned -= 1
+
+    def _call_with_retries(self, task, prompt, context):
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                result = self._attempt(task, prompt, context)
+                with self._lock:
+                    self._latency_total += time.monotonic() - start
+                return result
+            except FutureTimeout:
+                with self._lock:
+                    self._timeouts += 1
+                error = EngineTimeout(
+                    f"Engine '{self.engine.name}' did not answer within {self.timeout}s"
+                )
+            except Exception as e:
+                error = e
+            if attempt >= self.max_retries or not self.retry_budget.withdraw():
+                with self._lock:
+                    self._failures += 1
+                if isinstance(error, EngineError):
+                    raise error
+                raise EngineError(f"Engine '{self.engine.name}' failed: {error}") from error
+            attempt += 1
+            with self._lock:
+                self._retries += 1
+            time.sleep(self.backoff * (2 ** (attempt - 1)))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'engine': self.engine.name,
+                'maxConcurrency': self.max_concurrency,
+                'inFlight': len(self._inflight),
+                'requests': self._requests,
+                'streams': self._streams,
+                'coalesced': self._coalesced,
+                'calls': self._calls,
+                'batches': self._batches,
+                'retries': self._retries,
+                'timeouts': self._timeouts,
+                'failures': self._failures,
+                'abandoned': self._abandoned,
+                'avgLatency': round(self._latency_total / self._calls, 6) if self._calls else 0.0,
+            }
+
+
+class EngineRegistry:
+    """Maps engine names from requests to EngineClients"""
+
+    def __init__(self, default=None):
+        self.default = default
+        self._clients = {}
+
+    def register(self, name, client):
+        self._clients[name] = client
+        if self.default is None:
+            self.default = name
+        return client
+
+    def resolve(self, name):
+        """Return the registered name that serves ``name``"""
+        return name if name in self._clients else self.default
+
+    def get(self, name):
+        return self._clients[self.resolve(name)]
+
+    def complete(self, name, task, prompt, context=None):
+        return self.get(name).complete(task, prompt, context)
+
+    def stream(self, name, task, prompt, context=None):
+        return self.get(name).stream(task, prompt, context)
+
+    def stats(self):
+        return {name: client.stats() for name, client in self._clients.items()}
@@ -0,0 +1,293 @@
+import itertools
+import math
+import re
+import threading
+import time
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_SPACE_RE = re.compile(r'\s+')
+_NON_IDENTIFIER_RE = re.compile(r'[^a-z0-9]+')
+
+# Length of the unique NAME_KEY columns (191 utf8mb4 characters fit any InnoDB index)
+NAME_KEY_LENGTH = 191
+
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'app', 'application', 'as', 'at', 'by', 'for', 'from',
+    'in', 'into', 'is', 'it', 'of', 'on', 'or', 'that', 'the', 'this', 'to',
+    'with'
+))
+
+
+def tokenize(text):
+    """Split text into normalized, de-duplicated match tokens"""
+    if not text:
+        return frozenset()
+    return frozenset(t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS)
+
+
+def normalize_prompt(text):
+    """Canonical form of a prompt or name: trimmed, lower-case, single-spaced"""
+    return _SPACE_RE.sub(' ', text or '').strip().lower()
+
+
+def name_key(name):
+    """Value of the unique NAME_KEY column for a project/module name or table name"""
+    return normalize_prompt(name)[:NAME_KEY_LENGTH]
+
+
+def table_name_for(prompt):
+    """MySQL-safe table name for a prompt, at most 64 characters"""
+    base = _NON_IDENTIFIER_RE.sub('_', normalize_prompt(prompt)).strip('_')[:58].rstrip('_')
+    return f"{base or 'generated'}_table"
+
+
+class MatchIndex:
+    """In-process inverted index over the name/description columns of a table
+
+    Each row is indexed by the tokens of its text columns. A lookup only
+    collects candidates from the posting lists of the prompt's rarest
+    tokens: a row that has none of the tokens making up more than
+    ``1 - min_score`` of the query's weight cannot reach ``min_score``.
+    At most ``max_candidates`` rows are collected, rarest list first (a list
+    too long to fit is intersected with the next rarest instead), and they
+    are scored outside the lock, so a lookup costs neither a scan of the
+    common tokens' lists nor other threads' time.
+
+    The index is kept in sync by ``add`` for rows inserted by this process
+    and by ``sync``, which pulls rows inserted by other workers. Auto-increment
+    ids are allocated before commit, so a row can become visible after one
+    with a higher id: each sync re-reads the last ``lookback`` ids below the
+    highest one seen. ``sync`` never reads the whole table; a background
+    thread does, once at start and then every ``resync_interval`` seconds,
+    through a connection from ``connect``. That also drops deleted rows.
+    Until the first full read finishes, only the newest ``lookback`` rows
+    are indexed.
+    """
+
+    def __init__(self, table, id_column, text_columns, max_candidates=2000, lookback=100,
+                 resync_interval=300, connect=None, batch_size=10000):
+        self.table = table
+        self.id_column = id_column
+        self.text_columns = tuple(text_columns)
+        self.max_candidates = max_candidates
+        self.lookback = lookback
+        self.resync_interval = resync_interval
+        self.connect = connect
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._docs = {}
+        self._last_id = 0
+        self._loaded = False
+        self._thread = None
+        self._reloads = 0
+        self._reload_seconds = 0.0
+        self._reload_errors = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, row_id, *texts):
+        """Index (or re-index) a single row"""
+        tokens = frozenset().union(*(tokenize(t) for t in texts))
+        with self._lock:
+            self._add_locked(row_id, tokens)
+
+    def _add_locked(self, row_id, tokens):
+        old = self._docs.get(row_id)
+        if old is not None:
+            for token in old - tokens:
+                self._discard_posting(token, row_id)
+        self._docs[row_id] = tokens
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(row_id)
+
+    def _discard_posting(self, token, row_id):
+        ids = self._postings.get(token)
+        if ids is not None:
+            ids.discard(row_id)
+            if not ids:
+                del self._postings[token]
+
+    def remove(self, row_id):
+        """Drop a row from the index, e.g. after its insert was rolled back"""
+        with self._lock:
+            tokens = self._docs.pop(row_id, None)
+            if tokens:
+                for token in tokens:
+                    self._discard_posting(token, row_id)
+
+    def _rows(self, cursor, after, limit=None):
+        columns = ', '.join((self.id_column,) + self.text_columns)
+        cursor.execute(
+            f"SELECT {columns} FROM {self.table} WHERE {self.id_column} > %s ORDER BY {self.id_column}"
+            + (f" LIMIT {int(limit)}" if limit else ''),
+            (after,)
+        )
+        for row in cursor.fetchall():
+            if isinstance(row, dict):
+                yield row[self.id_column], [row[c] for c in self.text_columns]
+            else:
+                yield row[0], row[1:]
+
+    def sync(self, cursor):
+        """Index rows committed since the last sync; returns the number added
+
+        Reads ids above ``_last_id - lookback`` (before the first full read:
+        the newest ``lookback`` ids) and starts the background full read.
+        """
+        self.start()
+        since = self._last_id - self.lookback
+        if not self._loaded and not self._last_id:
+            cursor.execute(f"SELECT MAX({self.id_column}) FROM {self.table}")
+            row = cursor.fetchone()
+            newest = (next(iter(row.values())) if isinstance(row, dict) else row[0]) if row else None
+            since = (newest or 0) - self.lookback
+        indexed = {}
+        last_id = self._last_id
+        for row_id, texts in self._rows(cursor, max(0, since)):
+            last_id = max(last_id, row_id)
+            # Rows already indexed are re-read by the lookback window; skip them
+            if row_id not in self._docs:
+                indexed[row_id] = frozenset().union(*(tokenize(t) for t in texts))
+        with self._lock:
+            added = sum(1 for row_id in indexed if row_id not in self._docs)
+            for row_id, tokens in indexed.items():
+                self._add_locked(row_id, tokens)
+            self._last_id = max(self._last_id, last_id)
+        return added
+
+    def reload(self, cursor):
+        """Re-read the whole table in primary key order and replace the index
+
+        Runs in batches of ``batch_size`` rows without holding the lock;
+        rows added meanwhile above the highest id read are kept.
+        """
+        start = time.monotonic()
+        docs = {}
+        postings = {}
+        last_id = 0
+        while True:
+            batch = list(self._rows(cursor, last_id, self.batch_size))
+            for row_id, texts in batch:
+                tokens = frozenset().union(*(tokenize(t) for t in texts))
+                docs[row_id] = tokens
+                for token in tokens:
+                    postings.setdefault(token, set()).add(row_id)
+            if len(batch) < self.batch_size:
+                break
+            last_id = batch[-1][0]
+        if docs:
+            last_id = max(docs)
+        with self._lock:
+            newer = {row_id: tokens for row_id, tokens in self._docs.items() if row_id > last_id}
+            self._docs, self._postings = docs, postings
+            for row_id, tokens in newer.items():
+                self._add_locked(row_id, tokens)
+            self._last_id = max(self._last_id, last_id)
+            self._loaded = True
+            self._reloads += 1
+            self._reload_seconds = time.monotonic() - start
+        return len(docs)
+
+    def start(self):
+        """Start the background full reads, if ``connect`` was given (idempotent)
+
+        Called by ``sync``, so a forking server starts it in each worker
+        process rather than in the parent.
+        """
+        if self.connect is None or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=f"match-index-{self.table}", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            delay = self.resync_interval
+            try:
+                with self.connect() as conn:
+                    cursor = conn.cursor()
+                    try:
+                        self.reload(cursor)
+                    finally:
+                        cursor.close()
+            except Exception as e:
+                print(f"Failed to reload the {self.table} match index: {e}")
+                with self._lock:
+                    self._reload_errors += 1
+                # e.g. the schema is not migrated yet; try again soon
+                delay = min(delay, 10)
+            time.sleep(delay)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': self._loaded,
+                'rows': len(self._docs),
+                'tokens': len(self._postings),
+                'reloads': self._reloads,
+                'reloadSeconds': round(self._reload_seconds, 3),
+                'reloadErrors': self._reload_errors,
+            }
+
+    def best_match(self, text, min_score=0.0):
+        """Return ``(row_id, score)`` for the best matching row, or None
+
+        The score is the IDF-weighted share of the query's tokens that the
+        row contains, between 0 and 1. Ties go to the row with the fewest
+        extra tokens, then to the oldest row.
+        """
+        query = tokenize(text)
+        if not query:
+            return None
+
+        with self._lock:
+            total = len(self._docs)
+            if not total:
+                return None
+            postings = {token: self._postings.get(token, ()) for token in query}
+            weights = {token: math.log(1 + total / (len(ids) or 0.5)) for token, ids in postings.items()}
+            query_weight = sum(weights.values())
+
+            ranked = sorted(query, key=lambda t: (-weights[t], t))
+            # Rarest (heaviest) tokens first, until the ones left cannot add
+            # up to min_score on their own. A list that would take the set
+            # past max_candidates is skipped: its rows sharing a rarer token
+            # are already in
+            candidates = set()
+            remaining = query_weight
+            for token in ranked:
+                if remaining < min_score * query_weight:
+                    break
+                remaining -= weights[token]
+                if len(candidates) + len(postings[token]) <= self.max_candidates:
+                    candidates.update(postings[token])
+                elif not candidates:
+                    # Even the rarest list is too long: keep the rows that
+                    # also have the next rarest tokens
+                    candidates = set(postings[token])
+                    for other in ranked[ranked.index(token) + 1:]:
+                        if len(candidates) <= self.max_candidates:
+                            break
+                        narrowed = candidates & postings[other]
+                        if narrowed:
+                            candidates = narrowed
+                    if len(candidates) > self.max_candidates:
+                        candidates = set(itertools.islice(candidates, self.max_candidates))
+                    break
+            docs = [(row_id, self._docs[row_id]) for row_id in candidates]
+
+        best = None
+        for row_id, tokens in docs:
+            score = sum(weights[t] for t in query & tokens) / query_weight
+            key = (score, -len(tokens - query), -row_id)
+            if best is None or key > best[0]:
+                best = (key, row_id, score)
+
+        if best is None or best[2] < min_score:
+            return None
+        return best[1], round(best[2], 4)
@@ -0,0 +1,59 @@
+"""Apply database schema migrations
+
+One-shot bootstrap command, meant to run once per deployment before the
+servers start (then set DB_MIGRATE_ON_START=0 for gunicorn):
+
+    python migrate.py             # apply pending migrations
+    python migrate.py --status    # list applied and pending versions
+    python migrate.py --target 1  # stop after version 1
+
+Concurrent runs against the same database are serialized by a MySQL named
+lock, so it is safe to run from several hosts at once.
+"""
+import argparse
+import sys
+
+import mysql.connector
+
+from db_pool import PoolTimeout
+from migrations import MIGRATIONS, MigrationLockTimeout, applied_versions, migrate_locked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Apply database schema migrations')
+    parser.add_argument('--status', action='store_true', help='Show migration status and exit')
+    parser.add_argument('--target', type=int, help='Highest version to apply (default: latest)')
+    parser.add_argument('--lock-timeout', type=int, default=60,
+                        help='Seconds to wait for a concurrent migration (default: 60)')
+    args = parser.parse_args(argv)
+
+    from app import db_connection
+
+    try:
+        with db_connection() as conn:
+            if args.status:
+                cursor = conn.cursor()
+                try:
+                    done = applied_versions(cursor)
+                except mysql.connector.Error:
+                    done = set()
+                finally:
+                    cursor.close()
+                pending = 0
+                for version, description, _ in MIGRATIONS:
+                    state = 'applied' if version in done else 'pending'
+                    pending += version not in done
+                    print(f"{version:>4}  {state:<8} {description}")
+                return 1 if pending else 0
+
+            applied = migrate_locked(conn, target=args.target, lock_timeout=args.lock_timeout)
+    except (mysql.connector.Error, PoolTimeout, MigrationLockTimeout) as err:
+        print(f"Migration failed: {err}", file=sys.stderr)
+        return 1
+
+    print(f"Applied {len(applied)} migration(s)" if applied else "Schema is up to date")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
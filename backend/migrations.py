@@ -0,0 +1,291 @@
+"""Versioned schema migrations for the codegen platform database
+
+Each migration is a numbered list of steps. A step is either a SQL string
+or a callable taking a cursor. Steps must be idempotent: MySQL commits DDL
+implicitly, so a migration interrupted half-way is simply re-run from the
+start on the next boot.
+"""
+import datetime
+
+from matching import name_key
+from schema_catalog import catalog_json
+
+SCHEMA_VERSION_TABLE = 'AIA_SCHEMA_VERSION'
+MIGRATION_LOCK = 'aia_schema_migrations'
+
+
+class MigrationLockTimeout(Exception):
+    """Raised when the migration lock is not granted within the timeout"""
+
+
+def add_index(table, name, columns, unique=False):
+    """Return a step that creates an index unless it already exists"""
+    def step(cursor):
+        cursor.execute(
+            "SELECT 1 FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s LIMIT 1",
+            (table, name)
+        )
+        if cursor.fetchone():
+            return
+        kind = 'UNIQUE INDEX' if unique else 'INDEX'
+        cursor.execute(f"ALTER TABLE {table} ADD {kind} {name} ({', '.join(columns)})")
+    step.__name__ = f"add_index_{name}"
+    return step
+
+
+def add_column(table, column, definition):
+    """Return a step that adds a column unless it already exists"""
+    def step(cursor):
+        cursor.execute(
+            "SELECT 1 FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s LIMIT 1",
+            (table, column)
+        )
+        if cursor.fetchone():
+            return
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    step.__name__ = f"add_column_{table}_{column}"
+    return step
+
+
+def backfill_name_keys(table, id_column, source_column, batch_size=1000):
+    """Return a step that fills NAME_KEY for the oldest row of each distinct name
+
+    Later duplicates keep a NULL key (a unique index allows any number of
+    NULLs), so the unique index can be built over existing data.
+    """
+    def step(cursor):
+        cursor.execute(f"SELECT NAME_KEY FROM {table} WHERE NAME_KEY IS NOT NULL")
+        taken = {row[0] if not isinstance(row, dict) else row['NAME_KEY'] for row in cursor.fetchall()}
+        cursor.execute(f"SELECT {id_column}, {source_column} FROM {table} WHERE NAME_KEY IS NULL ORDER BY {id_column}")
+        updates = []
+        for row in cursor.fetchall():
+            row_id, source = (row[id_column], row[source_column]) if isinstance(row, dict) else row
+            key = name_key(source)
+            if key and key not in taken:
+                taken.add(key)
+                updates.append((key, row_id))
+        for start in range(0, len(updates), batch_size):
+            cursor.executemany(
+                f"UPDATE {table} SET NAME_KEY = %s WHERE {id_column} = %s",
+                updates[start:start + batch_size]
+            )
+    step.__name__ = f"backfill_name_keys_{table}"
+    return step
+
+
+def backfill_column_catalogs(batch_size=1000):
+    """Return a step that parses CREATION_STATEMENT into COLUMN_CATALOG where it is missing
+
+    Statements that do not parse keep a NULL catalog and are skipped.
+    """
+    def step(cursor):
+        last_id = 0
+        while True:
+            cursor.execute(
+                "SELECT MODULE_DATABASE_ID, CREATION_STATEMENT FROM AIA_MODULE_DATABASES "
+                "WHERE COLUMN_CATALOG IS NULL AND MODULE_DATABASE_ID > %s ORDER BY MODULE_DATABASE_ID LIMIT %s",
+                (last_id, batch_size)
+            )
+            rows = [(row['MODULE_DATABASE_ID'], row['CREATION_STATEMENT']) if isinstance(row, dict) else row
+                    for row in cursor.fetchall()]
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            updates = [(catalog, row_id) for row_id, catalog in
+                       ((row_id, catalog_json(statement)) for row_id, statement in rows) if catalog]
+            if updates:
+                cursor.executemany(
+                    "UPDATE AIA_MODULE_DATABASES SET COLUMN_CATALOG = %s WHERE MODULE_DATABASE_ID = %s", updates
+                )
+    step.__name__ = 'backfill_column_catalogs'
+    return step
+
+
+MIGRATIONS = [
+    (1, 'Create base tables', [
+        '''
+        CREATE TABLE IF NOT EXISTS AIA_PROJECT (
+            PROJECT_ID INT AUTO_INCREMENT PRIMARY KEY,
+            PROJECT_NAME VARCHAR(255) NOT NULL,
+            PROJECT_DESCRIPTION TEXT,
+            MODULE_DESCRIPTION TEXT,
+            INSERT_ID VARCHAR(255),
+            INSERT_DATE_TIME DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS AIA_MODULE (
+            MODULE_ID INT AUTO_INCREMENT PRIMARY KEY,
+            MODULE_NAME VARCHAR(255) NOT NULL,
+            MODULE_DESCRIPTION TEXT,
+            PROJECT_ID INT,
+            DATABASE_TABLE VARCHAR(255),
+            INSERT_ID VARCHAR(255),
+            INSERT_DATE_TIME DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (PROJECT_ID) REFERENCES AIA_PROJECT(PROJECT_ID)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS AIA_MODULE_DATABASES (
+            MODULE_DATABASE_ID INT AUTO_INCREMENT PRIMARY KEY,
+            MODULE_ID INT,
+            DATABASE_TABLE VARCHAR(255),
+            CREATION_STATEMENT TEXT,
+            INSERT_ID VARCHAR(255),
+            INSERT_DATE_TIME DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (MODULE_ID) REFERENCES AIA_MODULE(MODULE_ID)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS AIA_LLM_OUTPUTS (
+            OUTPUT_ID INT AUTO_INCREMENT PRIMARY KEY,
+            PROMPT TEXT,
+            ENGINE VARCHAR(255),
+            OUTPUT TEXT,
+            INSERT_ID VARCHAR(255),
+            INSERT_DATE_TIME DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    # InnoDB appends the primary key to every secondary index, so an index
+    # on INSERT_DATE_TIME also serves ORDER BY (INSERT_DATE_TIME, id).
+    (2, 'Add secondary indexes for list and lookup queries', [
+        add_index('AIA_PROJECT', 'IDX_PROJECT_INSERT_DATE', ['INSERT_DATE_TIME']),
+        add_index('AIA_MODULE', 'IDX_MODULE_PROJECT_DATE', ['PROJECT_ID', 'INSERT_DATE_TIME']),
+        add_index('AIA_MODULE', 'IDX_MODULE_INSERT_DATE', ['INSERT_DATE_TIME']),
+        add_index('AIA_MODULE_DATABASES', 'IDX_MODULE_DATABASES_TABLE', ['DATABASE_TABLE']),
+        add_index('AIA_MODULE_DATABASES', 'IDX_MODULE_DATABASES_MODULE_DATE', ['MODULE_ID', 'INSERT_DATE_TIME']),
+        add_index('AIA_MODULE_DATABASES', 'IDX_MODULE_DATABASES_INSERT_DATE', ['INSERT_DATE_TIME']),
+        add_index('AIA_LLM_OUTPUTS', 'IDX_LLM_OUTPUTS_INSERT_DATE', ['INSERT_DATE_TIME']),
+    ]),
+    # Concurrent requests for the same prompt insert-or-fetch on these keys
+    # instead of creating duplicate projects, modules and tables.
+    (3, 'Add unique normalized name keys', [
+        add_column('AIA_PROJECT', 'NAME_KEY', 'VARCHAR(191) NULL'),
+        add_column('AIA_MODULE', 'NAME_KEY', 'VARCHAR(191) NULL'),
+        add_column('AIA_MODULE_DATABASES', 'NAME_KEY', 'VARCHAR(191) NULL'),
+        backfill_name_keys('AIA_PROJECT', 'PROJECT_ID', 'PROJECT_NAME'),
+        backfill_name_keys('AIA_MODULE', 'MODULE_ID', 'MODULE_NAME'),
+        backfill_name_keys('AIA_MODULE_DATABASES', 'MODULE_DATABASE_ID', 'DATABASE_TABLE'),
+        add_index('AIA_PROJECT', 'UX_PROJECT_NAME_KEY', ['NAME_KEY'], unique=True),
+        add_index('AIA_MODULE', 'UX_MODULE_NAME_KEY', ['NAME_KEY'], unique=True),
+        add_index('AIA_MODULE_DATABASES', 'UX_MODULE_DATABASES_NAME_KEY', ['NAME_KEY'], unique=True),
+    ]),
+    # Tables are created by the DDL executor (ddl.py) after the request
+    # commits. Definitions recorded before this migration were created inline.
+    (4, 'Track per-table DDL status', [
+        add_column('AIA_MODULE_DATABASES', 'DDL_STATUS', "VARCHAR(16) NOT NULL DEFAULT 'applied'"),
+        add_column('AIA_MODULE_DATABASES', 'DDL_ERROR', 'TEXT NULL'),
+        add_column('AIA_MODULE_DATABASES', 'DDL_ATTEMPTS', 'INT NOT NULL DEFAULT 0'),
+        add_column('AIA_MODULE_DATABASES', 'DDL_UPDATED_AT', 'DATETIME NULL'),
+        add_index('AIA_MODULE_DATABASES', 'IDX_MODULE_DATABASES_DDL_STATUS', ['DDL_STATUS', 'DDL_UPDATED_AT']),
+    ]),
+    # LLM outputs are stored once per distinct text, zlib-compressed (see
+    # retention.py); older rows keep plain OUTPUT until compacted.
+    (5, 'Store LLM output bodies compressed and deduplicated', [
+        '''
+        CREATE TABLE IF NOT EXISTS AIA_LLM_OUTPUT_BODIES (
+            BODY_HASH CHAR(64) PRIMARY KEY,
+            BODY LONGBLOB NOT NULL,
+            BODY_LENGTH INT NOT NULL,
+            INSERT_DATE_TIME DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        add_column('AIA_LLM_OUTPUTS', 'OUTPUT_HASH', 'CHAR(64) NULL'),
+        add_index('AIA_LLM_OUTPUTS', 'IDX_LLM_OUTPUTS_OUTPUT_HASH', ['OUTPUT_HASH']),
+    ]),
+    # Column catalog parsed from CREATION_STATEMENT when the row is written
+    # (see schema_catalog.py), so code generation does not re-parse it.
+    (6, 'Store a parsed column catalog per table definition', [
+        add_column('AIA_MODULE_DATABASES', 'COLUMN_CATALOG', 'JSON NULL'),
+        backfill_column_catalogs(),
+    ]),
+]
+
+
+def _ensure_version_table(cursor):
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+        VERSION INT PRIMARY KEY,
+        DESCRIPTION VARCHAR(255),
+        APPLIED_AT DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+
+def applied_versions(cursor):
+    """Return the set of migration versions already recorded"""
+    cursor.execute(f"SELECT VERSION FROM {SCHEMA_VERSION_TABLE}")
+    return {row[0] if not isinstance(row, dict) else row['VERSION'] for row in cursor.fetchall()}
+
+
+def current_version(cursor):
+    """Return the highest applied version, or 0 if the schema was never bootstrapped"""
+    try:
+        cursor.execute(f"SELECT MAX(VERSION) FROM {SCHEMA_VERSION_TABLE}")
+    except Exception:
+        # Version table missing
+        return 0
+    row = cursor.fetchone()
+    value = row[0] if not isinstance(row, dict) else next(iter(row.values()))
+    return value or 0
+
+
+def latest_version():
+    """Return the highest known migration version"""
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def migrate(conn, target=None, migrations=MIGRATIONS):
+    """Apply pending migrations up to ``target`` and return the versions applied"""
+    cursor = conn.cursor()
+    try:
+        _ensure_version_table(cursor)
+        done = applied_versions(cursor)
+        applied = []
+        for version, description, steps in sorted(migrations, key=lambda m: m[0]):
+            if target is not None and version > target:
+                break
+            if version in done:
+                continue
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            cursor.execute(
+                f"INSERT INTO {SCHEMA_VERSION_TABLE} (VERSION, DESCRIPTION, APPLIED_AT) VALUES (%s, %s, %s)",
+                (version, description, datetime.datetime.now())
+            )
+            conn.commit()
+            print(f"Applied schema migration {version}: {description}")
+            applied.append(version)
+        return applied
+    finally:
+        cursor.close()
+
+
+def migrate_locked(conn, target=None, lock_timeout=60, migrations=MIGRATIONS):
+    """Like migrate, but holding a MySQL named lock for the duration
+
+    Processes bootstrapping the same database at once (several hosts, or a
+    deploy job racing a server start) run one at a time; the others wait up
+    to ``lock_timeout`` seconds and then find nothing left to apply.
+    """
+    cursor = conn.cursor(buffered=True)
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK, lock_timeout))
+        row = cursor.fetchone()
+        if not row or row[0] != 1:
+            raise MigrationLockTimeout(
+                f"Could not acquire migration lock '{MIGRATION_LOCK}' within {lock_timeout}s"
+            )
+        try:
+            return migrate(conn, target, migrations)
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+            cursor.fetchone()
+    finally:
+        cursor.close()
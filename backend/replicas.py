@@ -0,0 +1,202 @@
+"""Read replica routing for read-only routes
+
+A ReplicaRouter holds one ConnectionPool per replica. Read-only callers
+check connections out through ``connection``, which picks a healthy replica
+(round-robin, or the one with the fewest connections in use) and falls
+back to the primary pool when none is usable.
+
+A replica is healthy when its last lag probe succeeded and reported at most
+``max_lag`` seconds of replication delay. A background thread probes every
+replica each ``check_interval`` seconds, so a request never waits for a
+probe (or for the connect timeout of an unreachable replica); until its
+first probe a replica is not used. A replica whose checkout fails is marked
+unhealthy until its next probe.
+
+After a write (``note_write``), reads go to the primary for ``max_lag``
+seconds, so a client reading back what it just wrote through this process
+never sees a replica that has not caught up yet. Writes made by other
+processes are not seen here; callers that cache replica reads should keep
+them for at most ``max_lag`` seconds (see ``connection``'s ``on_replica``).
+"""
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+
+from db_pool import PoolTimeout
+
+STRATEGIES = ('least-loaded', 'round-robin')
+
+
+def replication_lag(conn):
+    """Seconds a replica is behind its source, or None if it is not replicating
+
+    Needs the REPLICATION CLIENT privilege.
+    """
+    cursor = conn.cursor(dictionary=True)
+    try:
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+        except mysql.connector.Error:
+            # MySQL before 8.0.22 and MariaDB before 10.5.1
+            cursor.execute("SHOW SLAVE STATUS")
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    if row is None:
+        return None
+    if 'Seconds_Behind_Source' in row:
+        return row['Seconds_Behind_Source']
+    return row.get('Seconds_Behind_Master')
+
+
+class _Replica:
+    """A replica's pool and its last probe result"""
+
+    def __init__(self, name, pool):
+        self.name = name
+        self.pool = pool
+        self.healthy = False
+        self.lag = None
+        self.error = 'Not checked yet'
+        self.checked_at = None
+        self.reads = 0
+
+
+class ReplicaRouter:
+    """Chooses a replica pool for each read-only checkout"""
+
+    def __init__(self, pools, max_lag=5.0, check_interval=5.0, strategy='least-loaded', probe=replication_lag):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown replica strategy '{strategy}' (expected one of {', '.join(STRATEGIES)})")
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.strategy = strategy
+        self.probe = probe
+
+        self._replicas = [_Replica(name, pool) for name, pool in pools.items()]
+        self._lock = threading.Lock()
+        self._thread = None
+        self._turn = itertools.count()
+        self._last_write = None
+        self._primary_reads = 0
+        self._fallbacks = 0
+
+    def note_write(self):
+        """Record that this process has just committed a write"""
+        with self._lock:
+            self._last_write = time.monotonic()
+
+    def _ensure_started(self):
+        # Started lazily so a forking server starts it in each worker process
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='replica-probe', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            for replica in self._replicas:
+                self._check(replica)
+            time.sleep(self.check_interval)
+
+    def _check(self, replica):
+        lag, error = None, None
+        try:
+            with replica.pool.connection() as conn:
+                lag = self.probe(conn)
+        except (mysql.connector.Error, PoolTimeout) as err:
+            error = f"Probe failed: {err}"
+        else:
+            if lag is None:
+                error = 'Replication is not running'
+            elif lag > self.max_lag:
+                error = f"Lagging {lag}s behind the primary (max {self.max_lag}s)"
+        with self._lock:
+            replica.lag = lag
+            replica.error = error
+            replica.healthy = error is None
+            replica.checked_at = time.monotonic()
+
+    def choose(self):
+        """Return a healthy replica to read from, or None to use the primary"""
+        if not self._replicas:
+            return None
+        self._ensure_started()
+        with self._lock:
+            if self._last_write is not None and time.monotonic() - self._last_write < self.max_lag:
+                return None
+            healthy = [replica for replica in self._replicas if replica.healthy]
+            if not healthy:
+                return None
+            turn = next(self._turn)
+            if self.strategy == 'round-robin':
+                return healthy[turn % len(healthy)]
+        # Rotating the list first breaks ties between equally loaded replicas
+        start = turn % len(healthy)
+        rotated = healthy[start:] + healthy[:start]
+        return min(rotated, key=lambda replica: replica.pool.stats()['inUse'])
+
+    @contextmanager
+    def connection(self, primary, on_replica=None):
+        """Yield a connection from a healthy replica, or from the ``primary`` pool
+
+        Uncommitted work is rolled back on check-in, and a connection that
+        raised a MySQL error is discarded rather than reused. ``on_replica``
+        is called with the replica's name when a replica serves the checkout.
+        """
+        replica = self.choose()
+        pool = replica.pool if replica else primary
+        try:
+            entry = pool.acquire()
+        except (mysql.connector.Error, PoolTimeout) as err:
+            if replica is None:
+                raise
+            with self._lock:
+                replica.healthy = False
+                replica.error = f"Checkout failed: {err}"
+                self._fallbacks += 1
+            replica, pool = None, primary
+            entry = pool.acquire()
+        with self._lock:
+            if replica:
+                replica.reads += 1
+            else:
+                self._primary_reads += 1
+        if replica and on_replica is not None:
+            on_replica(replica.name)
+
+        discard = False
+        try:
+            yield entry.conn
+        except mysql.connector.Error:
+            discard = True
+            raise
+        finally:
+            pool.release(entry, discard=discard)
+
+    def dispose(self):
+        """Close every idle replica connection"""
+        for replica in self._replicas:
+            replica.pool.dispose()
+
+    def stats(self):
+        """Per-replica health and read counts, plus reads served by the primary"""
+        with self._lock:
+            stats = {
+                replica.name: {
+                    'healthy': replica.healthy,
+                    'lagSeconds': replica.lag,
+                    'error': replica.error,
+                    'reads': replica.reads,
+                    'inUse': replica.pool.stats()['inUse'],
+                }
+                for replica in self._replicas
+            }
+            stats['primary'] = {'reads': self._primary_reads, 'fallbacks': self._fallbacks}
+        return stats
@@ -0,0 +1,214 @@
+"""Read-through cache for the list routes
+
+Every cached response depends on a set of tags, e.g. ``AIA_MODULE`` for the
+full module list or ``AIA_MODULE:PROJECT_ID=5`` for one project's modules.
+Each tag has a version counter, and the cache key and ETag of a response are
+derived from the versions of its tags. A write bumps the versions of the
+tags it affects, so stale entries are simply never looked up again. A
+conditional request whose ETag still matches can be answered with 304
+before any database query runs.
+
+Storage is pluggable: MemoryStore keeps entries in-process (one cache per
+worker), RedisStore shares them between workers and hosts.
+"""
+import collections
+import hashlib
+import json
+import threading
+import time
+import uuid
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class MemoryStore:
+    """In-process key/value store with TTL and LRU eviction"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.epoch = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._data = collections.OrderedDict()
+        self._counters = {}
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires is not None and time.monotonic() > expires:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def counters(self, names):
+        with self._lock:
+            return [self._counters.get(name, 0) for name in names]
+
+    def incr(self, names):
+        with self._lock:
+            for name in names:
+                self._counters[name] = self._counters.get(name, 0) + 1
+
+
+class RedisStore:
+    """Shared store backed by Redis (requires the ``redis`` package)"""
+
+    def __init__(self, url, prefix='codegen:list:', client=None):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("redis package is not installed; pip install redis")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        # The epoch changes if Redis loses its data, so version counters
+        # restarting from zero cannot reproduce an old ETag.
+        self.client.set(prefix + 'epoch', uuid.uuid4().hex[:8], nx=True)
+        epoch = self.client.get(prefix + 'epoch')
+        self.epoch = epoch.decode() if isinstance(epoch, bytes) else str(epoch)
+
+    def get(self, key):
+        return self.client.get(self.prefix + 'entry:' + key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + 'entry:' + key, value, ex=int(ttl) if ttl else None)
+
+    def counters(self, names):
+        if not names:
+            return []
+        values = self.client.mget([self.prefix + 'ver:' + name for name in names])
+        return [int(v) if v is not None else 0 for v in values]
+
+    def incr(self, names):
+        pipe = self.client.pipeline()
+        for name in names:
+            pipe.incr(self.prefix + 'ver:' + name)
+        pipe.execute()
+
+
+def is_shared_store_url(url):
+    """True if ``url`` names a store shared between processes (not ``memory://``)"""
+    return bool(url) and not url.startswith('memory://')
+
+
+def create_store(url, max_entries=1024, prefix='codegen:list:'):
+    """Build a store from a URL: ``memory://`` or ``redis://host:port/db``"""
+    if not is_shared_store_url(url):
+        return MemoryStore(max_entries=max_entries)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisStore(url, prefix=prefix)
+    raise ValueError(f"Unsupported list cache URL: {url}")
+
+
+class CachedResponse:
+    """A response body plus the headers needed to replay it
+
+    ``etag`` overrides the version-derived ETag, for bodies that may not
+    reflect the latest versions yet (read from a replica).
+    """
+
+    __slots__ = ('body', 'mimetype', 'headers', 'last_modified', 'etag')
+
+    def __init__(self, body, mimetype, headers, last_modified, etag=None):
+        self.body = body
+        self.mimetype = mimetype
+        self.headers = headers
+        self.last_modified = last_modified
+        self.etag = etag
+
+    def to_bytes(self):
+        meta = json.dumps({
+            'mimetype': self.mimetype,
+            'headers': self.headers,
+            'lastModified': self.last_modified,
+            'etag': self.etag,
+        }).encode()
+        return meta + b'\n' + self.body
+
+    @classmethod
+    def from_bytes(cls, data):
+        meta, _, body = data.partition(b'\n')
+        meta = json.loads(meta)
+        return cls(body, meta['mimetype'], meta['headers'], meta['lastModified'], meta.get('etag'))
+
+
+def table_tags(table, **filters):
+    """Tags touched by a row written to ``table`` with the given column values"""
+    return [table] + [f"{table}:{column}={value}" for column, value in sorted(filters.items())]
+
+
+class ListCache:
+    """Versioned response cache with tag-based invalidation"""
+
+    def __init__(self, store, ttl=300):
+        self.store = store
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._not_modified = 0
+        self._invalidations = 0
+        self._short_lived = 0
+
+    def etag_for(self, path, args, tags):
+        """Return the ETag (also the cache key) for a request"""
+        versions = self.store.counters(tags)
+        raw = json.dumps([self.store.epoch, path, args, tags, versions], default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    def get(self, etag):
+        data = self.store.get(etag)
+        with self._lock:
+            if data is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        return CachedResponse.from_bytes(data)
+
+    def set(self, etag, entry, ttl=None):
+        """Store ``entry``; ``ttl`` may only shorten the cache's own TTL (0 = none)"""
+        if ttl and (not self.ttl or ttl < self.ttl):
+            with self._lock:
+                self._short_lived += 1
+        else:
+            ttl = self.ttl
+        self.store.set(etag, entry.to_bytes(), ttl)
+
+    def record_not_modified(self):
+        with self._lock:
+            self._not_modified += 1
+
+    def invalidate(self, tags):
+        """Bump the version of every tag so dependent entries are bypassed"""
+        tags = sorted(set(tags))
+        if not tags:
+            return
+        self.store.incr(tags)
+        with self._lock:
+            self._invalidations += len(tags)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'store': type(self.store).__name__,
+                'hits': self._hits,
+                'misses': self._misses,
+                'notModified': self._not_modified,
+                'hitRatio': round(self._hits / lookups, 4) if lookups else 0.0,
+                'invalidations': self._invalidations,
+                'shortLived': self._short_lived,
+            }
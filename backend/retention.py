@@ -0,0 +1,201 @@
+"""Compact storage, retention and archival for AIA_LLM_OUTPUTS
+
+LLM output bodies are stored once per distinct text in
+AIA_LLM_OUTPUT_BODIES, keyed by their SHA-256 and zlib-compressed into a
+BLOB. AIA_LLM_OUTPUTS rows reference a body through OUTPUT_HASH and leave
+OUTPUT NULL; rows written before compaction keep their plain OUTPUT until
+``compact`` moves it. Reads go through ``outputs_query`` and
+``inflate_output``, which return the plain text either way.
+
+``archive`` moves rows older than a number of days into gzip-compressed
+NDJSON files on local disk, one per month of INSERT_DATE_TIME
+(``aia_llm_outputs-YYYY-MM.ndjson.gz``), and deletes them and any bodies no
+longer referenced. Each batch is written and synced before its rows are
+deleted, so an interrupted run can repeat rows in an archive (OUTPUT_ID
+identifies them) but never loses any. Both jobs run from the command line:
+
+    python retention.py compact
+    python retention.py archive --days 90 --dir archive
+"""
+import argparse
+import collections
+import datetime
+import hashlib
+import os
+import sys
+import zlib
+
+from listing import TABLE_COLUMNS
+from serialization import dumps_line
+
+OUTPUT_TABLE = 'AIA_LLM_OUTPUTS'
+BODY_TABLE = 'AIA_LLM_OUTPUT_BODIES'
+
+COMPRESSION_LEVEL = 6
+DEFAULT_BATCH_SIZE = 500
+
+
+def output_hash(text):
+    """Content hash identifying an output body"""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def compress(text):
+    return zlib.compress(text.encode(), COMPRESSION_LEVEL)
+
+
+def decompress(body):
+    return zlib.decompress(bytes(body)).decode()
+
+
+def store_outputs(cursor, texts):
+    """Store each distinct text once and return the hash for every text, in order
+
+    Inserting a body that already exists is a no-op, so identical outputs
+    share one row. Bodies are written in hash order so concurrent writers
+    take their row locks in the same order.
+    """
+    hashes = [output_hash(text) for text in texts]
+    bodies = {}
+    for digest, text in zip(hashes, texts):
+        if digest not in bodies:
+            bodies[digest] = (digest, compress(text), len(text))
+    if bodies:
+        cursor.executemany(
+            f"INSERT INTO {BODY_TABLE} (BODY_HASH, BODY, BODY_LENGTH) VALUES (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE BODY_HASH = BODY_HASH",
+            [bodies[digest] for digest in sorted(bodies)]
+        )
+    return hashes
+
+
+def outputs_query(columns, where=None, order_by='o.OUTPUT_ID'):
+    """SELECT for AIA_LLM_OUTPUTS columns with the compressed body joined as BODY"""
+    selected = ', '.join(f"o.{column}" for column in columns)
+    sql = (
+        f"SELECT {selected}, b.BODY FROM {OUTPUT_TABLE} o "
+        f"LEFT JOIN {BODY_TABLE} b ON b.BODY_HASH = o.OUTPUT_HASH"
+    )
+    if where:
+        sql += f" WHERE {where}"
+    return f"{sql} ORDER BY {order_by}"
+
+
+def inflate_output(row):
+    """Replace the joined BODY of a row from ``outputs_query`` with the plain OUTPUT"""
+    body = row.pop('BODY', None)
+    if body is not None:
+        row['OUTPUT'] = decompress(body)
+    return row
+
+
+def compact(conn, batch_size=DEFAULT_BATCH_SIZE):
+    """Move plain OUTPUT text of older rows into the body table; returns the rows compacted"""
+    cursor = conn.cursor(dictionary=True)
+    total = 0
+    try:
+        while True:
+            cursor.execute(
+                f"SELECT OUTPUT_ID, OUTPUT FROM {OUTPUT_TABLE} "
+                f"WHERE OUTPUT_HASH IS NULL AND OUTPUT IS NOT NULL ORDER BY OUTPUT_ID LIMIT %s",
+                (batch_size,)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            hashes = store_outputs(cursor, [row['OUTPUT'] for row in rows])
+            cursor.executemany(
+                f"UPDATE {OUTPUT_TABLE} SET OUTPUT_HASH = %s, OUTPUT = NULL WHERE OUTPUT_ID = %s",
+                [(digest, row['OUTPUT_ID']) for digest, row in zip(hashes, rows)]
+            )
+            conn.commit()
+            total += len(rows)
+    finally:
+        cursor.close()
+    return total
+
+
+def _archive_path(archive_dir, stamp):
+    if isinstance(stamp, str):
+        stamp = datetime.datetime.fromisoformat(stamp)
+    return os.path.join(archive_dir, f"{OUTPUT_TABLE.lower()}-{stamp:%Y-%m}.ndjson.gz")
+
+
+def _append_gzip(path, lines):
+    # Each call appends a gzip member; concatenated members read as one file
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, 31)
+    with open(path, 'ab') as f:
+        f.write(compressor.compress(b''.join(lines)) + compressor.flush())
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def archive(conn, archive_dir, older_than_days, batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """Archive and delete rows older than ``older_than_days``; returns the rows archived"""
+    cutoff = (now or datetime.datetime.now()) - datetime.timedelta(days=older_than_days)
+    os.makedirs(archive_dir, exist_ok=True)
+    columns = TABLE_COLUMNS[OUTPUT_TABLE] + ('OUTPUT_HASH',)
+    query = outputs_query(
+        columns, where='o.INSERT_DATE_TIME < %s', order_by='o.INSERT_DATE_TIME, o.OUTPUT_ID'
+    ) + ' LIMIT %s'
+    cursor = conn.cursor(dictionary=True)
+    total = 0
+    try:
+        while True:
+            cursor.execute(query, (cutoff, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            by_month = collections.defaultdict(list)
+            for row in rows:
+                inflate_output(row)
+                by_month[_archive_path(archive_dir, row['INSERT_DATE_TIME'])].append(row)
+            for path, month_rows in by_month.items():
+                _append_gzip(path, [dumps_line({c: row[c] for c in columns[:-1]}) for row in month_rows])
+
+            ids = [row['OUTPUT_ID'] for row in rows]
+            cursor.execute(
+                f"DELETE FROM {OUTPUT_TABLE} WHERE OUTPUT_ID IN ({', '.join(['%s'] * len(ids))})",
+                tuple(ids)
+            )
+            hashes = sorted({row['OUTPUT_HASH'] for row in rows if row['OUTPUT_HASH']})
+            if hashes:
+                # A concurrent insert of the same body holds its row lock until
+                # commit, so a body is only dropped once nothing references it.
+                cursor.execute(
+                    f"DELETE FROM {BODY_TABLE} WHERE BODY_HASH IN ({', '.join(['%s'] * len(hashes))}) "
+                    f"AND NOT EXISTS (SELECT 1 FROM {OUTPUT_TABLE} WHERE OUTPUT_HASH = {BODY_TABLE}.BODY_HASH)",
+                    tuple(hashes)
+                )
+            conn.commit()
+            total += len(rows)
+    finally:
+        cursor.close()
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compact and archive AIA_LLM_OUTPUTS')
+    commands = parser.add_subparsers(dest='command', required=True)
+    compact_parser = commands.add_parser('compact', help='Move plain OUTPUT text into compressed bodies')
+    compact_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    archive_parser = commands.add_parser('archive', help='Archive and delete old rows')
+    archive_parser.add_argument('--days', type=int, default=int(os.getenv('LLM_OUTPUT_RETENTION_DAYS', 90)),
+                                help='Archive rows older than this many days (default: 90)')
+    archive_parser.add_argument('--dir', default=os.getenv('LLM_OUTPUT_ARCHIVE_DIR', 'archive'),
+                                help='Directory for the monthly archive files (default: archive)')
+    archive_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from app import db_connection
+
+    with db_connection() as conn:
+        if args.command == 'compact':
+            print(f"Compacted {compact(conn, args.batch_size)} row(s)")
+        else:
+            print(f"Archived {archive(conn, args.dir, args.days, args.batch_size)} row(s) to {args.dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""Column catalog parsed from CREATE TABLE statements
+
+``parse_create_table`` turns a generated CREATION_STATEMENT into one entry
+per column::
+
+    {'name': 'price', 'type': 'DECIMAL', 'columnType': 'DECIMAL(10,2)',
+     'nullable': True, 'default': None, 'key': None, 'autoIncrement': False}
+
+``key`` follows information_schema.COLUMNS.COLUMN_KEY: 'PRI', 'UNI', 'MUL'
+(first column of a non-unique index or foreign key) or None. ``default`` is
+the default's SQL text with string quotes removed (``'pending'`` becomes
+``pending``), or None.
+
+The catalog is computed once when an AIA_MODULE_DATABASES row is written and
+stored as JSON in its COLUMN_CATALOG column; ``column_catalog`` reads it
+back, parsing the statement only for rows that have none.
+"""
+import functools
+import re
+
+import serialization
+
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+|--[^\n]*|\#[^\n]*|/\*.*?\*/)
+  | (?P<ident>`(?:[^`]|``)*`)
+  | (?P<string>'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*")
+  | (?P<number>-?\d+(?:\.\d+)?)
+  | (?P<word>\w+)
+  | (?P<punct>\S)
+""", re.X | re.S)
+
+# Words starting a table-level definition instead of a column
+_TABLE_CONSTRAINTS = frozenset(('PRIMARY', 'UNIQUE', 'KEY', 'INDEX', 'CONSTRAINT', 'FOREIGN',
+                                'FULLTEXT', 'SPATIAL', 'CHECK'))
+_TYPE_MODIFIERS = frozenset(('UNSIGNED', 'SIGNED', 'ZEROFILL'))
+_KEY_RANK = {None: 0, 'MUL': 1, 'UNI': 2, 'PRI': 3}
+
+
+class DDLParseError(ValueError):
+    """Raised for text that is not a CREATE TABLE statement with columns"""
+
+
+def _tokenize(statement):
+    tokens = []
+    for match in _TOKEN_RE.finditer(statement):
+        kind = match.lastgroup
+        if kind == 'space':
+            continue
+        value = match.group()
+        if kind == 'ident':
+            value = value[1:-1].replace('``', '`')
+        tokens.append((kind, value))
+    return tokens
+
+
+def _unquote(value):
+    quote = value[0]
+    body = value[1:-1].replace(quote * 2, quote)
+    return re.sub(r'\\(.)', r'\1', body)
+
+
+def _is(token, *words):
+    # Quoted identifiers are never keywords
+    return token is not None and token[0] == 'word' and token[1].upper() in words
+
+
+def _is_name(token):
+    return token[0] in ('word', 'ident')
+
+
+def _group(tokens, start):
+    """Return the index just past the parenthesized group opening at ``start``"""
+    depth = 0
+    for i in range(start, len(tokens)):
+        if tokens[i] == ('punct', '('):
+            depth += 1
+        elif tokens[i] == ('punct', ')'):
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    raise DDLParseError("Unbalanced parentheses")
+
+
+def _split(tokens):
+    """Split the tokens inside the column list at top-level commas"""
+    parts, current, depth = [], [], 0
+    for token in tokens:
+        if token == ('punct', '('):
+            depth += 1
+        elif token == ('punct', ')'):
+            depth -= 1
+        elif token == ('punct', ',') and depth == 0:
+            parts.append(current)
+            current = []
+            continue
+        current.append(token)
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _text(tokens):
+    # Words are separated by a space, punctuation is not: DECIMAL(10,2) UNSIGNED
+    out = []
+    for i, (kind, value) in enumerate(tokens):
+        if i and kind != 'punct' and tokens[i - 1][0] != 'punct':
+            out.append(' ')
+        out.append(value)
+    return ''.join(out)
+
+
+def _key_columns(tokens):
+    """Column names listed in the first parenthesized group of an index definition"""
+    if ('punct', '(') not in tokens:
+        return []
+    start = tokens.index(('punct', '('))
+    return [part[0][1] for part in _split(tokens[start + 1:_group(tokens, start) - 1])
+            if part and _is_name(part[0])]
+
+
+def _parse_column(tokens):
+    column = {'name': tokens[0][1], 'type': None, 'columnType': None, 'nullable': True,
+              'default': None, 'key': None, 'autoIncrement': False}
+    if len(tokens) < 2 or tokens[1][0] != 'word':
+        raise DDLParseError(f"Column {column['name']} has no type")
+    i = 2
+    type_tokens = [tokens[1]]
+    if i < len(tokens) and tokens[i] == ('punct', '('):
+        end = _group(tokens, i)
+        type_tokens += tokens[i:end]
+        i = end
+    while i < len(tokens) and _is(tokens[i], *_TYPE_MODIFIERS):
+        type_tokens.append(tokens[i])
+        i += 1
+    column['type'] = tokens[1][1].upper()
+    column['columnType'] = _text([(kind, value.upper() if kind == 'word' else value)
+                                  for kind, value in type_tokens])
+
+    while i < len(tokens):
+        token = tokens[i]
+        following = tokens[i + 1] if i + 1 < len(tokens) else None
+        if _is(token, 'NOT') and _is(following, 'NULL'):
+            column['nullable'] = False
+            i += 2
+        elif _is(token, 'NULL'):
+            column['nullable'] = True
+            i += 1
+        elif _is(token, 'DEFAULT') and following is not None:
+            i += 1
+            if following == ('punct', '('):
+                end = _group(tokens, i)
+                column['default'] = _text(tokens[i:end])
+                i = end
+                continue
+            kind, value = following
+            i += 1
+            if kind == 'string':
+                column['default'] = _unquote(value)
+            elif _is(following, 'NULL'):
+                column['default'] = None
+            else:
+                column['default'] = value.upper() if kind == 'word' else value
+                if i < len(tokens) and tokens[i] == ('punct', '('):
+                    # CURRENT_TIMESTAMP() / CURRENT_TIMESTAMP(3)
+                    i = _group(tokens, i)
+        elif _is(token, 'AUTO_INCREMENT'):
+            column['autoIncrement'] = True
+            i += 1
+        elif _is(token, 'PRIMARY', 'KEY'):
+            column['key'] = 'PRI'
+            column['nullable'] = False
+            i += 2 if _is(following, 'KEY') else 1
+        elif _is(token, 'UNIQUE'):
+            if column['key'] != 'PRI':
+                column['key'] = 'UNI'
+            i += 2 if _is(following, 'KEY') else 1
+        elif _is(token, 'REFERENCES'):
+            # Inline REFERENCES are parsed but ignored by MySQL
+            break
+        elif _is(token, 'COMMENT', 'COLLATE', 'CHARSET', 'CHARACTER', 'ON'):
+            # Skip the clause and its argument: COMMENT 'text', CHARACTER SET name,
+            # ON UPDATE CURRENT_TIMESTAMP
+            i += 3 if _is(token, 'CHARACTER', 'ON') else 2
+            if i < len(tokens) and tokens[i] == ('punct', '('):
+                i = _group(tokens, i)
+        elif token == ('punct', '('):
+            # Generated column expressions and CHECK constraints
+            i = _group(tokens, i)
+        else:
+            i += 1
+    return column
+
+
+def _apply_constraint(tokens, columns):
+    if _is(tokens[0], 'CONSTRAINT'):
+        tokens = tokens[2:] if len(tokens) > 1 and not _is(tokens[1], *_TABLE_CONSTRAINTS) else tokens[1:]
+    if not tokens or _is(tokens[0], 'CHECK'):
+        return
+    first = tokens[0][1].upper()
+    if first == 'PRIMARY':
+        key, names = 'PRI', _key_columns(tokens)
+    elif first == 'UNIQUE':
+        names = _key_columns(tokens)
+        # Only a single-column unique index makes its column UNI
+        key = 'UNI' if len(names) == 1 else 'MUL'
+        names = names[:1]
+    else:
+        key, names = 'MUL', _key_columns(tokens)[:1]
+    by_name = {column['name'].lower(): column for column in columns}
+    for name in names:
+        column = by_name.get(name.lower())
+        if column is None:
+            continue
+        if _KEY_RANK[key] > _KEY_RANK[column['key']]:
+            column['key'] = key
+        if key == 'PRI':
+            column['nullable'] = False
+
+
+def parse_create_table(statement):
+    """Return the column entries declared by a CREATE TABLE statement, in order
+
+    Raises DDLParseError if there is no CREATE TABLE with a column list.
+    """
+    tokens = _tokenize(statement or '')
+    for i, token in enumerate(tokens):
+        if _is(token, 'TABLE') and i > 0 and _is(tokens[i - 1], 'CREATE', 'TEMPORARY'):
+            break
+    else:
+        raise DDLParseError("No CREATE TABLE statement found")
+    try:
+        start = tokens.index(('punct', '('), i)
+    except ValueError:
+        raise DDLParseError("CREATE TABLE has no column list")
+    end = _group(tokens, start)
+
+    columns = []
+    constraints = []
+    for part in _split(tokens[start + 1:end - 1]):
+        if not part:
+            continue
+        if _is(part[0], *_TABLE_CONSTRAINTS):
+            constraints.append(part)
+        elif _is_name(part[0]):
+            columns.append(_parse_column(part))
+    if not columns:
+        raise DDLParseError("CREATE TABLE declares no columns")
+    for part in constraints:
+        _apply_constraint(part, columns)
+    return columns
+
+
+def catalog_json(statement):
+    """Serialized catalog for the COLUMN_CATALOG column, or None if the statement does not parse"""
+    try:
+        return serialization.dumps(parse_create_table(statement)).decode()
+    except DDLParseError:
+        return None
+
+
+@functools.lru_cache(maxsize=1024)
+def _load(stored, statement):
+    if stored:
+        return tuple(serialization.loads(stored))
+    try:
+        return tuple(parse_create_table(statement))
+    except DDLParseError:
+        return ()
+
+
+def column_catalog(module_database):
+    """Column entries for an AIA_MODULE_DATABASES row (shared; do not modify them)
+
+    Uses the stored COLUMN_CATALOG, falling back to parsing
+    CREATION_STATEMENT for rows written before the catalog existed. A
+    statement that does not parse has no columns.
+    """
+    stored = module_database.get('COLUMN_CATALOG')
+    if isinstance(stored, (bytes, bytearray)):
+        stored = stored.decode()
+    return _load(stored, None if stored else module_database.get('CREATION_STATEMENT'))
@@ -0,0 +1,63 @@
+"""JSON serialization for API responses and exports
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Both encoders handle the types MySQL rows contain (datetime,
+date, Decimal, bytes) directly, so rows can be serialized as fetched
+without a separate conversion pass.
+"""
+import base64
+import datetime
+import decimal
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    BACKEND = 'orjson'
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        """Serialize ``obj`` to UTF-8 JSON bytes"""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    def dumps_line(obj):
+        """Serialize ``obj`` to one NDJSON line (bytes ending in a newline)"""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+
+    loads = orjson.loads
+else:
+    BACKEND = 'json'
+    _encode = json.JSONEncoder(default=_default, separators=(',', ':'), ensure_ascii=False).encode
+
+    def dumps(obj):
+        """Serialize ``obj`` to UTF-8 JSON bytes"""
+        return _encode(obj).encode()
+
+    def dumps_line(obj):
+        """Serialize ``obj`` to one NDJSON line (bytes ending in a newline)"""
+        return (_encode(obj) + '\n').encode()
+
+    loads = json.loads
+
+
+def sse_event(event, obj):
+    """Encode ``obj`` as the JSON data of one Server-Sent Events message"""
+    return b''.join((b'event: ', event.encode(), b'\ndata: ', dumps(obj), b'\n\n'))
@@ -0,0 +1,87 @@
+"""In-process coalescing of identical concurrent calls
+
+While a call for a key is running, further calls with the same key wait
+for it and return its result (or raise its exception) instead of running
+again. Nothing is cached: once the call finishes, the next call with that
+key runs afresh.
+
+A caller may pass a ``progress`` callback. The executing call receives a
+``progress`` keyword argument that forwards each step to every caller
+sharing it; a caller that joins late is first told the steps already taken.
+"""
+import threading
+from concurrent.futures import Future
+
+
+class _Call:
+    """An in-flight execution, its progress so far and who is listening"""
+
+    def __init__(self):
+        self.future = Future()
+        self.steps = []
+        self.listeners = []
+        # Held while delivering steps, so each listener sees them in order
+        self.lock = threading.Lock()
+
+    def listen(self, progress):
+        with self.lock:
+            for step in self.steps:
+                progress(step)
+            self.listeners.append(progress)
+
+    def report(self, step):
+        with self.lock:
+            self.steps.append(step)
+            for listener in self.listeners:
+                listener(step)
+
+
+class SingleFlight:
+    """One execution per key at a time; concurrent callers share it"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._executions = 0
+        self._shared = 0
+
+    def run(self, key, func, *args, progress=None, **kwargs):
+        """Return ``func(*args, **kwargs)``, sharing an in-flight call with the same key
+
+        With ``progress``, ``func`` is called with an extra ``progress``
+        keyword argument whose steps reach every caller's callback.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._executions += 1
+            else:
+                self._shared += 1
+        if progress is not None:
+            call.listen(progress)
+        if not leader:
+            return call.future.result()
+
+        if progress is not None:
+            kwargs['progress'] = call.report
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            call.future.set_exception(e)
+            raise
+        else:
+            call.future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'inFlight': len(self._calls),
+                'executions': self._executions,
+                'shared': self._shared,
+            }
@@ -0,0 +1,147 @@
+"""Keyword rules for the stub engine's CREATE TABLE statements
+
+Every generated table gets the base columns. Each rule adds a group of
+columns when any of its keywords occurs in the prompt (case-insensitive
+substring match, so "contacts" matches "contact"). Rules are read from a
+JSON file (table_rules.json by default)::
+
+    {
+      "baseColumns": ["id INT AUTO_INCREMENT PRIMARY KEY", ...],
+      "rules": [
+        {"name": "contact", "keywords": ["address", "contact"],
+         "columns": ["email VARCHAR(255)", "phone VARCHAR(20)", "address TEXT"]}
+      ]
+    }
+
+A RuleSet compiles every keyword into one regex whose alternation is a
+prefix trie, so a prompt is scanned once and the work per character depends
+on keyword length, not on how many rules there are. Columns are added in
+rule order; a column whose name is already present is skipped.
+
+``RuleSet.digest`` (SHA-256 of the rules file) identifies the rules in
+cache keys of generated statements, so editing the file invalidates them.
+"""
+import hashlib
+import json
+import os
+import re
+
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'table_rules.json')
+
+
+class RuleConfigError(ValueError):
+    """Raised for a rules file that is missing fields or has empty keywords"""
+
+
+def _build_trie(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = word
+    return trie
+
+
+def _contained(trie, word):
+    """Every word in the trie that occurs in ``word``, including itself"""
+    found = set()
+    for start in range(len(word)):
+        node = trie
+        for char in word[start:]:
+            node = node.get(char)
+            if node is None:
+                break
+            if '' in node:
+                found.add(node[''])
+    return found
+
+
+def _trie_pattern(trie):
+    """Regex source matching any word in the trie, longest alternative first"""
+    def pattern(node):
+        terminal = '' in node
+        branches = [re.escape(char) + pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if terminal:
+            # The shorter word ends here; try the longer ones first
+            return f"(?:{body})?"
+        return body
+
+    return pattern(trie)
+
+
+def _column_name(definition):
+    return definition.split(None, 1)[0].strip('`').lower()
+
+
+class RuleSet:
+    """Base columns plus keyword rules, compiled into a single-pass matcher"""
+
+    def __init__(self, base_columns, rules, digest=None):
+        self.base_columns = tuple(base_columns)
+        self.rules = tuple(rules)
+        if digest is None:
+            config = json.dumps({'baseColumns': self.base_columns, 'rules': self.rules}, sort_keys=True)
+            digest = hashlib.sha256(config.encode()).hexdigest()
+        self.digest = digest
+
+        # keyword -> indexes of the rules it triggers
+        owners = {}
+        for index, rule in enumerate(self.rules):
+            for keyword in rule['keywords']:
+                owners.setdefault(keyword.lower(), set()).add(index)
+        trie = _build_trie(owners)
+        # The regex reports the longest keyword starting at each position;
+        # keywords contained in it match too, so fold their rules in.
+        self._triggers = {
+            keyword: frozenset().union(*(owners[other] for other in _contained(trie, keyword)))
+            for keyword in owners
+        }
+        self._matcher = re.compile(f"(?=({_trie_pattern(trie)}))") if owners else None
+
+    @classmethod
+    def load(cls, path=DEFAULT_RULES_FILE):
+        """Read and compile a rules file"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        config = json.loads(data.decode('utf-8'))
+        try:
+            base_columns = config['baseColumns']
+            rules = [
+                {'name': rule.get('name', f"rule {n}"), 'keywords': list(rule['keywords']),
+                 'columns': list(rule['columns'])}
+                for n, rule in enumerate(config.get('rules', []), 1)
+            ]
+        except (KeyError, TypeError) as err:
+            raise RuleConfigError(f"Invalid table rules file {path}: missing {err}") from err
+        for rule in rules:
+            if not rule['keywords'] or not all(isinstance(k, str) and k for k in rule['keywords']):
+                raise RuleConfigError(f"Invalid table rules file {path}: rule '{rule['name']}' needs keywords")
+        return cls(base_columns, rules, digest=hashlib.sha256(data).hexdigest())
+
+    def matching_rules(self, prompt):
+        """Indexes of the rules triggered by the prompt, in rule order"""
+        if self._matcher is None:
+            return []
+        matched = set()
+        for keyword in set(self._matcher.findall(prompt.lower())):
+            matched |= self._triggers[keyword]
+        return sorted(matched)
+
+    def columns(self, prompt):
+        """Column definitions for a table generated from the prompt"""
+        columns = list(self.base_columns)
+        seen = {_column_name(column) for column in columns}
+        for index in self.matching_rules(prompt):
+            for column in self.rules[index]['columns']:
+                name = _column_name(column)
+                if name not in seen:
+                    seen.add(name)
+                    columns.append(column)
+        return columns
+
+    def creation_statement(self, table_name, prompt):
+        return f"CREATE TABLE {table_name} (\n  " + ",\n  ".join(self.columns(prompt)) + "\n);"
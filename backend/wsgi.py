@@ -0,0 +1,8 @@
+"""WSGI entry point for production servers
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Importing this module does not touch the database; the schema is migrated
+by the server's master process before workers start (see gunicorn.conf.py).
+"""
+from app import app as application  # noqa: F401
@@ -1,8 +1,16 @@
 import axios from 'axios';
-import { CodegenRequest, CodegenResponse } from '../types';
+import {
+  CodegenRequest, CodegenResponse, ListOptions, ModuleTree, ModuleTreeOptions, ProjectTree, ProjectTreeOptions,
+} from '../types';
 
 const API_URL = 'http://localhost:5000/api';
 
+const listParams = (options: ListOptions = {}) => ({
+  limit: options.limit,
+  cursor: options.cursor,
+  fields: options.fields?.join(','),
+});
+
 export const generateCode = async (data: CodegenRequest): Promise<CodegenResponse> => {
   try {
     const response = await axios.post(`${API_URL}/generate`, data);
@@ -13,9 +21,48 @@ export const generateCode = async (data: CodegenRequest): Promise<CodegenRespons
   }
 };
 
-export const getProjects = async () => {
+// Streams POST /generate?stream=1 (Server-Sent Events): metadata arrives as
+// soon as it is stored, then the generated code chunk by chunk.
+export const generateCodeStream = async (
+  data: CodegenRequest,
+  onMetadata: (metadata: CodegenResponse) => void,
+  onCode: (text: string) => void,
+): Promise<void> => {
   try {
-    const response = await axios.get(`${API_URL}/projects`);
+    const response = await fetch(`${API_URL}/generate?stream=1`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(data),
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Request failed with status ${response.status}`);
+    }
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += value;
+      let end;
+      while ((end = buffer.indexOf('\n\n')) !== -1) {
+        const message = buffer.slice(0, end);
+        buffer = buffer.slice(end + 2);
+        const event = /^event: (.*)$/m.exec(message)?.[1];
+        const payload = JSON.parse(/^data: (.*)$/m.exec(message)?.[1] ?? 'null');
+        if (event === 'metadata') onMetadata(payload);
+        else if (event === 'code') onCode(payload.text);
+        else if (event === 'error') throw new Error(payload.message);
+      }
+    }
+  } catch (error) {
+    console.error('Error generating code:', error);
+    throw error;
+  }
+};
+
+export const getProjects = async (options?: ListOptions) => {
+  try {
+    const response = await axios.get(`${API_URL}/projects`, { params: listParams(options) });
     return response.data;
   } catch (error) {
     console.error('Error fetching projects:', error);
@@ -23,12 +70,30 @@ export const getProjects = async () => {
   }
 };
 
-export const getModules = async (projectId?: number) => {
+// A project with its modules and their table definitions in one request
+export const getProjectTree = async (projectId: number, options: ProjectTreeOptions = {}): Promise<ProjectTree> => {
+  try {
+    const response = await axios.get(`${API_URL}/projects/${projectId}/tree`, {
+      params: {
+        depth: options.depth,
+        projectFields: options.projectFields?.join(','),
+        moduleFields: options.moduleFields?.join(','),
+        databaseFields: options.databaseFields?.join(','),
+      },
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching project tree:', error);
+    throw error;
+  }
+};
+
+export const getModules = async (projectId?: number, options?: ListOptions) => {
   try {
     const url = projectId 
       ? `${API_URL}/modules?projectId=${projectId}` 
       : `${API_URL}/modules`;
-    const response = await axios.get(url);
+    const response = await axios.get(url, { params: listParams(options) });
     return response.data;
   } catch (error) {
     console.error('Error fetching modules:', error);
@@ -36,12 +101,29 @@ export const getModules = async (projectId?: number) => {
   }
 };
 
-export const getModuleDatabases = async (moduleId?: number) => {
+// A module with its table definitions in one request
+export const getModuleTree = async (moduleId: number, options: ModuleTreeOptions = {}): Promise<ModuleTree> => {
+  try {
+    const response = await axios.get(`${API_URL}/modules/${moduleId}/tree`, {
+      params: {
+        depth: options.depth,
+        moduleFields: options.moduleFields?.join(','),
+        databaseFields: options.databaseFields?.join(','),
+      },
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching module tree:', error);
+    throw error;
+  }
+};
+
+export const getModuleDatabases = async (moduleId?: number, options?: ListOptions) => {
   try {
     const url = moduleId 
       ? `${API_URL}/module-databases?moduleId=${moduleId}` 
       : `${API_URL}/module-databases`;
-    const response = await axios.get(url);
+    const response = await axios.get(url, { params: listParams(options) });
     return response.data;
   } catch (error) {
     console.error('Error fetching module databases:', error);
@@ -2,7 +2,7 @@ import React, { useState } from 'react';
 import { useForm } from 'react-hook-form';
 import { toast } from 'react-toastify';
 import { Cpu, Loader2 } from 'lucide-react';
-import { generateCode } from '../api';
+import { generateCodeStream } from '../api';
 import { CodegenRequest, CodegenResponse } from '../types';
 
 const CodeGenerator: React.FC = () => {
@@ -13,8 +13,14 @@ const CodeGenerator: React.FC = () => {
   const onSubmit = async (data: CodegenRequest) => {
     setLoading(true);
     try {
-      const response = await generateCode(data);
-      setResult(response);
+      await generateCodeStream(
+        data,
+        (metadata) => setResult({ ...metadata, generatedCode: '' }),
+        (text) => setResult((current) => current && {
+          ...current,
+          generatedCode: (current.generatedCode ?? '') + text,
+        }),
+      );
       toast.success('Code generated successfully!');
     } catch (error) {
       console.error('Error:', error);
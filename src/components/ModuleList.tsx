@@ -4,16 +4,29 @@ import { Database, Loader2 } from 'lucide-react';
 import { getModules } from '../api';
 import { Module } from '../types';
 
-const ModuleList: React.FC = () => {
+interface ModuleListProps {
+  // Modules already loaded by the parent page; fetched here when omitted
+  modules?: Module[];
+}
+
+const ModuleList: React.FC<ModuleListProps> = ({ modules: preloaded }) => {
   const { projectId } = useParams<{ projectId?: string }>();
-  const [modules, setModules] = useState<Module[]>([]);
-  const [loading, setLoading] = useState(true);
+  const [modules, setModules] = useState<Module[]>(preloaded ?? []);
+  const [loading, setLoading] = useState(!preloaded);
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
+    if (preloaded) {
+      setModules(preloaded);
+      setLoading(false);
+      return;
+    }
+
     const fetchModules = async () => {
       try {
-        const data = await getModules(projectId ? parseInt(projectId) : undefined);
+        const data = await getModules(projectId ? parseInt(projectId) : undefined, {
+          fields: ['MODULE_NAME', 'MODULE_DESCRIPTION', 'DATABASE_TABLE'],
+        });
         setModules(data);
       } catch (err) {
         setError('Failed to fetch modules');
@@ -23,7 +36,7 @@ const ModuleList: React.FC = () => {
     };
 
     fetchModules();
-  }, [projectId]);
+  }, [projectId, preloaded]);
 
   if (loading) {
     return (
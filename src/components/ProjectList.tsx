@@ -12,7 +12,9 @@ const ProjectList: React.FC = () => {
   useEffect(() => {
     const fetchProjects = async () => {
       try {
-        const data = await getProjects();
+        const data = await getProjects({
+          fields: ['PROJECT_NAME', 'PROJECT_DESCRIPTION'],
+        });
         setProjects(data);
       } catch (err) {
         setError('Failed to fetch projects');
@@ -1,7 +1,8 @@
 import React, { useEffect, useState } from 'react';
 import { useParams, Link } from 'react-router-dom';
+import axios from 'axios';
 import { ArrowLeft, Code, Database, FileCode, Loader2 } from 'lucide-react';
-import { getModules, getModuleDatabases } from '../api';
+import { getModuleTree } from '../api';
 import { Module, ModuleDatabase } from '../types';
 
 const ModuleDetailPage: React.FC = () => {
@@ -14,21 +15,16 @@ const ModuleDetailPage: React.FC = () => {
   useEffect(() => {
     const fetchModuleDetails = async () => {
       try {
-        const modules = await getModules();
-        const foundModule = modules.find((m: Module) => m.MODULE_ID === parseInt(moduleId!));
-        
-        if (foundModule) {
-          setModule(foundModule);
-          
-          const moduleDatabases = await getModuleDatabases(foundModule.MODULE_ID);
-          if (moduleDatabases && moduleDatabases.length > 0) {
-            setModuleDatabase(moduleDatabases[0]);
-          }
-        } else {
-          setError('Module not found');
+        // Module and its table definitions in one request
+        const { moduleDatabases, ...foundModule } = await getModuleTree(parseInt(moduleId!));
+        setModule(foundModule);
+        if (moduleDatabases && moduleDatabases.length > 0) {
+          setModuleDatabase(moduleDatabases[0]);
         }
       } catch (err) {
-        setError('Failed to fetch module details');
+        setError(axios.isAxiosError(err) && err.response?.status === 404
+          ? 'Module not found'
+          : 'Failed to fetch module details');
       } finally {
         setLoading(false);
       }
@@ -1,29 +1,29 @@
 import React, { useEffect, useState } from 'react';
 import { useParams, Link } from 'react-router-dom';
+import axios from 'axios';
 import { ArrowLeft, Database, Folder, Loader2 } from 'lucide-react';
-import { getProjects, getModules } from '../api';
-import { Project, Module } from '../types';
+import { getProjectTree } from '../api';
+import { ProjectTree } from '../types';
 import ModuleList from '../components/ModuleList';
 
 const ProjectDetailPage: React.FC = () => {
   const { projectId } = useParams<{ projectId: string }>();
-  const [project, setProject] = useState<Project | null>(null);
+  const [project, setProject] = useState<ProjectTree | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
     const fetchProjectDetails = async () => {
       try {
-        const projects = await getProjects();
-        const foundProject = projects.find((p: Project) => p.PROJECT_ID === parseInt(projectId!));
-        
-        if (foundProject) {
-          setProject(foundProject);
-        } else {
-          setError('Project not found');
-        }
+        // Project and modules in one request
+        setProject(await getProjectTree(parseInt(projectId!), {
+          depth: 1,
+          moduleFields: ['MODULE_NAME', 'MODULE_DESCRIPTION', 'DATABASE_TABLE'],
+        }));
       } catch (err) {
-        setError('Failed to fetch project details');
+        setError(axios.isAxiosError(err) && err.response?.status === 404
+          ? 'Project not found'
+          : 'Failed to fetch project details');
       } finally {
         setLoading(false);
       }
@@ -96,7 +96,7 @@ const ProjectDetailPage: React.FC = () => {
           <h2 className="text-xl font-semibold text-gray-800">Project Modules</h2>
         </div>
         
-        <ModuleList />
+        <ModuleList modules={project.modules ?? []} />
       </div>
     </div>
   );
@@ -22,6 +22,9 @@ export interface ModuleDatabase {
   MODULE_ID: number;
   DATABASE_TABLE: string;
   CREATION_STATEMENT: string;
+  DDL_STATUS?: 'pending' | 'running' | 'applied' | 'failed';
+  DDL_ERROR?: string | null;
+  DDL_UPDATED_AT?: string | null;
   INSERT_ID: string;
   INSERT_DATE_TIME: string;
 }
@@ -35,6 +38,33 @@ export interface LLMOutput {
   INSERT_DATE_TIME: string;
 }
 
+export interface ProjectTree extends Project {
+  modules?: (Module & { moduleDatabases?: ModuleDatabase[] })[];
+}
+
+export interface ModuleTree extends Module {
+  moduleDatabases?: ModuleDatabase[];
+}
+
+export interface ModuleTreeOptions {
+  depth?: 0 | 1;
+  moduleFields?: string[];
+  databaseFields?: string[];
+}
+
+export interface ProjectTreeOptions {
+  depth?: 0 | 1 | 2;
+  projectFields?: string[];
+  moduleFields?: string[];
+  databaseFields?: string[];
+}
+
+export interface ListOptions {
+  limit?: number;
+  cursor?: string;
+  fields?: string[];
+}
+
 export interface CodegenRequest {
   prompt: string;
   engine: string;
@@ -45,6 +75,10 @@ export interface CodegenResponse {
   message: string;
   project?: Project;
   module?: Module;
+  matchScores?: {
+    project: number;
+    module: number;
+  };
   moduleDatabase?: ModuleDatabase;
   llmOutput?: LLMOutput;
   generatedCode?: string;